@@ -18,26 +18,76 @@ Display layout (7" HDMI touchscreen, 800x480 typical):
 
 Threading:
   - Main thread     : tkinter event loop
+  - model-loader    : imports faster-whisper, loads + warms up the model
+  - model-swap      : (on request) loads a replacement model while the
+                      current one keeps decoding; swapped in between clips
   - udp_vad thread  : receives UDP, runs VAD, pushes to trans_queue
   - transcribe thread: pulls from trans_queue, pushes to gui_queue
-  - GUI polling     : root.after(100) drains gui_queue safely on main thread
+  - refine thread   : while the live path is idle, re-decodes recent finals
+                      with a stronger model / beam and revises them in place
+  - thermal thread  : samples temperature / clock / load and pins the
+                      backpressure level ahead of firmware throttling
+  - control thread  : one-line commands on a Unix socket (control_socket.py)
+  - writer thread   : formats, batches and fsyncs transcript lines, rotates
+                      the log (transcript_writer.py)
+  - store thread    : batches finals into the searchable SQLite store
+                      (transcript_store.py)
+  - captions thread : asyncio HTTP server streaming the captions to
+                      browsers over SSE (caption_server.py)
+  - GUI updates     : gui_queue wakes the main thread through a pipe Tk
+                      watches; one drain per frame applies the pending
+                      finals and only the newest interim (tk_wake.py)
+  - caption sink    : not a thread; _show() also writes the caption state to
+                      seqlocked shared memory (and optionally a FIFO) for
+                      OBS / projector renderers (caption_shm.py)
+
+Startup:
+  The window and the UDP receiver come up immediately; the model loads on
+  the model-loader thread.  Finals captured before it is ready wait in
+  startup_backlog (bounded by STARTUP_BACKLOG_MB) and are transcribed in
+  order once it is; interims from that period are skipped as stale.
 """
 
-import socket
-import struct
 import os
+import sys
 import queue
 import threading
 import time
+import itertools
 import tkinter as tk
 from tkinter import font as tkfont
 import numpy as np
-from faster_whisper import WhisperModel
-from scipy import signal
+from collections import deque
+from typing import TYPE_CHECKING
 from datetime import datetime
 from zoneinfo import ZoneInfo
 from dotenv import load_dotenv
 
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))  # shared helpers at repo root
+from mel_cache import LogMelCache, install_feature_cache
+from model_startup import tuned_settings, start_model, load_model, format_report, notify_systemd
+from backpressure import BackpressureController, MAX_SEGMENT_CAP_SEC
+from spill_log import SpillLog
+from byte_queue import MB, ByteBudgetPriorityQueue, PcmBuffer, to_int16, to_float32
+from refiner import Refiner
+from transcript_writer import TranscriptWriter, clock
+from transcript_store import TranscriptStore, STORE_PATH, connect as connect_store, session_finals
+from caption_server import CaptionBroadcaster, CaptionServer, CAPTION_PORT
+from caption_shm import CaptionSink, CAPTION_SHM
+from subtitle_export import SubtitleWriter, StreamClock
+from tk_wake import WakeQueue, latest_per_kind
+from confidence import ConfidenceGate, summarise, RETRY_BEAM_SIZE, RETRY_TEMPERATURES
+from early_final import SpeculativeFinals, COMMIT
+from prompt_context import PromptContext, load_vocabulary
+from thermal import SysfsReader, ThermalGovernor, LEVELS as THERMAL_LEVELS
+from model_swap import ModelSwapper
+from control_socket import ControlServer, CONTROL_SOCKET
+from udp_audio import (PicoReceiver, DcBlocker, EnergyVad, frame_rms, clip_gain,
+                       ONSET, END, SPEECH)
+
+if TYPE_CHECKING:
+    from faster_whisper import WhisperModel   # imported lazily by model_loader()
+
 # ─── Configuration ────────────────────────────────────────────────────────────
 
 PICO_W_IP    = "192.168.4.1"
@@ -46,15 +96,88 @@ FS           = 16000
 MODEL_SIZE   = "tiny.en"
 DEVICE       = "cpu"
 COMPUTE_TYPE = "int8"
+CPU_THREADS  = 0             # 0 = CTranslate2 default
+# `python autotune.py` measures these on this machine; its choice wins
+MODEL_SIZE, COMPUTE_TYPE, CPU_THREADS = tuned_settings(MODEL_SIZE, COMPUTE_TYPE, CPU_THREADS)
+# Offered by the model menu (tap the model name) and `control_socket.py model
+# <name>`; a swap loads in the background and takes over between clips
+MODEL_CHOICES  = ("tiny.en", "base.en", "small.en")
+CONTROL_SOCKET_ENABLED = True   # $ESCRIBE_CONTROL_SOCKET, default /tmp/escribe-control.sock
+
+# On-screen scrollback.  The view keeps the newest VIEW_MAX_FINALS finals
+# and trims the oldest VIEW_TRIM_BATCH at a time; older ones are paged in
+# from the transcript store by the "earlier" button.
+VIEW_MAX_FINALS = 400
+VIEW_TRIM_BATCH = 50
+HISTORY_PAGE    = 200
+
+# Live captions for browsers on the AP: http://<pi>:CAPTION_PORT/
+CAPTION_SERVER_ENABLED = True
+# Captions for local renderers (OBS, a projector display): a seqlocked
+# shared-memory block, plus a FIFO of the same state when CAPTION_FIFO_ENABLED
+CAPTION_SHM_ENABLED  = True
+CAPTION_FIFO_ENABLED = False
 
 VAD_THRESHOLD    = 0.008
 VAD_SPEECH_ONSET = 3
 VAD_SILENCE_END  = 20
+VAD_EARLY_END    = 8       # quiet packets before a speculative final (early_final.py)
+EARLY_FINAL      = True    # decode during the rest of the silence window
 VAD_PRE_ROLL     = 8
 MIN_CLIP_SEC     = 0.4
 MAX_CLIP_SEC     = 12.0
 
 INTERIM_INTERVAL_SEC = 1.5
+# Long clips are decoded in ~STREAM_SLICE_SEC slices (no slice shorter than
+# half that), cut at the quietest point nearby, so text appears slice by
+# slice instead of after the whole window -- faster-whisper yields nothing
+# until it has decoded all of a 30 s window
+STREAM_SLICE_SEC     = 6.0
+STREAM_SEARCH_SEC    = 1.0     # how far from the target a cut may move
+BEAM_SIZE            = 1
+TARGET_DELAY_SEC     = 2.0   # queue delay the backpressure controller steers for
+
+USE_MEL_CACHE     = True   # build clips from cached log-mel frames (mel_cache.py)
+MEL_CACHE_SECONDS = 60.0   # must cover MAX_CLIP_SEC plus the queue backlog
+N_MELS            = 128 if MODEL_SIZE.startswith(("large-v3", "turbo")) else 80
+
+# Memory budgets.  Audio is held as int16 (32 KB/s) and only converted to
+# float32 right before transcribe() -- see byte_queue.py.
+TRANS_QUEUE_MB     = 8.0   # queued segments (~4 min of audio)
+STARTUP_BACKLOG_MB = 32.0  # finals held while the model loads (~17 min)
+
+# Finals that don't fit in trans_queue go to an on-disk log and are replayed
+# in order; the log survives a crash / restart (spill_log.py).
+SPILL_FILE   = "spill/pi5test329.spill"
+SPILL_MAX_MB = 512
+
+# Rolling initial_prompt from recent finals + a session vocabulary
+# (prompt_context.py).  One term per line in PROMPT_VOCAB_FILE.
+PROMPT_CONTEXT    = True
+PROMPT_MAX_TOKENS = 64
+PROMPT_HISTORY    = 4        # finals carried forward
+PROMPT_VOCAB_FILE = "session_vocab.txt"
+
+# Thermal / load governor (thermal.py).  Levels cool / warm / hot / critical
+# pin the backpressure controller to at least normal / relaxed / lean /
+# shedding; warm and above also pause refinement.  ESCRIBE_SYSFS_ROOT points
+# the readings at a fake sysfs tree.
+THERMAL_ENABLED      = True
+THERMAL_INTERVAL_SEC = 5.0
+THERMAL_WARM_C       = 70.0
+THERMAL_HOT_C        = 76.0
+THERMAL_CRITICAL_C   = 80.0     # Pi 5 firmware starts throttling here
+THERMAL_FALLBACK     = "tiny.en"   # model swapped in at critical
+
+# Idle-time refinement (refiner.py): recent finals are re-decoded with a
+# stronger model / beam while the live queue is empty, on a model instance
+# of their own.  If REFINE_MODEL_SIZE is None or fails to load, refinement is
+# off -- it never borrows the live model out from under the transcriber.
+REFINE_ENABLED     = True
+REFINE_MODEL_SIZE  = "base.en"
+REFINE_BEAM_SIZE   = 5
+REFINE_CPU_THREADS = 2       # leave the other cores to the live model
+REFINE_HISTORY     = 8       # finals eligible for refinement
 
 # ─── Logging ──────────────────────────────────────────────────────────────────
 
@@ -62,227 +185,746 @@ load_dotenv()
 LOG_DIR = "logs"
 os.makedirs(LOG_DIR, exist_ok=True)
 dt_str   = datetime.now(ZoneInfo("America/Chicago")).strftime("%Y-%m-%d_%H-%M-%S")
-LOG_FILE = f"{LOG_DIR}/{dt_str}.txt"
+# Finals, written by the writer thread: fsync'd within a second, rotated
+# daily / past 64 MB; recent lines can be revised in place by the refiner
+transcript_log = TranscriptWriter(LOG_DIR, dt_str)
+# Every final as a record (session, stream offset, confidence, model) in
+# logs/transcripts.db with a full-text index: `python transcript_store.py search ...`
+STORE_ENABLED    = True
+transcript_store = (TranscriptStore(session=dt_str, stream=f"{PICO_W_IP}:{UDP_PORT}")
+                    if STORE_ENABLED else None)
+# logs/<session>.srt / .vtt, timed by stream sample offsets and appended cue
+# by cue during the session (subtitle_export.py)
+SUBTITLES_ENABLED = True
+subtitles = SubtitleWriter(f"{LOG_DIR}/{dt_str}", FS) if SUBTITLES_ENABLED else None
 
 # ─── Shared state ─────────────────────────────────────────────────────────────
 
 stop_event      = threading.Event()   # signals threads to exit cleanly
 running_event   = threading.Event()   # controls whether transcription is active
 
-# Priority queue: (priority, counter, audio, kind)
-trans_queue = queue.PriorityQueue(maxsize=20)
+# Priority queue: (priority, counter, pcm, kind, span), bounded by bytes
+#   pcm  = int16 DC-blocked samples, un-normalised
+#   span = (start_sample, end_sample, gain) -- absolute offsets into mel_cache
+trans_queue = ByteBudgetPriorityQueue(int(TRANS_QUEUE_MB * MB))
 _pq_counter = 0
 _pq_lock    = threading.Lock()
 
-# GUI update queue: ("interim", text) | ("final", text) | ("status", text) | ("stats", text)
-gui_queue = queue.Queue()
-
-# ─── DC-block filter ──────────────────────────────────────────────────────────
-
-_b_dc   = np.array([1.0, -1.0],   dtype=np.float64)
-_a_dc   = np.array([1.0, -0.999], dtype=np.float64)
-_zi_dc  = signal.lfilter_zi(_b_dc, _a_dc) * 0.0
-_dc_lck = threading.Lock()
-
-def dc_block(x: np.ndarray) -> np.ndarray:
-    global _zi_dc
-    with _dc_lck:
-        y, _zi_dc = signal.lfilter(_b_dc, _a_dc, x, zi=_zi_dc)
-    return y.astype(np.float32)
+# Overflow tier behind trans_queue.  Records: int16 audio + {kind, span,
+# session, captured}; span offsets are only meaningful within the same
+# session, its gain always applies.
+spill = SpillLog(SPILL_FILE, max_mb=SPILL_MAX_MB)
+
+# Adapts interim rate / max segment / beam to the measured RTF (backpressure.py).
+# MAX_CLIP_SEC, INTERIM_INTERVAL_SEC and BEAM_SIZE are its starting point.
+controller   = BackpressureController(TARGET_DELAY_SEC, INTERIM_INTERVAL_SEC, MAX_CLIP_SEC, BEAM_SIZE)
+samples_seen = 0     # absolute offset of processed audio -- live edge for queue delay
+
+thermal = ThermalGovernor(SysfsReader(os.getenv("ESCRIBE_SYSFS_ROOT", "/")),
+                          THERMAL_WARM_C, THERMAL_HOT_C, THERMAL_CRITICAL_C)
+
+# Scores every decode; rejects hallucinations, re-decodes low-confidence finals once
+gate = ConfidenceGate()
+
+# Context carried from final to final; bound to the tokenizer by model_loader()
+prompt_context = PromptContext(PROMPT_MAX_TOKENS, PROMPT_HISTORY,
+                               load_vocabulary(PROMPT_VOCAB_FILE)) if PROMPT_CONTEXT else None
+
+# Early finals: VAD verdict vs. decode result, keyed by the clip's end sample
+speculation = SpeculativeFinals()
+_final_ids  = itertools.count(1)
+
+# GUI update queue: ("partial", (utt, text)) | ("retract", utt)
+#                   | ("final", (id, utt, when, text)) | ("revise", (id, when, text))
+#                   | ("status", text) | ("stats", text) | ("model", text)
+#   utt = utterance id: the start sample of the segment, shared by an
+#   utterance's interims and its final (negative for replays without a span)
+#   when = time.time() of the final; the GUI thread formats it
+gui_queue = WakeQueue()
+
+# The caption items also go to browser viewers (caption_server.py); the
+# broadcaster only appends to a shared ring, it never waits on a client
+captions = CaptionBroadcaster()
+
+# ... and to local renderers through shared memory (caption_shm.py)
+caption_sink = None
+if CAPTION_SHM_ENABLED:
+    try:
+        caption_sink = CaptionSink(CAPTION_SHM, fifo=CAPTION_FIFO_ENABLED)
+    except OSError as exc:
+        print(f"Caption shared memory unavailable: {exc}")
+
+def _show(item: tuple) -> None:
+    """A "partial" / "retract" / "final" / "revise" item for every display."""
+    gui_queue.put(item)
+    if CAPTION_SERVER_ENABLED:
+        captions.publish(*item)
+    if caption_sink is not None:
+        caption_sink.publish(*item)
+
+# Log-mel frames for every processed sample.  Interims re-send the whole
+# utterance prefix, but its frames are only ever computed once, here, in the
+# UDP thread.  Built from the filterbank alone so it fills during model load.
+mel_cache         = LogMelCache.for_whisper(N_MELS, MEL_CACHE_SECONDS, FS) if USE_MEL_CACHE else None
+feature_extractor = None   # installed on the model by _install_model()
+
+# ─── Model (loaded in the background) ─────────────────────────────────────────
+
+model       = None                 # set by _install_model()
+model_name  = MODEL_SIZE
+model_ready = threading.Event()
+live_busy   = threading.Event()    # set while transcribe_loop is decoding
+
+# Finals captured before model_ready: (priority, counter, pcm, kind, span).
+# Bounded by bytes, not items -- one item can be 0.4 s or 12 s of audio.
+startup_backlog       = deque()
+startup_backlog_bytes = 0
+_backlog_lock         = threading.Lock()
+
+def _install_model(name: str, m: "WhisperModel") -> None:
+    """
+    Make m the live model: at startup, and on the transcribe thread between
+    clips after a swap.  The mel cache is only used by models with its mel
+    count; the prompt is re-tokenised for the new tokenizer.
+    """
+    global model, model_name, feature_extractor
+    if mel_cache is not None and m.feature_extractor.mel_filters.shape[0] == mel_cache.n_mels:
+        feature_extractor = install_feature_cache(m)
+    else:
+        feature_extractor = None   # N_MELS differs -- extract from audio instead
+
+    if prompt_context is not None:
+        prompt_context.bind(m.hf_tokenizer)
+
+    model, model_name = m, name
+
+def _load_replacement(name: str) -> "WhisperModel":
+    """Loader for ModelSwapper: same path as startup, on the swap thread."""
+    m, report = start_model(name, DEVICE, COMPUTE_TYPE, cpu_threads=CPU_THREADS)
+    print(f"Replacement model ready -- {format_report(report)}")
+    return m
+
+swapper = ModelSwapper(_load_replacement, MODEL_SIZE,
+                       on_event=lambda text: gui_queue.put(("model", text)))
+
+def model_loader() -> None:
+    """Import faster-whisper, load and warm up the model, then release the backlog."""
+    try:
+        t0 = time.monotonic()
+        # Offline cache only, path load, warm-up decode on a synthetic
+        # clip, timings appended to logs/startup_bench.jsonl
+        m, report = start_model(
+            MODEL_SIZE, DEVICE, COMPUTE_TYPE, cpu_threads=CPU_THREADS,
+            on_stage=lambda text: gui_queue.put(("model", f"⟳ {text}")),
+        )
+        _install_model(MODEL_SIZE, m)
+        swapper.install(MODEL_SIZE, m)
+        model_ready.set()
+        notify_systemd("READY=1")
+        elapsed = time.monotonic() - t0
+        print(f"Model ready in {elapsed:.1f}s -- {format_report(report)}")
+        gui_queue.put(("model", f"{MODEL_SIZE} · ready ({elapsed:.0f}s)"))
+    except Exception as exc:
+        print(f"Model load failed: {exc!r}")
+        gui_queue.put(("model", "✖ Model failed to load"))
+        gui_queue.put(("status", f"⚠ {exc}"))
+
+def _backlog_put(item: tuple) -> bool:
+    """
+    Hold a segment until the model is ready (or the backlog has drained).
+    Returns False once the model is ready and the backlog is empty, i.e.
+    the caller should use trans_queue.  Oldest finals are evicted when the
+    byte budget is exceeded.
+    """
+    global startup_backlog_bytes
+    with _backlog_lock:
+        if model_ready.is_set() and not startup_backlog:
+            return False
+        _, _, audio, kind, _ = item
+        if kind != "final":
+            return True           # stale by the time the backlog drains
+        budget = int(STARTUP_BACKLOG_MB * MB)
+        startup_backlog.append(item)
+        startup_backlog_bytes += audio.nbytes
+        evicted = 0
+        while startup_backlog_bytes > budget and len(startup_backlog) > 1:
+            old = startup_backlog.popleft()
+            startup_backlog_bytes -= old[2].nbytes
+            evicted += 1
+        n, mb = len(startup_backlog), startup_backlog_bytes / 1e6
+    msg = f"Buffered {n} segment(s), {mb:.1f} MB while the model loads"
+    if evicted:
+        msg += f" — {evicted} oldest dropped"
+    gui_queue.put(("stats", msg))
+    return True
+
+def _backlog_get():
+    """Pop the oldest held segment, or None when the backlog is empty."""
+    global startup_backlog_bytes
+    with _backlog_lock:
+        if not startup_backlog:
+            return None
+        item = startup_backlog.popleft()
+        startup_backlog_bytes -= item[2].nbytes
+        if not startup_backlog:
+            gui_queue.put(("stats", "Startup backlog drained"))
+        return item
 
 # ─── Segment flusher ──────────────────────────────────────────────────────────
 
-def _flush_segment(frames: list, kind: str = "final") -> None:
+def _flush_segment(pcm: np.ndarray, kind: str = "final", end_sample: int = 0) -> bool:
+    """
+    Queue one int16 segment (owned by the caller -- pass a copy).  The
+    peak-normalising gain rides along in span and is applied by
+    to_float32() at the model, so the queue holds 2 bytes per sample.
+
+    kind is "final", "interim" or "early" (a speculative final, which is
+    only ever queued in memory).  Returns False if the segment was dropped.
+    """
     global _pq_counter
-    if not frames:
-        return
-    audio = np.concatenate(frames)
-    dur   = len(audio) / FS
-    if dur < MIN_CLIP_SEC:
-        return
-    peak = np.max(np.abs(audio))
-    if peak > 0:
-        audio = audio / peak * 0.5
-    priority = 0 if kind == "final" else 1
+    if len(pcm) / FS < MIN_CLIP_SEC:
+        return False
+    span = (end_sample - len(pcm), end_sample, clip_gain(pcm))
+    priority = 1 if kind == "interim" else 0
     with _pq_lock:
         _pq_counter += 1
         counter = _pq_counter
+    item = (priority, counter, pcm, kind, span)
+    if kind == "early":
+        try:
+            trans_queue.put_nowait(item)
+            return True
+        except queue.Full:
+            return False               # the regular final will follow
+    if _backlog_put(item):
+        return True
+    if kind == "final" and len(spill):
+        return _spill_final(pcm, span) # already spilling -- keep finals in order
     try:
-        trans_queue.put_nowait((priority, counter, audio, kind))
+        trans_queue.put_nowait(item)
+        return True
     except queue.Full:
-        gui_queue.put(("status", "⚠ Queue full — dropping segment"))
+        # Make room by dropping a queued interim first
+        if _shed_queued_interim():
+            controller.note_shed()
+            try:
+                trans_queue.put_nowait(item)
+                return True
+            except queue.Full:
+                pass
+        if kind == "final":
+            return _spill_final(pcm, span)
+        controller.note_shed()         # an interim is never worth a disk write
+        return False
+
+def _spill_final(pcm: np.ndarray, span: tuple) -> bool:
+    meta = {"kind": "final", "span": list(span), "session": dt_str, "captured": time.time()}
+    if spill.append(pcm, meta):
+        gui_queue.put(("stats", spill.stats()))
+        return True
+    controller.note_shed()
+    gui_queue.put(("status", "⚠ Spill log full — dropping segment"))
+    return False
+
+def _shed_queued_interim() -> bool:
+    """Remove the newest queued interim from trans_queue; True if one was removed."""
+    return trans_queue.remove_where(lambda it: it[3] == "interim",
+                                    pick=lambda found: max(found, key=lambda it: it[1]))
+
+def _can_speculate() -> bool:
+    """Early finals only when the live path is keeping up -- never into the backlog or spill."""
+    return (EARLY_FINAL and model_ready.is_set() and not startup_backlog
+            and not len(spill) and controller.level == 0)
+
+def _cancel_early(key: int) -> None:
+    """Speech resumed after an early final: drop it from the queue, or its result."""
+    speculation.cancel(key)
+    if trans_queue.remove_where(lambda it: it[3] == "early" and it[4][1] == key):
+        speculation.cancelled_before_decode(key)   # never reaches the transcriber
+
+def _commit_early(key: int) -> None:
+    """Silence held: publish the early final now if its decode is already done."""
+    result = speculation.commit(key)
+    if result is not None:
+        _publish_final(*result)
 
 # ─── UDP receive + VAD thread ─────────────────────────────────────────────────
 
 def udp_vad_loop() -> None:
-    sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
-    sock.bind(("0.0.0.0", UDP_PORT))
-    sock.settimeout(1.0)
-
-    def send_hello():
-        try:
-            with socket.socket(socket.AF_INET, socket.SOCK_DGRAM) as s:
-                s.sendto(b"HELLO", (PICO_W_IP, UDP_PORT))
-        except OSError:
-            pass
-
-    send_hello()
+    global samples_seen
+    rx       = PicoReceiver(PICO_W_IP, UDP_PORT)
+    dc_block = DcBlocker()
+    # int16 frames in the pre-roll; the VAD itself only looks at rms
+    vad      = EnergyVad(VAD_THRESHOLD, VAD_SPEECH_ONSET, VAD_SILENCE_END, VAD_PRE_ROLL)
+
+    def skip_samples(n: int) -> None:
+        # Audio that never reached the VAD (lost, paused, Pico W silent)
+        # still moves the stream offset, so spans and subtitle cues stay
+        # on the recording's clock; the mel cache gets silence to match
+        global samples_seen
+        if mel_cache is not None:
+            mel_cache.push_silence(n)
+        samples_seen += n
+
+    def end_utterance() -> None:
+        nonlocal last_interim_time
+        vad.reset()
+        current_seg.clear()
+        last_interim_time = 0.0
+
+    rx.hello()
     gui_queue.put(("status", "⟳ Waiting for Pico W..."))
 
-    state             = "SILENCE"
-    speech_count      = 0
-    silence_count     = 0
-    pre_roll          = []
-    current_seg       = []
+    # int16, preallocated: MAX_SEGMENT_CAP_SEC plus a second for pre-roll / packet slack
+    current_seg       = PcmBuffer(int((MAX_SEGMENT_CAP_SEC + 1.0) * FS * 2))
     last_interim_time = 0.0
-    last_seq          = None
-    recv_count        = 0
-    drop_count        = 0
+    early_key         = None        # end sample of the pending early final
+    clock             = StreamClock(FS)   # lost packets / dead air -> samples to skip
     pico_connected    = False
 
     try:
         while not stop_event.is_set():
             # If not actively transcribing, drain packets silently to stay connected
             if not running_event.is_set():
-                try:
-                    sock.recvfrom(4096)
-                except socket.timeout:
-                    send_hello()
+                packet = rx.recv()
+                if packet is not None:
+                    n = len(packet[1])
+                    skip_samples(clock.packet(packet[0], n, time.monotonic()) + n)
                 # Reset VAD state when paused so we start clean on resume
-                state         = "SILENCE"
-                speech_count  = 0
-                silence_count = 0
-                pre_roll      = []
-                current_seg   = []
+                end_utterance()
+                if early_key is not None:
+                    _cancel_early(early_key)
+                    early_key = None
                 continue
 
-            try:
-                data, _ = sock.recvfrom(4096)
-            except socket.timeout:
-                send_hello()
+            packet = rx.recv()
+            if packet is None:
                 if pico_connected:
                     pico_connected = False
                     gui_queue.put(("status", "⚠ Pico W not responding..."))
                 continue
 
-            if len(data) < 5:
-                continue
-
             if not pico_connected:
                 pico_connected = True
                 gui_queue.put(("status", "● Connected"))
 
-            seq, _    = struct.unpack_from(">HH", data, 0)
-            payload   = data[4:]
-            n_samples = len(payload) // 2
-
-            if last_seq is not None:
-                gap = (seq - last_seq - 1) & 0xFFFF
-                if 0 < gap < 200:
-                    drop_count += gap
-            last_seq    = seq
-            recv_count += 1
-
-            frame_i16 = np.frombuffer(payload, dtype="<i2").copy()
-            frame_f32 = frame_i16.astype(np.float32) / 32768.0
-            frame_f32 = dc_block(frame_f32)
-
-            rms = float(np.sqrt(np.mean(frame_f32 ** 2)))
-
-            if state == "SILENCE":
-                pre_roll.append(frame_f32)
-                if len(pre_roll) > VAD_PRE_ROLL:
-                    pre_roll.pop(0)
-                if rms > VAD_THRESHOLD:
-                    speech_count += 1
-                    if speech_count >= VAD_SPEECH_ONSET:
-                        state             = "SPEECH"
-                        current_seg       = list(pre_roll)
-                        pre_roll          = []
-                        speech_count      = 0
-                        silence_count     = 0
-                        last_interim_time = time.monotonic()
-                else:
-                    speech_count = 0
-
-            else:  # SPEECH
-                current_seg.append(frame_f32)
+            seq, frame_i16 = packet
+            n_samples      = len(frame_i16)
+
+            missing = clock.packet(seq, n_samples, time.monotonic())
+            if missing:
+                if vad.state == SPEECH and missing >= VAD_SILENCE_END * n_samples:
+                    # Longer than the silence hold: the utterance ended in the gap
+                    if early_key is not None:
+                        _cancel_early(early_key)
+                        early_key = None
+                    _flush_segment(current_seg.pcm().copy(), kind="final", end_sample=samples_seen)
+                    end_utterance()
+                elif vad.state == SPEECH:
+                    current_seg.append(np.zeros(missing, dtype=np.int16))   # dropout inside speech
+                vad.pre_roll.clear()
+                skip_samples(missing)
+
+            frame_f32 = dc_block(frame_i16)
+
+            if mel_cache is not None:
+                mel_cache.push(frame_f32)
+            samples_seen += len(frame_f32)
+
+            rms       = frame_rms(frame_f32)
+            frame_pcm = to_int16(frame_f32)
+
+            event = vad.push(frame_pcm, rms)
+            if event == ONSET:
+                current_seg.clear()
+                current_seg.extend(vad.take_pre_roll())
+                last_interim_time = time.monotonic()
+
+            elif vad.state == SPEECH or event == END:
+                if not current_seg.append(frame_pcm):
+                    # Buffer cap reached before max_segment -- close the segment here
+                    if early_key is not None:
+                        _cancel_early(early_key)
+                        early_key = None
+                    _flush_segment(current_seg.pcm().copy(), kind="final",
+                                   end_sample=samples_seen - len(frame_pcm))
+                    current_seg.clear()
+                    current_seg.append(frame_pcm)
 
                 now_t    = time.monotonic()
-                clip_dur = len(current_seg) * n_samples / FS
-                if (clip_dur >= INTERIM_INTERVAL_SEC and
-                        (now_t - last_interim_time) >= INTERIM_INTERVAL_SEC):
-                    _flush_segment(list(current_seg), kind="interim")
+                clip_dur = len(current_seg) / FS
+                interval = controller.interim_interval      # None = interims off
+                if (interval is not None and clip_dur >= interval and
+                        (now_t - last_interim_time) >= interval):
+                    _flush_segment(current_seg.pcm().copy(), kind="interim", end_sample=samples_seen)
                     last_interim_time = now_t
 
-                if rms < VAD_THRESHOLD:
-                    silence_count += 1
-                    if silence_count >= VAD_SILENCE_END:
-                        _flush_segment(current_seg, kind="final")
-                        state             = "SILENCE"
-                        current_seg       = []
-                        silence_count     = 0
-                        speech_count      = 0
-                        last_interim_time = 0.0
-                else:
-                    silence_count = 0
-
-                clip_dur = len(current_seg) * n_samples / FS
-                if clip_dur >= MAX_CLIP_SEC:
-                    _flush_segment(current_seg, kind="final")
-                    current_seg       = []
-                    silence_count     = 0
+                if (vad.silence_count == VAD_EARLY_END and early_key is None
+                        and _can_speculate()):
+                    # Likely end of utterance: start the final's decode now.
+                    # open() first -- the transcriber may resolve the clip
+                    # before _flush_segment even returns
+                    speculation.open(samples_seen)
+                    if _flush_segment(current_seg.pcm().copy(), kind="early", end_sample=samples_seen):
+                        early_key = samples_seen
+                    else:
+                        speculation.discard(samples_seen)   # never queued
+                elif vad.silence_count == 0 and event is None and early_key is not None:
+                    _cancel_early(early_key)          # not the end after all
+                    early_key = None
+
+                if event == END:
+                    if early_key is not None:
+                        _commit_early(early_key)      # no second decode
+                        early_key = None
+                    else:
+                        _flush_segment(current_seg.pcm().copy(), kind="final", end_sample=samples_seen)
+                    end_utterance()
+
+                elif len(current_seg) / FS >= controller.max_segment:
+                    if early_key is not None:
+                        _cancel_early(early_key)
+                        early_key = None
+                    _flush_segment(current_seg.pcm().copy(), kind="final", end_sample=samples_seen)
+                    current_seg.clear()
+                    vad.split()
                     last_interim_time = time.monotonic()
 
             # Packet stats every 500 packets
-            if recv_count > 0 and recv_count % 500 == 0:
-                pct = 100.0 * drop_count / max(recv_count + drop_count, 1)
-                gui_queue.put(("stats", f"Packets: {recv_count}  Dropped: {drop_count} ({pct:.1f}%)"))
+            if rx.received % 500 == 0:
+                drop_count = clock.lost_packets
+                pct = 100.0 * drop_count / max(rx.received + drop_count, 1)
+                gui_queue.put(("stats", f"Packets: {rx.received}  Dropped: {drop_count} ({pct:.1f}%)  "
+                                        f"Queue: {trans_queue.usage()}"))
 
     finally:
-        sock.close()
+        rx.close()
 
 # ─── Transcription thread ─────────────────────────────────────────────────────
 
-def transcribe_loop(model: WhisperModel) -> None:
-    with open(LOG_FILE, "a") as log:
+def _transcribe_clip(model: "WhisperModel", pcm: np.ndarray, span: tuple, beam_size: int = 1,
+                     temperature=0, prompt=None):
+    """
+    Transcribe one VAD clip.  When its frames are still in mel_cache the
+    spectrogram is not recomputed; the Silero pass is skipped on that path
+    because the clip is already energy-VAD gated and trimming it would put
+    the audio out of step with the cached frames.
+
+    pcm is the queued int16 clip; it becomes normalised float32 only here.
+    The rolling prompt is passed as cached token ids, unless the caller
+    passes its own (a slice continuing earlier slices of the same clip).
+    """
+    audio  = to_float32(pcm, span[2] if span else 1.0)
+    if prompt is None and prompt_context is not None:
+        prompt = prompt_context.tokens()
+    if USE_MEL_CACHE and feature_extractor is not None and span is not None:
+        start_sample, end_sample, gain = span
+        try:
+            window = mel_cache.window(start_sample, end_sample, gain)
+        except ValueError:
+            window = None      # aged out of the cache -- extract from audio
+        if window is not None:
+            with feature_extractor.use(window):
+                return model.transcribe(
+                    audio,
+                    beam_size=beam_size,
+                    temperature=temperature,
+                    vad_filter=False,
+                    condition_on_previous_text=False,
+                    initial_prompt=prompt,
+                    language="en",
+                )
+
+    return model.transcribe(
+        audio,
+        beam_size=beam_size,
+        temperature=temperature,
+        vad_filter=True,
+        condition_on_previous_text=False,
+        initial_prompt=prompt,
+        language="en",
+    )
+
+def _publish_final(audio: np.ndarray, span: tuple, utt: int, hyp, elapsed: float) -> None:
+    """Show, log and queue for refinement one final (hyp None = rejected, nothing to do)."""
+    if hyp is None:
+        return
+    final_id = next(_final_ids)
+    if prompt_context is not None:
+        prompt_context.add_final(hyp.text)
+    when     = time.time()     # formatted by the GUI and writer threads, not here
+    _show(("final", (final_id, utt, when, hyp.text)))
+    handle = transcript_log.append(f"({elapsed:.2f}s) {hyp.text}", when)
+    if STORE_ENABLED:
+        transcript_store.add(final_id, hyp.text, when,
+                             span[0] / FS if span else None, span[1] / FS if span else None,
+                             hyp.avg_logprob, model_name)
+    if subtitles is not None and span is not None:
+        subtitles.add(final_id, span[0], span[1], hyp.text)
+    if REFINE_ENABLED:
+        refiner.submit(final_id, audio, span[2] if span else 1.0, hyp,
+                       {"when": when, "elapsed": elapsed, "log": handle})
+
+def _slice_points(pcm: np.ndarray) -> list:
+    """
+    Cut points for a streamed decode: about every STREAM_SLICE_SEC, moved to
+    the quietest 10 ms hop within STREAM_SEARCH_SEC so words are not split.
+    Cuts fall on hop boundaries, where the cached mel frames line up.
+    """
+    hop, n = 160, len(pcm)
+    step, reach = int(STREAM_SLICE_SEC * FS / hop), int(STREAM_SEARCH_SEC * FS / hop)
+    hops = n // hop
+    if hops <= step + step // 2 + reach:
+        return [0, n]
+    energy = np.square(pcm[:hops * hop].astype(np.float32)).reshape(hops, hop).sum(axis=1)
+    cuts, last = [0], 0
+    while hops - last > step + step // 2 + reach:
+        lo, hi = last + step - reach, last + step + reach
+        last   = lo + int(np.argmin(energy[lo:hi]))
+        cuts.append(last * hop)
+    cuts.append(n)
+    return cuts
+
+def _decode_streaming(model: "WhisperModel", pcm: np.ndarray, span: tuple, utt: int,
+                      beam_size: int) -> list:
+    """
+    Decode a clip slice by slice, publishing the text so far after each
+    slice -- on a long forced flush the first sentence is on screen after
+    one slice's decode, not the whole clip's.  Each slice is prompted with
+    the text before it.  Returns all the segments.
+    """
+    cuts = _slice_points(pcm)
+    decoded, parts = [], []
+    for a, b in zip(cuts, cuts[1:]):
+        sub    = span if len(cuts) == 2 or span is None else (span[0] + a, span[0] + b, span[2])
+        carry  = " ".join(parts)
+        prompt = None
+        if carry:
+            prompt = prompt_context.tokens_with(carry) if prompt_context is not None else carry
+        segments, _ = _transcribe_clip(model, pcm[a:b], sub, beam_size, prompt=prompt)
+        for seg in segments:
+            decoded.append(seg)
+            if seg.text.strip():
+                parts.append(seg.text.strip())
+        if parts:
+            _show(("partial", (utt, " ".join(parts))))
+    return decoded
+
+def _next_queued():
+    """(item, source) from trans_queue, else the spill log, else wait briefly."""
+    try:
+        return trans_queue.get_nowait(), "queue"
+    except queue.Empty:
+        pass
+    rec = spill.peek(raw=True)
+    if rec is not None:
+        pcm, meta = rec
+        # Cached frames / live-edge offsets only exist for this session;
+        # from an earlier run only the gain still applies
+        if meta.get("session") == dt_str:
+            return (0, 0, pcm, meta["kind"], tuple(meta["span"])), "spill"
+        return (0, 0, to_float32(pcm, meta["span"][2]), meta["kind"], None), "spill"
+    try:
+        return trans_queue.get(timeout=1.0), "queue"
+    except queue.Empty:
+        return None, None
+
+def transcribe_loop() -> None:
+    while not model_ready.wait(timeout=1.0):
+        if stop_event.is_set():
+            return
+
+    if spill.recovered:
+        gui_queue.put(("stats", f"Replaying {spill.recovered} segment(s) from the previous run"))
+
+    try:
         while not stop_event.is_set():
-            try:
-                priority, _, audio, kind = trans_queue.get(timeout=1.0)
-            except queue.Empty:
+            # A replacement model takes over here, between two clips
+            swap = swapper.poll()
+            if swap is not None:
+                _install_model(*swap)
+                gui_queue.put(("model", f"{model_name} · ready (swapped)"))
+                gui_queue.put(("stats", swapper.stats()))
+
+            # A pause in the stream closes the subtitle cue being assembled
+            if subtitles is not None:
+                subtitles.tick(samples_seen)
+
+            # Sources, oldest first: startup backlog, trans_queue, spill log
+            item   = _backlog_get()
+            source = "backlog"
+            if item is None:
+                item, source = _next_queued()
+                if item is None:
+                    continue
+            priority, counter, audio, kind, span = item
+            utt = span[0] if span else -counter
+
+            # Queue delay in stream time: how far the live edge has moved
+            # past the end of this clip while it waited
+            delay = (samples_seen - span[1]) / FS if span else 0.0
+
+            def _done():
+                if source == "queue":
+                    trans_queue.task_done()
+                elif source == "spill":
+                    spill.commit()   # only now -- a crash mid-decode replays it
+
+            # Discard queued interims if not running (or stale under load)
+            if kind == "interim" and (not running_event.is_set() or controller.should_skip(kind, delay)):
+                _done()
                 continue
-
-            # Discard queued interims if not running
-            if not running_event.is_set():
-                trans_queue.task_done()
+            # ... and early finals that speech has already overtaken
+            if kind == "early" and speculation.cancelled_before_decode(span[1]):
+                _done()
                 continue
 
-            t0 = time.monotonic()
-            segments, _ = model.transcribe(
+            # One bad clip (a decode error, a swapped model that will not run)
+            # must not take the transcriber down with the backlog behind it
+            try:
+                live_busy.set()
+                t0 = time.monotonic()
+                segments = _decode_streaming(model, audio, span, utt, controller.beam_size)
+
+                # Score the greedy result; only low-confidence finals pay for a
+                # second decode, and not while the controller is shedding load
+                redecode = None
+                if kind != "interim" and controller.level <= 1:
+                    redecode = lambda: _transcribe_clip(model, audio, span, RETRY_BEAM_SIZE,
+                                                        RETRY_TEMPERATURES)[0]
+                raw = summarise(segments)
+                hyp = gate.check(raw, redecode)
+                if raw is not None and hyp is None:
+                    print(f"[gate] rejected {kind}: {raw.text!r}")
+                    _show(("retract", utt))     # take the streamed partial back down
+                    gui_queue.put(("stats", gate.stats()))
+
+                elapsed = time.monotonic() - t0
+                live_busy.clear()
+                if controller.observe(len(audio) / FS, elapsed, delay) or controller.decodes % 10 == 0:
+                    gui_queue.put(("stats", controller.stats()))
+
+                if kind == "early":
+                    # Publish now if the VAD already saw the silence hold, else
+                    # park the result until it does (or speech resumes)
+                    if speculation.resolve(span[1], (audio, span, utt, hyp, elapsed)) == COMMIT:
+                        _publish_final(audio, span, utt, hyp, elapsed)
+                elif kind == "final":
+                    _publish_final(audio, span, utt, hyp, elapsed)
+                elif hyp is not None and hyp is not raw:
+                    _show(("partial", (utt, hyp.text)))
+            except Exception as exc:
+                live_busy.clear()
+                print(f"[transcribe] {kind} clip {utt} failed: {exc!r}")
+                gui_queue.put(("status", f"⚠ Transcription error: {exc}"))
+                _show(("retract", utt))     # a streamed partial may be up
+                if kind == "early":
+                    speculation.cancel(span[1])
+
+            _done()
+    finally:
+        live_busy.clear()
+
+# ─── Refinement thread ────────────────────────────────────────────────────────
+
+def _live_idle() -> bool:
+    """
+    Nothing waiting for or inside the live decoder, and not under
+    backpressure (which includes a thermal floor -- refinement is pure heat).
+    """
+    return (not live_busy.is_set() and trans_queue.empty() and not startup_backlog
+            and not len(spill) and controller.level == 0)
+
+def _revise_final(final_id: int, hyp, meta: dict) -> None:
+    transcript_log.replace(meta["log"], f"({meta['elapsed']:.2f}s, refined) {hyp.text}")
+    if STORE_ENABLED:
+        transcript_store.revise(final_id, hyp.text, hyp.avg_logprob,
+                                refine_model_name)
+    if subtitles is not None:
+        subtitles.revise(final_id, hyp.text)     # only if its cue is not out yet
+    _show(("revise", (final_id, meta["when"], hyp.text)))
+    gui_queue.put(("stats", refiner.stats()))
+
+refiner = Refiner(is_idle=_live_idle, on_revise=_revise_final, history=REFINE_HISTORY)
+refine_model_name = None   # set once the refinement model loads
+
+def refine_loop() -> None:
+    """Load the refinement model once the live one is up, then refine while idle."""
+    while not model_ready.wait(timeout=1.0):
+        if stop_event.is_set():
+            return
+
+    def prepare():
+        # Runs at the refiner's lowered priority, so CTranslate2's threads
+        # for this model inherit it.  Always a separate instance: sharing the
+        # live model would put refinement decodes on the live path's threads.
+        # None = no refinement model, refinement off.
+        global refine_model_name
+        if not REFINE_MODEL_SIZE:
+            print("Refinement off: no REFINE_MODEL_SIZE")
+            return None
+        try:
+            refine_model, _ = load_model(REFINE_MODEL_SIZE, DEVICE, COMPUTE_TYPE,
+                                         cpu_threads=REFINE_CPU_THREADS)
+        except Exception as exc:
+            print(f"Refinement off: {REFINE_MODEL_SIZE} unavailable ({exc!r})")
+            gui_queue.put(("stats", f"Refinement off — {REFINE_MODEL_SIZE} unavailable"))
+            return None
+        refine_model_name = REFINE_MODEL_SIZE
+        gui_queue.put(("stats", f"Refining finals with {refine_model_name}, beam {REFINE_BEAM_SIZE}"))
+
+        def decode(audio: np.ndarray):
+            segments, _ = refine_model.transcribe(
                 audio,
-                beam_size=1,
+                beam_size=REFINE_BEAM_SIZE,
                 temperature=0,
                 vad_filter=True,
                 condition_on_previous_text=False,
                 language="en",
             )
-
-            parts = [seg.text.strip() for seg in segments if seg.text.strip()]
-
-            if parts:
-                elapsed = time.monotonic() - t0
-                text    = " ".join(parts)
-                ts      = datetime.now(ZoneInfo("America/Chicago")).strftime("%H:%M:%S")
-
-                if kind == "interim":
-                    gui_queue.put(("interim", text))
-                else:
-                    line = f"[{ts}]  {text}"
-                    gui_queue.put(("final", line))
-                    log.write(f"[{ts}] ({elapsed:.2f}s) {text}\n")
-                    log.flush()
-
-            trans_queue.task_done()
+            return segments
+        return decode
+
+    refiner.run(stop_event, prepare)
+
+# ─── Thermal thread ───────────────────────────────────────────────────────────
+
+def _thermal_downshift() -> None:
+    """Critical: the model itself is the remaining lever -- swap to the fallback."""
+    if swapper.name != THERMAL_FALLBACK and swapper.loading != THERMAL_FALLBACK:
+        print(f"[thermal] critical -- {swapper.request(THERMAL_FALLBACK)}")
+        gui_queue.put(("status", f"⚠ Thermal critical — switching to {THERMAL_FALLBACK}"))
+
+def thermal_loop() -> None:
+    """Sample every THERMAL_INTERVAL_SEC; pin the backpressure floor to the thermal level."""
+    samples = 0
+    while not stop_event.wait(THERMAL_INTERVAL_SEC):
+        samples += 1
+        if thermal.sample():
+            controller.set_floor(thermal.level)
+            print(f"[thermal] {thermal.decisions[-1][1]}")
+            gui_queue.put(("stats", thermal.stats()))
+            if THERMAL_LEVELS[thermal.level] == "critical":
+                _thermal_downshift()
+        elif samples % 12 == 0:
+            gui_queue.put(("stats", thermal.stats()))
+
+# ─── Control socket ───────────────────────────────────────────────────────────
+
+def _cmd_model(args: list) -> str:
+    if not args:
+        return f"{swapper.stats()}  (choices: {' '.join(MODEL_CHOICES)})"
+    return swapper.request(args[0])
+
+caption_server = CaptionServer(captions, port=CAPTION_PORT)
+
+def _cmd_status(args: list) -> str:
+    parts = [swapper.stats(), controller.stats(), thermal.stats(), caption_server.stats()]
+    if caption_sink is not None:
+        parts.append(caption_sink.stats())
+    return "  |  ".join(parts)
+
+control = ControlServer(CONTROL_SOCKET, {"model": _cmd_model, "status": _cmd_status})
 
 # ─── GUI ──────────────────────────────────────────────────────────────────────
 
@@ -297,12 +939,18 @@ class TranscriberApp:
     TEXT_STATUS = "#4ecca3"   # teal status text
     BUTTON_TEXT = "#ffffff"
 
-    def __init__(self, root: tk.Tk, model: WhisperModel):
+    def __init__(self, root: tk.Tk):
         self.root  = root
-        self.model = model
+        self._interim_utt = None    # utterance shown on the interim line
+        self._final_utt   = -1      # newest utterance with a final
+        self._view_ids    = deque() # final ids on screen, one line each, oldest first
+        self._trimmed     = 0       # finals trimmed off the top of the view
         self._build_ui()
         self._start_threads()
-        self._poll_gui_queue()
+        # Woken by the pipeline when there is something to show; polling
+        # only where Tk cannot watch the wake-up pipe
+        if not gui_queue.attach(root, self._apply_updates):
+            self._poll_gui_queue()
 
     # ── UI construction ───────────────────────────────────────────────────────
 
@@ -335,6 +983,21 @@ class TranscriberApp:
         )
         self.status_label.pack(side=tk.RIGHT, padx=14)
 
+        self.model_label = tk.Label(
+            top_bar, text="",
+            font=f_status, bg=self.PANEL_BG, fg=self.TEXT_DIM
+        )
+        self.model_label.pack(side=tk.RIGHT, padx=14)
+        self.model_label.bind("<Button-1>", self._model_menu)   # tap to switch model
+
+        # Shown once the view has been trimmed; opens the full session history
+        self.history_label = tk.Label(
+            top_bar, text="",
+            font=f_status, bg=self.PANEL_BG, fg=self.TEXT_STATUS, cursor="hand2"
+        )
+        self.history_label.pack(side=tk.RIGHT, padx=14)
+        self.history_label.bind("<Button-1>", lambda e: self._show_history())
+
         # ── Transcript area ───────────────────────────────────────────────────
         trans_frame = tk.Frame(root, bg=self.BG)
         trans_frame.pack(fill=tk.BOTH, expand=True, padx=10, pady=(6, 0))
@@ -400,9 +1063,23 @@ class TranscriberApp:
 
     def _start_threads(self):
         self.threads = [
-            threading.Thread(target=udp_vad_loop,                    daemon=True, name="udp-vad"),
-            threading.Thread(target=transcribe_loop, args=(self.model,), daemon=True, name="transcribe"),
+            threading.Thread(target=transcript_log.run, daemon=True, name="writer"),
+            threading.Thread(target=model_loader,    daemon=True, name="model-loader"),
+            threading.Thread(target=udp_vad_loop,    daemon=True, name="udp-vad"),
+            threading.Thread(target=transcribe_loop, daemon=True, name="transcribe"),
         ]
+        if STORE_ENABLED:
+            self.threads.append(threading.Thread(target=transcript_store.run, daemon=True, name="store"))
+        if REFINE_ENABLED:
+            self.threads.append(threading.Thread(target=refine_loop, daemon=True, name="refine"))
+        if THERMAL_ENABLED:
+            self.threads.append(threading.Thread(target=thermal_loop, daemon=True, name="thermal"))
+        if CAPTION_SERVER_ENABLED:
+            self.threads.append(threading.Thread(target=caption_server.run, args=(stop_event,),
+                                                 daemon=True, name="captions"))
+        if CONTROL_SOCKET_ENABLED:
+            self.threads.append(threading.Thread(target=control.serve, args=(stop_event,),
+                                                 daemon=True, name="control"))
         for t in self.threads:
             t.start()
 
@@ -419,41 +1096,134 @@ class TranscriberApp:
             self.btn.config(text="STOP", bg=self.ACCENT_STOP)
             self.status_label.config(text="⟳ Waiting for audio...", fg=self.TEXT_STATUS)
 
-    # ── GUI queue polling (runs on main thread via after()) ───────────────────
+    # ── Model menu ────────────────────────────────────────────────────────────
+
+    def _model_menu(self, event):
+        menu = tk.Menu(self.root, tearoff=0, font=("DejaVu Sans", 14))
+        for name in MODEL_CHOICES:
+            label = f"● {name}" if name == swapper.name else f"   {name}"
+            menu.add_command(label=label, command=lambda n=name: self._set_status(
+                f"⟳ {swapper.request(n)}"))
+        menu.tk_popup(event.x_root, event.y_root)
+
+    # ── GUI updates (main thread) ─────────────────────────────────────────────
+
+    def _apply_updates(self, items: list):
+        """One frame's worth of gui_queue items: finals in order, newest interim / labels only."""
+        for kind, text in latest_per_kind(items, ("partial", "status", "stats", "model")):
+            if kind == "partial":
+                self._set_interim(*text)
+            elif kind == "retract":
+                self._retract_interim(text)
+            elif kind == "final":
+                self._append_final(*text)
+            elif kind == "revise":
+                self._revise_final(*text)
+            elif kind == "status":
+                self._set_status(text)
+            elif kind == "stats":
+                self.stats_label.config(text=text)
+            elif kind == "model":
+                self._set_model_status(text)
 
     def _poll_gui_queue(self):
-        try:
-            while True:
-                kind, text = gui_queue.get_nowait()
-                if kind == "interim":
-                    self._set_interim(text)
-                elif kind == "final":
-                    self._append_final(text)
-                elif kind == "status":
-                    self._set_status(text)
-                elif kind == "stats":
-                    self.stats_label.config(text=text)
-        except queue.Empty:
-            pass
-        self.root.after(100, self._poll_gui_queue)   # poll every 100 ms
-
-    def _set_interim(self, text: str):
+        self._apply_updates(gui_queue.drain())
+        self.root.after(100, self._poll_gui_queue)   # no fd wake-ups: poll every 100 ms
+
+    def _set_interim(self, utt: int, text: str):
+        # An interim decoded after its utterance's final is stale
+        if utt >= 0 and utt <= self._final_utt:
+            return
+        self._interim_utt = utt
         self.interim_label.config(text=f"⟳  {text}")
 
-    def _append_final(self, text: str):
+    def _retract_interim(self, utt: int):
+        if utt == self._interim_utt:
+            self.interim_label.config(text="")
+
+    def _append_final(self, final_id: int, utt: int, when: float, text: str):
         # Clear interim when final arrives
+        self._final_utt = max(self._final_utt, utt)
         self.interim_label.config(text="")
         self.transcript.config(state=tk.NORMAL)
-        if self.transcript.get("1.0", tk.END).strip():
+        # One final per line; the line count is tracked, never read back
+        if self._view_ids:
             self.transcript.insert(tk.END, "\n")
-        self.transcript.insert(tk.END, text)
+        self.transcript.insert(tk.END, f"[{clock(when)}]  {text}".replace("\n", " "),
+                               (f"final-{final_id}",))   # tagged for _revise_final
+        self._view_ids.append(final_id)
+        if len(self._view_ids) > VIEW_MAX_FINALS + VIEW_TRIM_BATCH:
+            self._trim_view(len(self._view_ids) - VIEW_MAX_FINALS)
         self.transcript.config(state=tk.DISABLED)
         self.transcript.see(tk.END)    # auto-scroll to latest
 
+    def _trim_view(self, n: int):
+        """Drop the oldest n lines in one delete (batched, so amortised O(1) per final)."""
+        self.transcript.delete("1.0", f"{n + 1}.0")
+        for _ in range(n):
+            self.transcript.tag_delete(f"final-{self._view_ids.popleft()}")
+        self._trimmed += n
+        self.history_label.config(text=f"↑ {self._trimmed} earlier")
+
+    def _show_history(self):
+        """Session history from the transcript store, paged backwards on demand."""
+        if not STORE_ENABLED:
+            return
+        win = tk.Toplevel(self.root, bg=self.BG)
+        win.title("Session history")
+        win.geometry(f"{self.root.winfo_width()}x{self.root.winfo_height()}+0+0")
+        text = tk.Text(win, font=self.transcript.cget("font"), bg=self.BG, fg=self.TEXT_MAIN,
+                       relief=tk.FLAT, wrap=tk.WORD, padx=8, pady=6, spacing2=4)
+        bar  = tk.Frame(win, bg=self.PANEL_BG)
+        bar.pack(fill=tk.X, side=tk.BOTTOM)
+        text.pack(fill=tk.BOTH, expand=True, padx=10, pady=6)
+        db, _  = connect_store(STORE_PATH)
+        oldest = [None]     # final id of the oldest row shown
+
+        def older():
+            rows = session_finals(db, dt_str, oldest[0], HISTORY_PAGE)
+            if not rows:
+                more.config(state=tk.DISABLED, text="Start of session")
+                return
+            oldest[0] = rows[0]["final_id"]
+            page = "\n".join(f"[{clock(r['wall'])}]  {r['text']}" for r in rows)
+            text.config(state=tk.NORMAL)
+            text.insert("1.0", page + ("\n" if text.index("end-1c") != "1.0" else ""))
+            text.config(state=tk.DISABLED)
+            text.see(f"{len(rows)}.0")
+
+        def close():
+            db.close()
+            win.destroy()
+
+        more = tk.Button(bar, text="Earlier", font=("DejaVu Sans", 14), command=older,
+                         bg=self.ACCENT, fg=self.BUTTON_TEXT, relief=tk.FLAT, pady=10)
+        more.pack(side=tk.LEFT, fill=tk.X, expand=True, padx=(10, 5), pady=8)
+        tk.Button(bar, text="Close", font=("DejaVu Sans", 14), command=close,
+                  bg=self.ACCENT, fg=self.BUTTON_TEXT, relief=tk.FLAT, pady=10
+                  ).pack(side=tk.LEFT, fill=tk.X, expand=True, padx=(5, 10), pady=8)
+        win.protocol("WM_DELETE_WINDOW", close)
+        older()
+
+    def _revise_final(self, final_id: int, when: float, text: str):
+        """Swap a final's text for its refined version, in place."""
+        tag    = f"final-{final_id}"
+        ranges = self.transcript.tag_ranges(tag)
+        if not ranges:
+            return
+        self.transcript.config(state=tk.NORMAL)
+        self.transcript.delete(ranges[0], ranges[1])
+        self.transcript.insert(ranges[0], f"[{clock(when)}]  {text}".replace("\n", " "), (tag,))
+        self.transcript.config(state=tk.DISABLED)
+
     def _set_status(self, text: str):
         colour = self.TEXT_STATUS if "●" in text else self.TEXT_DIM
         self.status_label.config(text=text, fg=colour)
 
+    def _set_model_status(self, text: str):
+        colour = self.TEXT_STATUS if "ready" in text else self.TEXT_DIM
+        self.model_label.config(text=text, fg=colour)
+
     # ── Clean exit ────────────────────────────────────────────────────────────
 
     def _quit(self):
@@ -463,14 +1233,19 @@ class TranscriberApp:
 # ─── Entry point ──────────────────────────────────────────────────────────────
 
 if __name__ == "__main__":
-    print("Loading Whisper model...")
-    model = WhisperModel(MODEL_SIZE, device=DEVICE, compute_type=COMPUTE_TYPE)
-    print("Model loaded. Launching GUI...\n")
+    print("Launching GUI (model loads in the background)...\n")
 
     root = tk.Tk()
-    app  = TranscriberApp(root, model)
+    app  = TranscriberApp(root)
     root.mainloop()
 
     # Cleanup after window closes
     stop_event.set()
+    transcript_log.close()
+    if transcript_store is not None:
+        transcript_store.close()
+    if subtitles is not None:
+        subtitles.close()
+    if caption_sink is not None:
+        caption_sink.close()
     print("Goodbye")
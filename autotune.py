@@ -0,0 +1,237 @@
+"""
+Startup Auto-Tuner
+==================
+Picks MODEL_SIZE, COMPUTE_TYPE and cpu_threads for *this* machine instead of
+the per-script guesses.  Every candidate configuration is started in a fresh
+interpreter (so load time and peak RSS are its own) and timed on the
+calibration clip:
+
+    rtf           decode time / clip length (after warm-up, best of --repeats)
+    first_s       time until the first segment comes out of transcribe() --
+                  what a listener waits for on a long utterance
+    peak_rss_mb   peak resident memory of the whole process
+
+Choice: among candidates with first_s <= --target-latency, rtf <= --max-rtf
+(and peak RSS under --max-rss-mb if given), the largest model wins -- it is
+the accuracy knob -- and for that model the configuration with the lowest
+RTF.  The result goes to tuned_config.json, which the scripts read through
+model_startup.tuned_settings().
+
+    python autotune.py                                   # defaults below
+    python autotune.py --models tiny.en base.en small.en --compute-types int8 int8_float32 \\
+                       --threads 2 4 --target-latency 1.5 --max-rtf 0.5
+
+Calibration clip: calibration/clip.wav (16 kHz mono 16-bit) if present --
+record ~10 s of the actual lecturer through the Pico W for the most honest
+numbers.  Otherwise a deterministic synthetic speech-like clip is used; it
+exercises the encoder and decoder the same way but Whisper will emit little
+text for it, so first_s is then close to the full decode time.
+"""
+
+import argparse
+import json
+import os
+import platform
+import resource
+import subprocess
+import sys
+import time
+import wave
+from datetime import datetime
+
+import numpy as np
+
+from model_startup import FS, REPO_DIR, load_model, synthetic_clip, tuned_config_path, warm_up
+
+CALIBRATION_CLIP = os.path.join(REPO_DIR, "calibration", "clip.wav")
+
+DEFAULT_MODELS        = ["tiny.en", "base.en", "small.en"]
+DEFAULT_COMPUTE_TYPES = ["int8", "int8_float32", "float32"]
+
+# Larger = more accurate; unknown names rank by their position on the command line
+MODEL_RANK = {"tiny": 0, "base": 1, "small": 2, "medium": 3, "distil-large": 4,
+              "turbo": 4, "large": 5}
+
+
+def _rank(model: str, order: list) -> tuple:
+    stem = model.split(".")[0].split("/")[-1].replace("faster-whisper-", "")
+    base = next((r for name, r in MODEL_RANK.items() if stem.startswith(name)), -1)
+    return base, order.index(model) if model in order else 0
+
+
+# ─── Calibration clip ─────────────────────────────────────────────────────────
+
+def load_calibration_clip(path: str = CALIBRATION_CLIP) -> tuple:
+    """(float32 audio, source description)."""
+    if os.path.exists(path):
+        with wave.open(path, "rb") as w:
+            if w.getframerate() != FS or w.getnchannels() != 1 or w.getsampwidth() != 2:
+                raise ValueError(f"{path}: need {FS} Hz mono 16-bit PCM")
+            pcm = np.frombuffer(w.readframes(w.getnframes()), dtype="<i2")
+        return pcm.astype(np.float32) / 32768.0, path
+
+    # Three "phrases" with pauses, ~10 s -- a typical VAD segment length
+    pause = np.zeros(int(0.4 * FS), dtype=np.float32)
+    parts = []
+    for sec in (3.0, 2.5, 3.5):
+        parts += [synthetic_clip(sec), pause]
+    return np.concatenate(parts), "synthetic"
+
+
+# ─── One candidate (runs in a child process) ──────────────────────────────────
+
+def measure(model_size: str, compute_type: str, threads: int, clip_path: str,
+            repeats: int = 2) -> dict:
+    audio, source = load_calibration_clip(clip_path)
+    clip_s = len(audio) / FS
+
+    t0 = time.perf_counter()
+    model, _ = load_model(model_size, "cpu", compute_type, cpu_threads=threads)
+    load_s = time.perf_counter() - t0
+    warm_s = warm_up(model)
+
+    best = None
+    for _ in range(repeats):
+        t0 = time.perf_counter()
+        segments, _ = model.transcribe(audio, beam_size=1, temperature=0, vad_filter=False,
+                                       condition_on_previous_text=False, language="en")
+        first_s = None
+        for _seg in segments:
+            if first_s is None:
+                first_s = time.perf_counter() - t0
+        decode_s = time.perf_counter() - t0
+        run = (decode_s, first_s if first_s is not None else decode_s)
+        best = run if best is None or run[0] < best[0] else best
+
+    return {
+        "model":        model_size,
+        "compute_type": compute_type,
+        "cpu_threads":  threads,
+        "clip":         source,
+        "load_s":       round(load_s, 3),
+        "warm_up_s":    round(warm_s, 3),
+        "decode_s":     round(best[0], 3),
+        "first_s":      round(best[1], 3),
+        "rtf":          round(best[0] / clip_s, 3),
+        "peak_rss_mb":  round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1),
+    }
+
+
+def run_candidate(model_size: str, compute_type: str, threads: int, clip_path: str,
+                  repeats: int, timeout: float) -> dict:
+    """measure() in a fresh interpreter; failures come back as {"error": ...}."""
+    cmd = [sys.executable, os.path.abspath(__file__), "measure", model_size, compute_type,
+           str(threads), "--clip", clip_path, "--repeats", str(repeats)]
+    base = {"model": model_size, "compute_type": compute_type, "cpu_threads": threads}
+    try:
+        proc = subprocess.run(cmd, capture_output=True, text=True, timeout=timeout)
+    except subprocess.TimeoutExpired:
+        return {**base, "error": f"timed out after {timeout:.0f}s"}
+    for line in reversed(proc.stdout.splitlines()):
+        if line.startswith("{"):
+            return json.loads(line)
+    err = (proc.stderr.strip().splitlines() or ["no output"])[-1]
+    return {**base, "error": err}
+
+
+# ─── Choice ───────────────────────────────────────────────────────────────────
+
+def choose(results: list, target_latency: float, max_rtf: float, max_rss_mb: float = None,
+           order: list = ()):
+    ok = [r for r in results
+          if "error" not in r
+          and r["first_s"] <= target_latency
+          and r["rtf"] <= max_rtf
+          and (max_rss_mb is None or r["peak_rss_mb"] <= max_rss_mb)]
+    if not ok:
+        return None
+    top = max(_rank(r["model"], list(order)) for r in ok)
+    return min((r for r in ok if _rank(r["model"], list(order)) == top), key=lambda r: r["rtf"])
+
+
+def write_config(chosen: dict, results: list, args, clip: str, path: str) -> None:
+    doc = {
+        "time":    datetime.now().isoformat(timespec="seconds"),
+        "machine": {"platform": platform.platform(), "cpus": os.cpu_count()},
+        "clip":    clip,
+        "target":  {"latency_s": args.target_latency, "max_rtf": args.max_rtf,
+                    "max_rss_mb": args.max_rss_mb},
+        "chosen":  chosen,
+        "candidates": results,
+    }
+    tmp = path + ".tmp"
+    with open(tmp, "w") as f:
+        json.dump(doc, f, indent=2)
+    os.replace(tmp, path)
+
+
+def _print_row(r: dict, mark: str = " ") -> None:
+    head = f"{mark} {r['model']:<12}{r['compute_type']:<14}{r['cpu_threads']:>3}"
+    if "error" in r:
+        print(f"{head}   error: {r['error']}")
+    else:
+        print(f"{head}   RTF {r['rtf']:5.2f}  first {r['first_s']:5.2f}s  "
+              f"load {r['load_s']:5.2f}s  RSS {r['peak_rss_mb']:6.0f} MB")
+
+
+# ─── CLI ──────────────────────────────────────────────────────────────────────
+
+def main(argv=None) -> int:
+    cpus = os.cpu_count() or 4
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    sub = ap.add_subparsers(dest="cmd")
+
+    ap.add_argument("--models", nargs="+", default=DEFAULT_MODELS)
+    ap.add_argument("--compute-types", nargs="+", default=DEFAULT_COMPUTE_TYPES)
+    ap.add_argument("--threads", nargs="+", type=int, default=sorted({max(cpus // 2, 1), cpus}))
+    ap.add_argument("--target-latency", type=float, default=1.5,
+                    help="max seconds to the first segment of the calibration clip")
+    ap.add_argument("--max-rtf", type=float, default=0.5,
+                    help="max real-time factor (headroom for interims)")
+    ap.add_argument("--max-rss-mb", type=float, default=None)
+    ap.add_argument("--clip", default=CALIBRATION_CLIP)
+    ap.add_argument("--repeats", type=int, default=2)
+    ap.add_argument("--timeout", type=float, default=600.0, help="per candidate")
+    ap.add_argument("--output", default=None, help="default: $ESCRIBE_TUNED_CONFIG or tuned_config.json")
+    ap.add_argument("--dry-run", action="store_true", help="print the choice, write nothing")
+
+    p_one = sub.add_parser("measure", help=argparse.SUPPRESS)   # one candidate (child process)
+    p_one.add_argument("model")
+    p_one.add_argument("compute_type")
+    p_one.add_argument("threads", type=int)
+    p_one.add_argument("--clip", default=CALIBRATION_CLIP)
+    p_one.add_argument("--repeats", type=int, default=2)
+
+    args = ap.parse_args(argv)
+
+    if args.cmd == "measure":
+        print(json.dumps(measure(args.model, args.compute_type, args.threads, args.clip, args.repeats)))
+        return 0
+
+    _, clip = load_calibration_clip(args.clip)
+    print(f"Calibration clip: {clip}")
+    results = []
+    for m in args.models:
+        for ctype in args.compute_types:
+            for threads in args.threads:
+                r = run_candidate(m, ctype, threads, args.clip, args.repeats, args.timeout)
+                _print_row(r)
+                results.append(r)
+
+    chosen = choose(results, args.target_latency, args.max_rtf, args.max_rss_mb, args.models)
+    if chosen is None:
+        print(f"\nNo configuration meets first segment <= {args.target_latency}s "
+              f"and RTF <= {args.max_rtf}; nothing written.")
+        return 1
+
+    print("\nChosen:")
+    _print_row(chosen, "*")
+    if not args.dry_run:
+        path = args.output or tuned_config_path()
+        write_config(chosen, results, args, clip, path)
+        print(f"Wrote {path}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,144 @@
+"""
+Backpressure Controller
+=======================
+Adapts interim rate, maximum segment length and beam size to the measured
+real-time factor so the transcriber keeps up instead of dropping segments.
+
+Inputs (one call per decode):
+    audio_sec  -- length of the clip just decoded
+    decode_sec -- wall time the decode took          -> RTF = decode / audio
+    delay_sec  -- how far behind live audio the clip's end was when it was
+                  picked up (queue delay, measured in stream time)
+
+Both are smoothed (EWMA).  The controller walks a ladder of levels:
+
+    level     interims         beam       max segment   stale interims
+    normal    every 1x         configured 1x            decoded
+    relaxed   every 2x         1          1x            decoded
+    lean      off              1          1.5x          decoded
+    shedding  off              1          2x            skipped
+
+  * Longer segments are *cheaper*, not dearer: Whisper's encoder always runs
+    on a padded 30 s window, so two 6 s clips cost about twice one 12 s
+    clip.  Raising the cap (never past MAX_SEGMENT_CAP_SEC) amortises it.
+  * Interims are pure latency cosmetics -- the final re-decodes the same
+    audio -- so they are the first thing to go.
+  * Only the last level throws work away, and then only interims that a
+    newer result has already made stale.
+
+Escalate after HOT_DECODES consecutive decodes where the smoothed delay
+exceeds target or RTF >= 1 (falling behind by definition).  De-escalate
+after CALM_DECODES consecutive decodes with delay under a third of target
+and RTF comfortably below 1.
+
+set_floor() pins a minimum level from outside -- the thermal governor
+(thermal.py) uses it to step down before the RTF has a chance to suffer.
+"""
+
+import threading
+
+MAX_SEGMENT_CAP_SEC = 28.0   # stay inside one 30 s Whisper window
+HOT_DECODES         = 2      # consecutive "behind" decodes before stepping down
+CALM_DECODES        = 8      # consecutive calm decodes before stepping back up
+
+# name, interim scale (None = off), greedy, max-segment scale, skip stale interims
+LEVELS = (
+    ("normal",   1.0,  False, 1.0, False),
+    ("relaxed",  2.0,  True,  1.0, False),
+    ("lean",     None, True,  1.5, False),
+    ("shedding", None, True,  2.0, True),
+)
+
+
+class BackpressureController:
+    """Thread-safe: observe() from the transcriber, settings read from anywhere."""
+
+    def __init__(self, target_delay_sec: float = 2.0, interim_interval_sec: float = 1.5,
+                 max_segment_sec: float = 12.0, beam_size: int = 1, alpha: float = 0.3):
+        self.target_delay     = target_delay_sec
+        self.base_interim     = interim_interval_sec
+        self.base_max_segment = max_segment_sec
+        self.base_beam        = beam_size
+        self.alpha            = alpha
+
+        self.rtf      = 0.0
+        self.delay    = 0.0
+        self.level    = 0
+        self.floor    = 0       # minimum level imposed by set_floor()
+        self.decodes  = 0
+        self.shed     = 0       # segments / interims discarded
+        self._hot     = 0
+        self._calm    = 0
+        self._lock    = threading.Lock()
+        self._apply(0)
+
+    # ── Settings (read by the VAD and transcribe threads) ─────────────────────
+
+    def _apply(self, level: int) -> None:
+        _, interim_scale, greedy, seg_scale, skip = LEVELS[level]
+        self.level            = level
+        self.interim_interval = None if interim_scale is None else self.base_interim * interim_scale
+        self.beam_size        = 1 if greedy else self.base_beam
+        self.max_segment      = min(self.base_max_segment * seg_scale, MAX_SEGMENT_CAP_SEC)
+        self.skip_stale       = skip
+
+    @property
+    def level_name(self) -> str:
+        return LEVELS[self.level][0]
+
+    # ── Feedback ──────────────────────────────────────────────────────────────
+
+    def observe(self, audio_sec: float, decode_sec: float, delay_sec: float) -> bool:
+        """Feed one decode; returns True when the level changed."""
+        rtf = decode_sec / max(audio_sec, 1e-3)
+        with self._lock:
+            a = self.alpha if self.decodes else 1.0
+            self.rtf     = a * rtf + (1 - a) * self.rtf
+            self.delay   = a * delay_sec + (1 - a) * self.delay
+            self.decodes += 1
+
+            behind = self.delay > self.target_delay or self.rtf >= 1.0
+            calm   = self.delay < self.target_delay / 3 and self.rtf < 0.7
+
+            level = self.level
+            self._hot  = self._hot + 1 if behind else 0
+            self._calm = self._calm + 1 if calm else 0
+            if self._hot >= HOT_DECODES and level < len(LEVELS) - 1:
+                level += 1
+                self._hot = 0
+            elif self._calm >= CALM_DECODES and level > self.floor:
+                level -= 1
+                self._calm = 0
+
+            changed = level != self.level
+            if changed:
+                self._apply(level)
+            return changed
+
+    def set_floor(self, level: int) -> bool:
+        """Never run below level (0 releases); True if the active level changed."""
+        with self._lock:
+            self.floor = max(0, min(level, len(LEVELS) - 1))
+            if self.level < self.floor:
+                self._apply(self.floor)
+                return True
+            return False
+
+    def should_skip(self, kind: str, delay_sec: float) -> bool:
+        """Last resort: drop an interim that is already older than the target."""
+        if self.skip_stale and kind == "interim" and delay_sec > self.target_delay:
+            with self._lock:
+                self.shed += 1
+            return True
+        return False
+
+    def note_shed(self) -> None:
+        with self._lock:
+            self.shed += 1
+
+    def stats(self) -> str:
+        interim = "off" if self.interim_interval is None else f"{self.interim_interval:.1f}s"
+        floor = f", floor {LEVELS[self.floor][0]}" if self.floor else ""
+        return (f"RTF {self.rtf:.2f}  delay {self.delay:.1f}s  [{self.level_name}{floor}]  "
+                f"interim {interim}  max {self.max_segment:.0f}s  beam {self.beam_size}"
+                + (f"  shed {self.shed}" if self.shed else ""))
@@ -0,0 +1,196 @@
+"""
+Byte-Budgeted Queues and Compact PCM Buffers
+============================================
+Queues in the Pi scripts used to be bounded by item count (maxsize=20,
+maxsize=3), but one item can be 12 s of float32 audio or a 0.4 s blip, so
+memory use on a 4 GB Pi was anyone's guess.  Everything here is bounded by
+bytes instead and reports its current and high-water usage.
+
+Audio is kept as int16 -- half the size of float32, and the source is a
+16-bit ADC anyway.  Convert with to_float32() only at the model boundary.
+
+    trans_queue = ByteBudgetPriorityQueue(max_bytes=8 * MB)
+    trans_queue.put_nowait((0, n, pcm_i16, "final", span))   # queue.Full if over budget
+    ...
+    audio = to_float32(pcm_i16, gain)                        # right before transcribe()
+
+    seg = PcmBuffer(max_bytes=28 * FS * 2)                   # one utterance
+    seg.append(frame_f32)
+    pcm = seg.pcm().copy()
+"""
+
+import heapq
+import queue
+import time
+
+import numpy as np
+
+MB = 1024 * 1024
+
+
+# ─── Sample format helpers ────────────────────────────────────────────────────
+
+def to_int16(x: np.ndarray) -> np.ndarray:
+    """float32 in [-1, 1] -> int16 (clipped); int16 passes through untouched."""
+    if x.dtype == np.int16:
+        return x
+    return np.clip(np.rint(x * 32767.0), -32768, 32767).astype(np.int16)
+
+
+def to_float32(pcm: np.ndarray, gain: float = 1.0) -> np.ndarray:
+    """int16 -> float32 in [-1, 1], with an optional gain folded into the scale."""
+    if pcm.dtype == np.float32:
+        return pcm * np.float32(gain) if gain != 1.0 else pcm
+    return pcm.astype(np.float32) * np.float32(gain / 32768.0)
+
+
+def item_nbytes(item) -> int:
+    """Bytes held by numpy arrays in a queue item (an array or a tuple of fields)."""
+    if isinstance(item, np.ndarray):
+        return item.nbytes
+    if isinstance(item, (tuple, list)):
+        return sum(f.nbytes for f in item if isinstance(f, np.ndarray))
+    return 0
+
+
+# ─── Queues ───────────────────────────────────────────────────────────────────
+
+class _ByteBudget:
+    """
+    Mixin over queue.Queue / queue.PriorityQueue: put() blocks (or raises
+    queue.Full) while the new item would push the total past max_bytes.
+    An item larger than the whole budget is still accepted into an empty
+    queue, so nothing can wedge it forever.
+    """
+
+    def __init__(self, max_bytes: int, sizeof=item_nbytes):
+        super().__init__(maxsize=0)
+        self.max_bytes  = int(max_bytes)
+        self.sizeof     = sizeof
+        self.bytes      = 0
+        self.high_water = 0
+
+    def _fits(self, n: int) -> bool:
+        return self.bytes == 0 or self.bytes + n <= self.max_bytes
+
+    def put(self, item, block=True, timeout=None):
+        n = self.sizeof(item)
+        with self.not_full:
+            if not block:
+                if not self._fits(n):
+                    raise queue.Full
+            elif timeout is None:
+                while not self._fits(n):
+                    self.not_full.wait()
+            else:
+                if timeout < 0:
+                    raise ValueError("'timeout' must be a non-negative number")
+                endtime = time.monotonic() + timeout
+                while not self._fits(n):
+                    remaining = endtime - time.monotonic()
+                    if remaining <= 0.0:
+                        raise queue.Full
+                    self.not_full.wait(remaining)
+            self._put(item)
+            self.unfinished_tasks += 1
+            self.not_empty.notify()
+
+    def _put(self, item):
+        super()._put(item)
+        self.bytes += self.sizeof(item)
+        self.high_water = max(self.high_water, self.bytes)
+
+    def _get(self):
+        item = super()._get()
+        self.bytes -= self.sizeof(item)
+        return item
+
+    def full(self) -> bool:
+        with self.mutex:
+            return self.bytes >= self.max_bytes
+
+    def remove_where(self, pred, pick=None) -> bool:
+        """
+        Remove one queued item matching pred (the one pick() chooses among
+        the matches, default the first) with correct byte / task accounting.
+        """
+        with self.mutex:
+            items   = list(self.queue)
+            matches = [it for it in items if pred(it)]
+            if not matches:
+                return False
+            victim = pick(matches) if pick else matches[0]
+            items.remove(victim)
+            self._replace(items)
+            self.bytes -= self.sizeof(victim)
+            self.unfinished_tasks -= 1
+            self.not_full.notify()
+        return True
+
+    def _replace(self, items):
+        self.queue.clear()
+        self.queue.extend(items)
+
+    def usage(self) -> str:
+        return (f"{self.bytes / MB:.1f}/{self.max_bytes / MB:.0f} MB "
+                f"(peak {self.high_water / MB:.1f})")
+
+
+class ByteBudgetQueue(_ByteBudget, queue.Queue):
+    """FIFO bounded by bytes."""
+
+
+class ByteBudgetPriorityQueue(_ByteBudget, queue.PriorityQueue):
+    """Priority queue bounded by bytes."""
+
+    def _replace(self, items):
+        self.queue[:] = items
+        heapq.heapify(self.queue)
+
+
+# ─── PCM buffer ───────────────────────────────────────────────────────────────
+
+class PcmBuffer:
+    """
+    Preallocated int16 sample buffer with a hard byte cap -- replaces the
+    list-of-float32-frames segment accumulators (no per-packet allocation,
+    no np.concatenate on flush).  Single writer; not locked.
+    """
+
+    def __init__(self, max_bytes: int):
+        self._buf       = np.empty(max(int(max_bytes) // 2, 1), dtype=np.int16)
+        self.n          = 0
+        self.high_water = 0
+
+    def append(self, frame: np.ndarray) -> bool:
+        """Append one frame (float32 or int16); False (nothing written) if it won't fit."""
+        pcm = to_int16(frame)
+        end = self.n + len(pcm)
+        if end > len(self._buf):
+            return False
+        self._buf[self.n:end] = pcm
+        self.n = end
+        self.high_water = max(self.high_water, self.n * 2)
+        return True
+
+    def extend(self, frames) -> None:
+        for f in frames:
+            self.append(f)
+
+    def pcm(self) -> np.ndarray:
+        """View of the samples held (copy it before the buffer is reused)."""
+        return self._buf[:self.n]
+
+    def clear(self) -> None:
+        self.n = 0
+
+    def __len__(self) -> int:
+        return self.n
+
+    @property
+    def nbytes(self) -> int:
+        return self.n * 2
+
+    @property
+    def capacity_bytes(self) -> int:
+        return self._buf.nbytes
@@ -0,0 +1,302 @@
+"""
+Live Caption Server
+===================
+Serves the live transcript to browsers on the LectureAudio AP, so students
+can follow on their own phones instead of the Pi's touchscreen:
+
+    http://<pi>:8080/          caption page (no install, any browser)
+    http://<pi>:8080/events    Server-Sent Events stream
+
+The pipeline publishes the same ("partial" / "final" / "revise" /
+"retract", payload) items it sends to the Tk GUI.  Each becomes a small
+JSON delta, encoded ONCE into a shared ring buffer; every client is just a
+cursor into that ring:
+
+    {"t": "i", "u": utt, "k": 12, "s": "suffix"}    interim: keep k chars, append s
+    {"t": "f", "id": 7, "u": utt, "w": wall, "x": "text"}    final
+    {"t": "r", "id": 7, "x": "text"}                 revised final
+    {"t": "x", "u": utt}                             interim retracted
+    {"t": "s", "finals": [...], "interim": {...}}    snapshot (join / resync)
+
+  * The pipeline never waits.  publish() appends under a lock and schedules
+    one wake-up of the event loop; it does no socket I/O.
+  * Slow clients cannot stall anyone.  A client writes from its own cursor;
+    if its socket buffer backs up past MAX_CLIENT_BUFFER it is given
+    DRAIN_TIMEOUT to catch up and is then dropped (EventSource reconnects).
+    A client whose cursor has fallen out of the ring gets a fresh snapshot
+    instead of the events it missed.
+  * Interims are deltas against the previous interim of the same
+    utterance, so a growing sentence costs a few bytes per update per
+    client, not the whole line.
+
+One asyncio loop on its own thread serves all clients; 50+ viewers are a
+few hundred KB of socket buffers and no extra threads.
+
+    captions = CaptionBroadcaster()
+    threading.Thread(target=CaptionServer(captions).run, args=(stop_event,), daemon=True).start()
+    captions.publish("final", (final_id, utt, when, text))
+"""
+
+import asyncio
+import json
+import threading
+from collections import deque
+
+CAPTION_PORT      = 8080
+MAX_CLIENTS       = 200
+MAX_CLIENT_BUFFER = 64 * 1024     # bytes queued in one client's socket before it counts as slow
+DRAIN_TIMEOUT     = 5.0           # seconds a slow client gets to catch up
+KEEPALIVE_SEC     = 15.0          # SSE comment so proxies / phones keep the connection
+
+
+def _sse(seq: int, event: dict) -> bytes:
+    data = json.dumps(event, separators=(",", ":"), ensure_ascii=False)
+    return f"id: {seq}\ndata: {data}\n\n".encode()
+
+
+# ─── Broadcast buffer (pipeline side) ─────────────────────────────────────────
+
+class CaptionBroadcaster:
+    """Shared ring of encoded events plus the state a joining client needs."""
+
+    def __init__(self, ring: int = 1024, history: int = 50):
+        self._ring     = deque(maxlen=ring)          # (seq, bytes)
+        self._seq      = 0
+        self._lock     = threading.Lock()
+        self._finals   = deque(maxlen=history)       # [id, utt, wall, text]
+        self._interim  = None                        # (utt, text)
+        self._final_utt = -1
+        self._loop     = None
+        self._wake     = None                        # asyncio.Event, replaced per wake-up
+        self._wake_pending = False
+        self.published = 0
+
+    # Called from pipeline threads
+    def publish(self, kind: str, payload) -> None:
+        with self._lock:
+            event = self._delta(kind, payload)
+            if event is None:
+                return
+            self._seq += 1
+            self._ring.append((self._seq, _sse(self._seq, event)))
+            self.published += 1
+            wake = self._loop is not None and not self._wake_pending
+            self._wake_pending = self._wake_pending or wake
+        if wake:
+            self._loop.call_soon_threadsafe(self._notify)
+
+    def _delta(self, kind: str, payload):
+        """Update the snapshot state; the event to broadcast, or None."""
+        if kind == "partial":
+            utt, text = payload
+            if 0 <= utt <= self._final_utt:
+                return None                          # overtaken by its final
+            base = self._interim[1] if self._interim and self._interim[0] == utt else ""
+            k    = 0
+            while k < min(len(base), len(text)) and base[k] == text[k]:
+                k += 1
+            self._interim = (utt, text)
+            return {"t": "i", "u": utt, "k": k, "s": text[k:]}
+        if kind == "final":
+            final_id, utt, when, text = payload
+            self._final_utt = max(self._final_utt, utt)
+            if self._interim and self._interim[0] <= utt:
+                self._interim = None
+            self._finals.append([final_id, utt, when, text])
+            return {"t": "f", "id": final_id, "u": utt, "w": when, "x": text}
+        if kind == "revise":
+            final_id, _, text = payload
+            for entry in self._finals:
+                if entry[0] == final_id:
+                    entry[3] = text
+            return {"t": "r", "id": final_id, "x": text}
+        if kind == "retract":
+            if self._interim and self._interim[0] == payload:
+                self._interim = None
+            return {"t": "x", "u": payload}
+        return None
+
+    # Called on the server's event loop
+    def _attach(self, loop) -> None:
+        self._loop = loop
+        self._wake = asyncio.Event()
+
+    def _notify(self) -> None:
+        with self._lock:
+            self._wake_pending = False
+        wake, self._wake = self._wake, asyncio.Event()
+        wake.set()
+
+    def snapshot(self) -> tuple:
+        """(seq, encoded snapshot event) -- a client continues from seq."""
+        with self._lock:
+            event = {"t": "s",
+                     "finals":  [{"id": i, "u": u, "w": w, "x": x} for i, u, w, x in self._finals],
+                     "interim": {"u": self._interim[0], "x": self._interim[1]} if self._interim else None}
+            return self._seq, _sse(self._seq, event)
+
+    def since(self, cursor: int):
+        """(events after cursor, new cursor), or None if the ring no longer reaches back."""
+        with self._lock:
+            if cursor > self._seq:
+                return None                          # id from an earlier run
+            if cursor == self._seq:
+                return [], cursor
+            if self._ring[0][0] > cursor + 1:
+                return None
+            start = len(self._ring) - (self._seq - cursor)
+            return [data for _, data in list(self._ring)[start:]], self._seq
+
+
+# ─── HTTP / SSE server ────────────────────────────────────────────────────────
+
+class CaptionServer:
+    """Minimal asyncio HTTP server: / (page) and /events (SSE)."""
+
+    def __init__(self, broadcaster: CaptionBroadcaster, host: str = "0.0.0.0",
+                 port: int = CAPTION_PORT):
+        self.broadcaster = broadcaster
+        self.host        = host
+        self.port        = port
+        self.clients     = 0
+        self.dropped     = 0      # slow clients disconnected
+
+    def run(self, stop_event) -> None:
+        """Serve until stop_event is set (thread target)."""
+        try:
+            asyncio.run(self._main(stop_event))
+        except OSError as exc:
+            print(f"Caption server unavailable on port {self.port}: {exc}")
+
+    async def _main(self, stop_event) -> None:
+        self.broadcaster._attach(asyncio.get_running_loop())
+        server = await asyncio.start_server(self._handle, self.host, self.port)
+        print(f"Caption server on http://{self.host}:{self.port}/")
+        async with server:
+            while not stop_event.is_set():
+                await asyncio.sleep(0.5)
+
+    async def _handle(self, reader, writer) -> None:
+        try:
+            head = await asyncio.wait_for(reader.readuntil(b"\r\n\r\n"), 10.0)
+        except (asyncio.TimeoutError, asyncio.IncompleteReadError, asyncio.LimitOverrunError,
+                ConnectionError):
+            writer.close()
+            return
+        lines = head.decode("latin-1").split("\r\n")
+        parts = lines[0].split()
+        path  = parts[1].split("?")[0] if len(parts) > 1 else "/"
+        hdrs  = {k.strip().lower(): v.strip() for k, _, v in (l.partition(":") for l in lines[1:] if l)}
+        try:
+            if path == "/events":
+                await self._events(writer, hdrs.get("last-event-id"))
+            elif path == "/":
+                body = PAGE.encode()
+                writer.write(b"HTTP/1.1 200 OK\r\nContent-Type: text/html; charset=utf-8\r\n"
+                             b"Content-Length: %d\r\nConnection: close\r\n\r\n" % len(body) + body)
+                await writer.drain()
+            else:
+                writer.write(b"HTTP/1.1 404 Not Found\r\nContent-Length: 0\r\nConnection: close\r\n\r\n")
+                await writer.drain()
+        except (ConnectionError, asyncio.TimeoutError):
+            pass
+        finally:
+            writer.close()
+
+    async def _events(self, writer, last_id) -> None:
+        if self.clients >= MAX_CLIENTS:
+            writer.write(b"HTTP/1.1 503 Service Unavailable\r\nRetry-After: 10\r\n"
+                         b"Content-Length: 0\r\nConnection: close\r\n\r\n")
+            return
+        writer.write(b"HTTP/1.1 200 OK\r\nContent-Type: text/event-stream\r\n"
+                     b"Cache-Control: no-cache\r\nConnection: keep-alive\r\n"
+                     b"Access-Control-Allow-Origin: *\r\n\r\nretry: 2000\n\n")
+        bc     = self.broadcaster
+        cursor = None
+        if last_id and last_id.isdigit():
+            cursor = int(last_id)                     # reconnect: resume if the ring reaches
+        self.clients += 1
+        try:
+            while True:
+                wake   = bc._wake
+                result = bc.since(cursor) if cursor is not None else None
+                if result is None:
+                    cursor, data = bc.snapshot()
+                    writer.write(data)
+                else:
+                    events, cursor = result
+                    for data in events:
+                        writer.write(data)
+                if writer.transport.get_write_buffer_size() > MAX_CLIENT_BUFFER:
+                    try:
+                        await asyncio.wait_for(writer.drain(), DRAIN_TIMEOUT)
+                    except asyncio.TimeoutError:
+                        self.dropped += 1
+                        return
+                if writer.transport.is_closing():
+                    return
+                try:
+                    await asyncio.wait_for(wake.wait(), KEEPALIVE_SEC)
+                except asyncio.TimeoutError:
+                    writer.write(b": keepalive\n\n")
+        finally:
+            self.clients -= 1
+
+    def stats(self) -> str:
+        return (f"captions: {self.clients} viewer(s), {self.broadcaster.published} events"
+                + (f", {self.dropped} slow dropped" if self.dropped else ""))
+
+
+PAGE = """<!doctype html>
+<html><head><meta charset="utf-8">
+<meta name="viewport" content="width=device-width, initial-scale=1">
+<title>Live Captions</title>
+<style>
+ body { background:#1a1a2e; color:#e0e0e0; font:1.2rem/1.5 "DejaVu Sans",sans-serif; margin:0; }
+ #finals { padding:1rem 1rem 0; }
+ #finals p { margin:0 0 .6rem; }
+ #finals time { color:#888; font-size:.8em; margin-right:.5em; }
+ #interim { color:#888; font-style:italic; padding:0 1rem 1rem; min-height:1.5em; }
+ #status { position:fixed; top:.3rem; right:.6rem; font-size:.75rem; color:#4ecca3; }
+</style></head>
+<body><div id="status">connecting...</div><div id="finals"></div><div id="interim"></div>
+<script>
+const finals = document.getElementById("finals"), interim = document.getElementById("interim"),
+      status = document.getElementById("status");
+let cur = {u: null, x: ""}, lastFinal = -1;
+const stamp = w => new Date(w * 1000).toLocaleTimeString([], {hour12: false});
+function addFinal(f) {
+  const p = document.createElement("p");
+  p.id = "f" + f.id;
+  p.innerHTML = "<time>" + stamp(f.w) + "</time>";
+  p.appendChild(document.createTextNode(f.x));
+  finals.appendChild(p);
+  while (finals.childNodes.length > 500) finals.removeChild(finals.firstChild);
+  lastFinal = Math.max(lastFinal, f.u);
+}
+function showInterim() { interim.textContent = cur.x ? "\\u27f3 " + cur.x : ""; }
+function follow() { window.scrollTo(0, document.body.scrollHeight); }
+const es = new EventSource("events");
+es.onopen = () => status.textContent = "\\u25cf live";
+es.onerror = () => status.textContent = "reconnecting...";
+es.onmessage = e => {
+  const m = JSON.parse(e.data);
+  if (m.t === "s") {
+    finals.textContent = ""; m.finals.forEach(addFinal);
+    cur = m.interim ? {u: m.interim.u, x: m.interim.x} : {u: null, x: ""};
+  } else if (m.t === "i") {
+    if (m.u >= 0 && m.u <= lastFinal) return;
+    const base = cur.u === m.u ? cur.x : "";
+    cur = {u: m.u, x: base.slice(0, m.k) + m.s};
+  } else if (m.t === "f") {
+    addFinal(m); if (cur.u !== null && cur.u <= m.u) cur = {u: null, x: ""};
+  } else if (m.t === "r") {
+    const p = document.getElementById("f" + m.id);
+    if (p) p.lastChild.textContent = m.x;
+  } else if (m.t === "x") {
+    if (cur.u === m.u) cur = {u: null, x: ""};
+  }
+  showInterim(); follow();
+};
+</script></body></html>
+"""
@@ -0,0 +1,253 @@
+"""
+Shared-Memory Caption Sink
+==========================
+Captions for local renderers -- an OBS overlay, a projector-only display
+process -- without scraping the Tk window or tailing the log file.  The
+pipeline publishes the same ("partial" / "final" / "revise" / "retract",
+payload) items it sends to the GUI; CaptionSink keeps the current state
+(the interim line plus the last few finals) and writes it to:
+
+  * Shared memory, /dev/shm/escribe-captions ($ESCRIBE_CAPTION_SHM): a
+    small fixed-size file any process can mmap, guarded by a seqlock.
+
+        offset  0  b"ESCC"            magic
+                4  u16 version, u16 0
+                8  u64 seq            odd while an update is being written
+               16  u32 length         bytes of payload
+               24  payload            UTF-8 JSON, little-endian header
+
+    A reader copies the payload between two reads of seq and keeps it
+    only if both are equal and even (CaptionReader below does this).
+    Readers never block the writer and never take a lock.
+  * Optionally a FIFO, /tmp/escribe-captions.fifo ($ESCRIBE_CAPTION_FIFO):
+    one line of the same JSON per update, for renderers that would rather
+    block on a read than check seq.  Each line is under PIPE_BUF, so it is
+    written whole or not at all; with no reader, or a reader that has
+    stopped reading, updates are dropped rather than waited for.
+
+    {"seq": 42, "interim": "and so the", "finals": [{"id": 7, "x": "..."}, ...]}
+
+Publishing costs one JSON encode and a memcpy -- the pipeline never waits.
+
+    sink = CaptionSink(fifo=True)
+    sink.publish("final", (final_id, utt, when, text))
+    sink.close()
+
+    python caption_shm.py            # print captions as they change
+"""
+
+import errno
+import json
+import mmap
+import os
+import stat
+import struct
+import sys
+import tempfile
+import threading
+import time
+from collections import deque
+
+_SHM_DIR     = "/dev/shm" if os.path.isdir("/dev/shm") else tempfile.gettempdir()
+CAPTION_SHM  = os.getenv("ESCRIBE_CAPTION_SHM", os.path.join(_SHM_DIR, "escribe-captions"))
+CAPTION_FIFO = os.getenv("ESCRIBE_CAPTION_FIFO", "/tmp/escribe-captions.fifo")
+
+MAGIC       = b"ESCC"
+VERSION     = 1
+HEADER      = struct.Struct("<4sHHQI")     # magic, version, pad, seq, length
+PAYLOAD_AT  = 24
+SHM_SIZE    = 8192
+MAX_PAYLOAD = 4095                         # one FIFO line incl. newline fits PIPE_BUF
+FINALS      = 5                            # recent finals kept in the state
+FIFO_RETRY_SEC = 1.0                       # how often to look for a FIFO reader
+
+_SEQ = struct.Struct("<Q")
+_LEN = struct.Struct("<I")
+
+
+class CaptionSink:
+    """Writes the caption state to a seqlocked shared-memory block (and a FIFO)."""
+
+    def __init__(self, path: str = CAPTION_SHM, fifo: bool = False, fifo_path: str = CAPTION_FIFO,
+                 finals: int = FINALS):
+        self.path      = path
+        self._lock     = threading.Lock()
+        self._finals   = deque(maxlen=finals)      # [id, utt, text]
+        self._interim  = None                      # (utt, text)
+        self._final_utt = -1
+        self._seq      = 0
+        self.updates   = 0
+
+        fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o644)
+        try:
+            os.ftruncate(fd, SHM_SIZE)
+            self._mm = mmap.mmap(fd, SHM_SIZE)
+        finally:
+            os.close(fd)
+        HEADER.pack_into(self._mm, 0, MAGIC, VERSION, 0, 0, 0)
+
+        self.fifo_path    = fifo_path if fifo else None
+        self._fifo        = None
+        self._fifo_retry  = 0.0
+        self.fifo_lines   = 0
+        self.fifo_dropped = 0
+        if self.fifo_path is not None:
+            try:
+                os.mkfifo(self.fifo_path, 0o644)
+            except FileExistsError:
+                if not stat.S_ISFIFO(os.stat(self.fifo_path).st_mode):
+                    print(f"Caption FIFO disabled: {self.fifo_path} is not a FIFO")
+                    self.fifo_path = None
+        self._write()
+
+    # Called from pipeline threads
+    def publish(self, kind: str, payload) -> None:
+        with self._lock:
+            if self._apply(kind, payload):
+                self._write()
+
+    def _apply(self, kind: str, payload) -> bool:
+        """Update the state; False if nothing visible changed."""
+        if kind == "partial":
+            utt, text = payload
+            if 0 <= utt <= self._final_utt:
+                return False                       # overtaken by its final
+            self._interim = (utt, text)
+            return True
+        if kind == "final":
+            final_id, utt, _, text = payload
+            self._final_utt = max(self._final_utt, utt)
+            if self._interim and self._interim[0] <= utt:
+                self._interim = None
+            self._finals.append([final_id, utt, text])
+            return True
+        if kind == "revise":
+            final_id, _, text = payload
+            hit = False
+            for entry in self._finals:
+                if entry[0] == final_id:
+                    entry[2], hit = text, True
+            return hit
+        if kind == "retract":
+            if self._interim and self._interim[0] == payload:
+                self._interim = None
+                return True
+        return False
+
+    def _encode(self) -> bytes:
+        interim = self._interim[1] if self._interim else ""
+        finals  = list(self._finals)
+        while True:
+            data = json.dumps({"seq": self._seq + 2, "interim": interim,
+                               "finals": [{"id": i, "x": x} for i, _, x in finals]},
+                              separators=(",", ":"), ensure_ascii=False).encode()
+            if len(data) <= MAX_PAYLOAD:
+                return data
+            if finals:
+                finals.pop(0)                      # oldest final goes first
+            else:
+                interim = interim[len(interim) // 4 + 1:]   # keep the end of a runaway interim
+
+    def _write(self) -> None:
+        data = self._encode()
+        mm   = self._mm
+        _SEQ.pack_into(mm, 8, self._seq + 1)       # odd: readers retry
+        mm[PAYLOAD_AT:PAYLOAD_AT + len(data)] = data
+        _LEN.pack_into(mm, 16, len(data))
+        self._seq += 2
+        _SEQ.pack_into(mm, 8, self._seq)
+        self.updates += 1
+        if self.fifo_path is not None:
+            self._send(data + b"\n")
+
+    def _send(self, line: bytes) -> None:
+        if self._fifo is None:
+            now = time.monotonic()
+            if now < self._fifo_retry:
+                self.fifo_dropped += 1
+                return
+            self._fifo_retry = now + FIFO_RETRY_SEC
+            try:
+                self._fifo = os.open(self.fifo_path, os.O_WRONLY | os.O_NONBLOCK)
+            except OSError:
+                self.fifo_dropped += 1             # ENXIO: nobody reading yet
+                return
+        try:
+            os.write(self._fifo, line)
+            self.fifo_lines += 1
+        except BlockingIOError:
+            self.fifo_dropped += 1                 # reader behind; it gets the next state
+        except OSError as exc:
+            self.fifo_dropped += 1
+            os.close(self._fifo)                   # EPIPE: reader went away
+            self._fifo = None
+            if exc.errno != errno.EPIPE:
+                print(f"Caption FIFO write failed: {exc}")
+
+    def close(self) -> None:
+        """Publish an empty state (renderers clear) and release the block."""
+        with self._lock:
+            self._interim = None
+            self._finals.clear()
+            self._write()
+            if self._fifo is not None:
+                os.close(self._fifo)
+                self._fifo = None
+            self._mm.close()
+
+    def stats(self) -> str:
+        line = f"shm updates {self.updates}"
+        if self.fifo_path is not None:
+            line += f", fifo {self.fifo_lines} sent / {self.fifo_dropped} dropped"
+        return line
+
+
+class CaptionReader:
+    """Lock-free reader of a CaptionSink block."""
+
+    def __init__(self, path: str = CAPTION_SHM):
+        with open(path, "rb") as f:
+            self._mm = mmap.mmap(f.fileno(), SHM_SIZE, access=mmap.ACCESS_READ)
+        magic, version, _, _, _ = HEADER.unpack_from(self._mm, 0)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError(f"{path} is not a caption block (v{VERSION})")
+        self.seq = 0
+
+    def read(self, tries: int = 100):
+        """(seq, state dict) from a consistent snapshot, or None if the writer never settled."""
+        mm = self._mm
+        for _ in range(tries):
+            s1 = _SEQ.unpack_from(mm, 8)[0]
+            if s1 & 1:
+                continue                           # update in progress
+            n    = _LEN.unpack_from(mm, 16)[0]
+            data = mm[PAYLOAD_AT:PAYLOAD_AT + min(n, MAX_PAYLOAD)]
+            if _SEQ.unpack_from(mm, 8)[0] == s1:
+                self.seq = s1
+                return s1, json.loads(data)
+        return None
+
+    def changed(self) -> bool:
+        return _SEQ.unpack_from(self._mm, 8)[0] != self.seq
+
+    def close(self) -> None:
+        self._mm.close()
+
+
+if __name__ == "__main__":
+    try:
+        reader = CaptionReader(sys.argv[1] if len(sys.argv) > 1 else CAPTION_SHM)
+    except (OSError, ValueError) as exc:
+        print(f"No caption block: {exc}")
+        sys.exit(1)
+    try:
+        while True:
+            if reader.changed():
+                snap = reader.read()
+                if snap is not None:
+                    _, state = snap
+                    print("\033[2J\033[H" + "\n".join(f["x"] for f in state["finals"]))
+                    print(f"\033[2m{state['interim']}\033[0m", flush=True)
+            time.sleep(0.05)
+    except KeyboardInterrupt:
+        pass
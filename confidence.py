@@ -0,0 +1,182 @@
+"""
+Confidence Scoring and Hallucination Gate
+=========================================
+Greedy decoding of short, noisy clips sometimes returns text that was never
+said -- "Thank you.", "Thanks for watching!", or one phrase repeated until
+the window runs out.  Every decode is scored here and gated before it
+reaches the log:
+
+    verdict    when                                          action
+    accept     scores look normal (the ~90% case)            keep, no extra work
+    retry      low avg_logprob, high compression ratio,      ONE re-decode with beam
+               or a repeated phrase                          search + temperature fallback
+    reject     Whisper's own silence rule (no_speech_prob     drop
+               high and avg_logprob low), or a stock
+               hallucination phrase with weak scores
+
+The thresholds are Whisper's defaults (log_prob_threshold -1.0,
+compression_ratio_threshold 2.4, no_speech_threshold 0.6); the live path
+only runs the expensive settings on the clips that fail them.
+
+    gate = ConfidenceGate()
+    hyp  = gate.check(summarise(segments), redecode=lambda: model.transcribe(
+               audio, beam_size=5, temperature=RETRY_TEMPERATURES, ...)[0])
+    if hyp is not None:
+        log(hyp.text)
+"""
+
+import re
+import threading
+from collections import namedtuple
+
+# Scores of one decoded clip
+Hypothesis = namedtuple("Hypothesis", "text avg_logprob compression_ratio no_speech_prob")
+
+LOGPROB_THRESHOLD    = -1.0   # mean token logprob below this is "low confidence"
+MAX_COMPRESSION      = 2.4    # above this the text is a repetition loop
+NO_SPEECH_THRESHOLD  = 0.6    # with low logprob: the clip was silence
+SUSPECT_NO_SPEECH    = 0.3    # stock phrases are dropped above this ...
+SUSPECT_LOGPROB      = -0.6   # ... or below this
+MIN_LOGPROB_GAIN     = 0.05   # a replacement must beat the original by this much
+LOOP_REPEATS         = 3      # same n-gram this many times in a row = loop ...
+LOOP_MIN_WORDS       = 6      # ... covering at least this many words
+RETRY_BEAM_SIZE      = 5
+RETRY_TEMPERATURES   = (0.0, 0.2, 0.4, 0.6)   # faster-whisper falls back through these
+
+ACCEPT, RETRY, REJECT = "accept", "retry", "reject"
+
+# What Whisper says over silence, music and noise (from its subtitle-heavy
+# training data).  Compared after lower-casing and stripping punctuation.
+STOCK_PHRASES = frozenset({
+    "thank you", "thank you very much", "thanks", "thanks for watching",
+    "thank you for watching", "thank you so much for watching",
+    "please subscribe", "like and subscribe", "subscribe to my channel",
+    "bye", "bye bye", "you", "the end",
+    "subtitles by the amaraorg community", "transcription by castingwords",
+})
+
+_word_re = re.compile(r"[\w']+")
+
+
+def _words(text: str) -> list:
+    return _word_re.findall(text.lower())
+
+
+_STOCK_KEYS = frozenset("".join(_words(p)) for p in STOCK_PHRASES)
+
+
+# ─── Scoring ──────────────────────────────────────────────────────────────────
+
+def summarise(segments):
+    """
+    Collapse faster-whisper segments into one Hypothesis, weighting each
+    segment's scores by its duration.  None if there is no text.
+    """
+    segs = [s for s in segments if s.text.strip()]
+    if not segs:
+        return None
+    weights = [max(s.end - s.start, 0.01) for s in segs]
+    total   = sum(weights)
+    return Hypothesis(
+        text              = " ".join(s.text.strip() for s in segs),
+        avg_logprob       = sum(w * s.avg_logprob for w, s in zip(weights, segs)) / total,
+        compression_ratio = max(s.compression_ratio for s in segs),
+        no_speech_prob    = sum(w * s.no_speech_prob for w, s in zip(weights, segs)) / total,
+    )
+
+
+def is_better(new, old) -> bool:
+    """True if hypothesis new should replace old."""
+    if new is None or is_looping(new):
+        return False
+    if old is None or is_looping(old):
+        return True
+    return new.text != old.text and new.avg_logprob >= old.avg_logprob + MIN_LOGPROB_GAIN
+
+
+def has_repeats(text: str, max_n: int = 4) -> bool:
+    """
+    A 1..max_n word phrase repeated back to back: LOOP_REPEATS times, and
+    over at least LOOP_MIN_WORDS words ("no, no, no" is speech, not a loop).
+    """
+    words = _words(text)
+    for n in range(1, max_n + 1):
+        reps = max(LOOP_REPEATS, -(-LOOP_MIN_WORDS // n))
+        for i in range(len(words) - n * reps + 1):
+            gram = words[i:i + n]
+            if all(words[i + k * n:i + (k + 1) * n] == gram for k in range(1, reps)):
+                return True
+    return False
+
+
+def is_looping(hyp) -> bool:
+    return hyp.compression_ratio > MAX_COMPRESSION or has_repeats(hyp.text)
+
+
+def is_stock_phrase(text: str) -> bool:
+    return "".join(_words(text)) in _STOCK_KEYS
+
+
+def assess(hyp) -> str:
+    """ACCEPT, RETRY or REJECT for one hypothesis."""
+    if hyp is None:
+        return REJECT
+    if hyp.no_speech_prob > NO_SPEECH_THRESHOLD and hyp.avg_logprob < LOGPROB_THRESHOLD:
+        return REJECT
+    if is_stock_phrase(hyp.text) and (hyp.no_speech_prob > SUSPECT_NO_SPEECH
+                                      or hyp.avg_logprob < SUSPECT_LOGPROB):
+        return REJECT
+    if is_looping(hyp) or hyp.avg_logprob < LOGPROB_THRESHOLD:
+        return RETRY
+    return ACCEPT
+
+
+# ─── Gate ─────────────────────────────────────────────────────────────────────
+
+class ConfidenceGate:
+    """Applies assess() and the single re-decode; counts outcomes for the stats line."""
+
+    def __init__(self):
+        self.checked  = 0
+        self.accepted = 0    # cheap path only
+        self.retried  = 0    # needed the re-decode ...
+        self.rescued  = 0    # ... and came out usable
+        self.rejected = 0
+        self._lock    = threading.Lock()
+
+    def _count(self, name: str) -> None:
+        with self._lock:
+            setattr(self, name, getattr(self, name) + 1)
+
+    def check(self, hyp, redecode=None):
+        """
+        Return the hypothesis to publish, or None to drop the clip.
+        redecode() -> segments runs at most once, and only on RETRY; without
+        it (interims) a RETRY is kept unless it is a repetition loop.
+        """
+        self._count("checked")
+        verdict = assess(hyp)
+        if verdict == ACCEPT:
+            self._count("accepted")
+            return hyp
+        if verdict == REJECT:
+            self._count("rejected")
+            return None
+
+        if redecode is not None:
+            self._count("retried")
+            alt  = summarise(redecode())
+            best = alt if is_better(alt, hyp) else hyp
+        else:
+            best = hyp
+        if assess(best) == REJECT or is_looping(best):
+            self._count("rejected")
+            return None
+        if redecode is not None:
+            self._count("rescued")
+        return best     # low logprob but sane -- likely real, hard speech
+
+    def stats(self) -> str:
+        cheap = 100.0 * self.accepted / max(self.checked, 1)
+        return (f"confidence: {cheap:.0f}% cheap path  retried {self.retried} "
+                f"(rescued {self.rescued})  rejected {self.rejected}")
@@ -0,0 +1,109 @@
+"""
+Local Control Socket
+====================
+A Unix-domain socket through which a running pipeline takes one-line
+commands, so an operator can change it without touching the touchscreen
+(over SSH, from a cron job, or from another script):
+
+    python control_socket.py status
+    python control_socket.py model base.en
+
+Protocol: the client sends one line, "<command> [args...]", and reads one
+line back.  Unknown commands answer "error: ...".  The socket file is
+created with mode 0600 -- it is a local admin channel, not a network
+service.
+
+    server = ControlServer(CONTROL_SOCKET, {"model": lambda args: swapper.request(args[0]),
+                                            "status": lambda args: swapper.stats()})
+    threading.Thread(target=server.serve, args=(stop_event,), daemon=True).start()
+"""
+
+import os
+import socket
+import sys
+
+CONTROL_SOCKET = os.getenv("ESCRIBE_CONTROL_SOCKET", "/tmp/escribe-control.sock")
+
+MAX_LINE = 4096
+
+
+class ControlServer:
+    """Serves handlers {command: fn(args) -> str} on a Unix socket, one client at a time."""
+
+    def __init__(self, path: str, handlers: dict):
+        self.path     = path
+        self.handlers = handlers
+
+    def _bind(self) -> socket.socket:
+        try:
+            os.unlink(self.path)          # stale socket from a previous run
+        except FileNotFoundError:
+            pass
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        old  = os.umask(0o177)
+        try:
+            sock.bind(self.path)
+        finally:
+            os.umask(old)
+        sock.listen(4)
+        sock.settimeout(1.0)
+        return sock
+
+    def handle(self, line: str) -> str:
+        words = line.split()
+        if not words:
+            return "error: empty command"
+        fn = self.handlers.get(words[0])
+        if fn is None:
+            return f"error: unknown command {words[0]!r} (try: {', '.join(sorted(self.handlers))})"
+        try:
+            return str(fn(words[1:]))
+        except Exception as exc:
+            return f"error: {exc}"
+
+    def serve(self, stop_event) -> None:
+        try:
+            sock = self._bind()
+        except OSError as exc:
+            print(f"Control socket unavailable at {self.path}: {exc}")
+            return
+        try:
+            while not stop_event.is_set():
+                try:
+                    conn, _ = sock.accept()
+                except socket.timeout:
+                    continue
+                with conn:
+                    conn.settimeout(2.0)
+                    try:
+                        line  = conn.recv(MAX_LINE).decode("utf-8", "replace").strip()
+                        reply = self.handle(line)
+                        conn.sendall(reply.replace("\n", " ").encode() + b"\n")
+                    except OSError:
+                        pass
+        finally:
+            sock.close()
+            try:
+                os.unlink(self.path)
+            except OSError:
+                pass
+
+
+def send(command: str, path: str = CONTROL_SOCKET, timeout: float = 5.0) -> str:
+    """Send one command to a running pipeline and return its answer."""
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+        sock.settimeout(timeout)
+        sock.connect(path)
+        sock.sendall(command.encode() + b"\n")
+        return sock.recv(MAX_LINE).decode("utf-8", "replace").strip()
+
+
+if __name__ == "__main__":
+    if len(sys.argv) < 2:
+        print(__doc__.split("\n\n")[2])
+        sys.exit(2)
+    try:
+        print(send(" ".join(sys.argv[1:])))
+    except OSError as exc:
+        print(f"No pipeline listening on {CONTROL_SOCKET}: {exc}")
+        sys.exit(1)
@@ -0,0 +1,116 @@
+"""
+Speculative (Early) Finals
+==========================
+A final is normally queued only after VAD_SILENCE_END quiet packets, and
+only then does its decode start -- so the user waits for the whole silence
+window *plus* the decode.  With early finals the VAD thread queues the
+utterance after a shorter silence (VAD_EARLY_END) and the decode runs while
+the rest of the silence window elapses:
+
+    speech ... | early silence | rest of silence window |
+               ^ speculative decode starts
+                                                       ^ silence held: commit
+                                                         (result usually ready)
+
+  * Silence holds  -> commit(): the already-computed result is published,
+                      no second decode of the same audio.
+  * Speech resumes -> cancel(): the speculative result is discarded (shown
+                      at most as an interim); the utterance carries on and
+                      its eventual final covers all of it.
+
+Speculation is keyed by the clip's end sample.  Both threads report to
+SpeculativeFinals; whichever of "decode done" / "verdict" comes second
+triggers the publish:
+
+    VAD thread                              transcribe thread
+    spec.open(key); queue the clip
+    ...                                     result = decode(clip)
+    spec.commit(key) -> result or None      spec.resolve(key, result) -> COMMIT / HOLD / DROP
+    spec.cancel(key)                        spec.cancel(key) if the decode failed
+"""
+
+import threading
+
+COMMIT, HOLD, DROP = "commit", "hold", "drop"
+
+_PENDING, _COMMITTED, _CANCELLED = "pending", "committed", "cancelled"
+
+
+class SpeculativeFinals:
+    """Rendezvous between the VAD thread's verdict and the transcriber's result."""
+
+    def __init__(self):
+        self._lock    = threading.Lock()
+        self._state   = {}      # key -> _PENDING | _COMMITTED | _CANCELLED
+        self._results = {}      # key -> result held until the verdict
+        self.opened    = 0
+        self.committed = 0
+        self.cancelled = 0
+        self.ready     = 0      # commits whose result was already computed
+
+    def open(self, key) -> None:
+        with self._lock:
+            self._state[key] = _PENDING
+            self.opened += 1
+
+    def commit(self, key):
+        """
+        Silence held.  Returns the result if the decode already finished
+        (the caller publishes it), else None (resolve() will say COMMIT).
+        """
+        with self._lock:
+            if self._state.get(key) == _CANCELLED:  # the decode failed -- nothing to publish
+                del self._state[key]
+                return None
+            self.committed += 1
+            if key in self._results:
+                self._state.pop(key, None)
+                self.ready += 1
+                return self._results.pop(key)
+            self._state[key] = _COMMITTED
+            return None
+
+    def cancel(self, key) -> None:
+        """
+        Speech resumed, or the transcriber gave up on the decode; any result
+        for key is thrown away.  Whichever side reports second clears the key.
+        """
+        with self._lock:
+            if self._state.get(key) in (_CANCELLED, _COMMITTED):
+                del self._state[key]            # the other side has had its say
+                return
+            self.cancelled += 1
+            if key in self._results:           # decoded and held -- done with it
+                del self._results[key]
+                self._state.pop(key, None)
+            elif key in self._state:           # queued or decoding -- resolve() drops it
+                self._state[key] = _CANCELLED
+
+    def discard(self, key) -> None:
+        """open() undone: the clip never made it into the queue.  Not a cancellation."""
+        with self._lock:
+            if self._state.pop(key, None) is not None:
+                self.opened -= 1
+            self._results.pop(key, None)
+
+    def cancelled_before_decode(self, key) -> bool:
+        """True if the transcriber can skip the decode altogether."""
+        with self._lock:
+            if self._state.get(key) == _CANCELLED:
+                del self._state[key]
+                return True
+            return False
+
+    def resolve(self, key, result) -> str:
+        """Transcriber: decode done.  COMMIT = publish now, HOLD = stored, DROP = discard."""
+        with self._lock:
+            state = self._state.get(key)
+            if state == _PENDING:
+                self._results[key] = result
+                return HOLD
+            self._state.pop(key, None)
+            return COMMIT if state == _COMMITTED else DROP
+
+    def stats(self) -> str:
+        return (f"early finals {self.committed}/{self.opened} committed "
+                f"({self.ready} ready at commit), {self.cancelled} cancelled")
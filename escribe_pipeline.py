@@ -0,0 +1,237 @@
+"""
+In-Process eScribe Pipeline
+===========================
+The receiver / VAD / transcriber chain that gui.py hosts itself, as three
+supervised stages (supervisor.py) instead of separate scripts talking
+through a file:
+
+    receiver     UDP packets from the Pico W -> frames      (never blocks)
+    vad          DC block + energy VAD -> speech clips      (int16 + gain)
+    transcriber  faster-whisper + confidence gate -> live_transcript.txt
+
+  * Receiver, DC block and VAD are udp_audio.py's, the same code the
+    standalone scripts run.
+  * The model is loaded once, on a background thread, by the pipeline --
+    not by the transcriber stage -- so a crashed transcriber is restarted
+    in about a second and keeps the loaded, warm model.
+  * Queues between stages are bounded; the receiver drops the oldest frame
+    and the VAD drops a clip rather than wait (counted in stats()).
+  * Latency per stage: receiver = packet handling time, vad = packet
+    arrival to frame processed, transcriber = end of speech to text.
+  * Output goes to live_transcript.txt through the batched writer thread
+    (transcript_writer.py), so tools following the file keep working.
+
+    pipeline = Pipeline()
+    pipeline.start_receiving()        # receiver + vad
+    pipeline.start_transcribing()     # loads the model on first use
+    pipeline.status()                 # per-stage state / latency / depth
+    pipeline.shutdown()
+"""
+
+import os
+import queue
+import threading
+import time
+
+import numpy as np
+
+from byte_queue import MB, ByteBudgetQueue, to_int16, to_float32
+from confidence import ConfidenceGate, summarise, RETRY_BEAM_SIZE, RETRY_TEMPERATURES
+from model_startup import tuned_settings, start_model, format_report
+from supervisor import Stage, Supervisor
+from transcript_writer import TranscriptWriter
+from udp_audio import (PICO_W_IP, UDP_PORT, FS, VAD_THRESHOLD, VAD_SPEECH_ONSET, VAD_SILENCE_END,
+                       VAD_PRE_ROLL, ONSET, END, SPEECH, PicoReceiver, DcBlocker, EnergyVad,
+                       frame_rms, clip_gain)
+
+# ─── Configuration ────────────────────────────────────────────────────────────
+
+MODEL_SIZE   = "tiny.en"
+DEVICE       = "cpu"
+COMPUTE_TYPE = "int8"
+CPU_THREADS  = 0             # 0 = CTranslate2 default
+# `python autotune.py` measures these on this machine; its choice wins
+MODEL_SIZE, COMPUTE_TYPE, CPU_THREADS = tuned_settings(MODEL_SIZE, COMPUTE_TYPE, CPU_THREADS)
+
+# Receiver / VAD settings are udp_audio.py's defaults
+MIN_CLIP_SEC     = 0.4
+MAX_CLIP_SEC     = 12.0
+
+FRAME_QUEUE   = 500          # packets between receiver and VAD (~5 s)
+CLIP_QUEUE_MB = 4.0          # clips between VAD and transcriber (int16: ~2 min)
+LIVE_FILE     = "live_transcript.txt"
+
+
+class Pipeline:
+    """Receiver, VAD and transcriber stages around one shared model."""
+
+    def __init__(self, live_file: str = LIVE_FILE):
+        self.frames = queue.Queue(maxsize=FRAME_QUEUE)        # (arrival time, int16 frame)
+        self.clips  = ByteBudgetQueue(int(CLIP_QUEUE_MB * MB))  # (end time, int16 pcm, gain)
+        self.gate   = ConfidenceGate()
+
+        self.model       = None
+        self.model_ready = threading.Event()
+        self.model_error = None
+        self._loading    = False
+
+        self.received      = 0
+        self.lost          = 0      # sequence gaps from the Pico W
+        self.frames_dropped = 0
+        self.clips_dropped = 0
+
+        # live_transcript.txt, one line per final, written off the decode thread
+        name = os.path.splitext(os.path.basename(live_file))[0]
+        self.log = TranscriptWriter(os.path.dirname(live_file) or ".", name,
+                                    rotate_daily=False, max_bytes=1 << 62)
+        threading.Thread(target=self.log.run, daemon=True, name="writer").start()
+
+        self.stop_event = threading.Event()
+        self.supervisor = Supervisor([
+            Stage("receiver",    self._receive),
+            Stage("vad",         self._segment,    inbox=self.frames),
+            Stage("transcriber", self._transcribe, inbox=self.clips, stall_sec=60.0),
+        ])
+        threading.Thread(target=self.supervisor.run, args=(self.stop_event,),
+                         daemon=True, name="supervisor").start()
+
+    # ── Control ───────────────────────────────────────────────────────────────
+
+    def start_receiving(self) -> None:
+        self.supervisor.start("receiver", "vad")
+
+    def stop_receiving(self) -> None:
+        self.supervisor.stop("receiver", "vad")
+
+    def start_transcribing(self) -> None:
+        self.load_model()
+        self.supervisor.start("transcriber")
+
+    def stop_transcribing(self) -> None:
+        self.supervisor.stop("transcriber")
+
+    def shutdown(self) -> None:
+        self.stop_event.set()
+        self.supervisor.stop()
+        self.log.close()
+
+    def load_model(self) -> None:
+        """Load and warm up the model in the background, once."""
+        if self._loading or self.model_ready.is_set():
+            return
+        self._loading = True
+
+        def _load():
+            try:
+                model, report = start_model(MODEL_SIZE, DEVICE, COMPUTE_TYPE, cpu_threads=CPU_THREADS)
+                print(f"Model ready -- {format_report(report)}")
+                self.model = model
+                self.model_ready.set()
+            except Exception as exc:
+                self.model_error = str(exc)
+                print(f"Model load failed: {exc!r}")
+            finally:
+                self._loading = False
+        threading.Thread(target=_load, daemon=True, name="model-loader").start()
+
+    # ── Stages ────────────────────────────────────────────────────────────────
+
+    def _receive(self, stage: Stage) -> None:
+        rx = PicoReceiver(PICO_W_IP, UDP_PORT, reuse_addr=True)
+        received, lost = self.received, self.lost     # totals across restarts
+        try:
+            rx.hello()
+            while not stage.stopping.is_set():
+                packet = rx.recv()
+                if packet is None:        # timed out; HELLO re-sent in case the Pico W rebooted
+                    stage.beat()
+                    continue
+                t0 = time.monotonic()
+                frame = packet[1]
+                try:
+                    self.frames.put_nowait((t0, frame))
+                except queue.Full:
+                    try:                  # VAD behind: the oldest frame goes
+                        self.frames.get_nowait()
+                        self.frames_dropped += 1
+                    except queue.Empty:
+                        pass
+                    self.frames.put_nowait((t0, frame))
+                self.received, self.lost = received + rx.received, lost + rx.lost
+                stage.record(time.monotonic() - t0)
+        finally:
+            rx.close()
+
+    def _segment(self, stage: Stage) -> None:
+        # DC-block and VAD state are per run; a restarted VAD starts from silence
+        dc_block = DcBlocker()
+        vad      = EnergyVad(VAD_THRESHOLD, VAD_SPEECH_ONSET, VAD_SILENCE_END, VAD_PRE_ROLL)
+        current, seg_samples = [], 0
+
+        while not stage.stopping.is_set():
+            try:
+                t_arrival, frame = self.frames.get(timeout=0.5)
+            except queue.Empty:
+                stage.beat()
+                continue
+            x     = dc_block(frame)
+            event = vad.push(x, frame_rms(x))
+
+            if event == ONSET:
+                current     = vad.take_pre_roll()
+                seg_samples = sum(len(f) for f in current)
+            elif vad.state == SPEECH or event == END:
+                current.append(x)
+                seg_samples += len(x)
+                if event == END or seg_samples >= MAX_CLIP_SEC * FS:
+                    self._queue_clip(current, t_arrival)
+                    vad.split()
+                    current, seg_samples = [], 0
+            stage.record(time.monotonic() - t_arrival)
+
+    def _queue_clip(self, frames: list, t_end: float) -> None:
+        audio = np.concatenate(frames)
+        if len(audio) < MIN_CLIP_SEC * FS:
+            return                        # noise burst
+        try:
+            self.clips.put_nowait((t_end, to_int16(audio), clip_gain(audio)))
+        except queue.Full:
+            self.clips_dropped += 1       # transcriber stopped or far behind
+
+    def _transcribe(self, stage: Stage) -> None:
+        while not self.model_ready.wait(timeout=1.0):
+            stage.beat()
+            if stage.stopping.is_set():
+                return
+        model = self.model
+
+        def decode(audio, beam_size=1, temperature=0):
+            segments, _ = model.transcribe(audio, beam_size=beam_size, temperature=temperature,
+                                           vad_filter=True, condition_on_previous_text=False,
+                                           language="en")
+            return segments
+
+        while not stage.stopping.is_set():
+            try:
+                t_end, pcm, gain = self.clips.get(timeout=0.5)
+            except queue.Empty:
+                stage.beat()
+                continue
+            stage.beat()
+            audio = to_float32(pcm, gain)
+            hyp   = self.gate.check(summarise(decode(audio)),
+                                    redecode=lambda: decode(audio, RETRY_BEAM_SIZE, RETRY_TEMPERATURES))
+            if hyp is not None:
+                self.log.append(hyp.text)
+            self.clips.task_done()
+            stage.record(time.monotonic() - t_end)
+
+    # ── Status ────────────────────────────────────────────────────────────────
+
+    def status(self) -> list:
+        return self.supervisor.status()
+
+    def stats(self) -> str:
+        pct = 100.0 * self.lost / max(self.received + self.lost, 1)
+        return (f"packets {self.received} (lost {pct:.1f}%)  dropped: "
+                f"{self.frames_dropped} frames, {self.clips_dropped} clips")
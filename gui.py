@@ -1,26 +1,24 @@
+import threading
 import tkinter as tk
 from tkinter import scrolledtext
-import subprocess # to run other scripts
-import os
-import json # save window size for later
-
-# config file name
-CONFIG_FILE = "gui_config.json"
+from gui_settings import Settings, geometry # window size, font, colour
+from tail_follow import FileFollower # reads only what was appended
+from escribe_pipeline import Pipeline # receiver / vad / transcriber threads
 
 class TranscriptionApp:
     def __init__(self, root):
         self.root = root
         self.root.title("eScribe GUI Test")
         
-        # load save/defaults
-        self.load_settings()
+        # defaults now, saved settings once the background read finishes
+        self.settings = Settings(self.root)
+        self.root.geometry(geometry(self.settings.values))
         self.root.configure(bg='black')
-        # var for background process
-        self.proc_receiver = None
-        self.proc_whisper = None
+        # receiver, vad and transcriber run in here now, supervised
+        self.pipeline = Pipeline()
+        self.stopping = False
         #default font size
         self.font_size = 18
-        self.last_size = 0
 
         #text color alternatives
         self.colors = ["white", "#32CD32", "yellow", "pink"]
@@ -28,12 +26,15 @@ class TranscriptionApp:
 
         # change this file for grabbing the text
         self.live_file = "live_transcript.txt" 
+        self.follower = FileFollower(self.live_file)
 
-        # bind resize to save
-        self.root.bind("<Configure>", self.save_settings_trigger)
+        # resize/move saves once the window settles
+        self.root.bind("<Configure>", self.settings.track_geometry)
 
         self.create_widgets()
+        self.settings.load_async(self.apply_settings)
         self.monitor_file()
+        self.update_status()
 
     def create_widgets(self):
         # header properties
@@ -63,6 +64,11 @@ class TranscriptionApp:
         #text color button
         tk.Button(controls, text="Color", command=self.cycle_color).pack(side="right", padx=10)
 
+        # per-stage state, latency and queue depth
+        self.status_label = tk.Label(self.root, text="", bg="black", fg="gray", anchor="w",
+                                     font=("Courier", 10))
+        self.status_label.pack(side="bottom", fill="x", padx=20)
+
         # main display properties
         self.display = scrolledtext.ScrolledText(self.root, wrap=tk.WORD, font=("Arial", self.font_size),
         bg="black", fg="white")
@@ -76,66 +82,111 @@ class TranscriptionApp:
         new_color = self.colors[self.color_index]
         # update color
         self.display.config(fg=new_color)
+        self.settings.set(color=new_color)
 
-    # --- Script Control Logic ---
+    # --- Pipeline Control Logic ---
 
     def toggle_receiver(self):
-        if self.proc_receiver is None:
-            self.proc_receiver = subprocess.Popen(['python3', 'Escribe Receiver.py'])
+        if not self.pipeline.supervisor.is_running("receiver"):
+            self.pipeline.start_receiving()
             self.recv_btn.config(text="Stop Receiving", bg="orange")
         else:
-            self.proc_receiver.terminate()
-            self.proc_receiver = None
+            self.pipeline.stop_receiving()
             self.recv_btn.config(text="Start Receiving", bg="SystemButtonFace")
 
     def toggle_transcribing(self):
-        if self.proc_whisper is None:
-            self.proc_whisper = subprocess.Popen(['python3', 'whisper_engine.py'])
+        if not self.pipeline.supervisor.is_running("transcriber"):
+            self.pipeline.start_transcribing() # model loads once, in the background
             self.trans_btn.config(text="Stop Transcribing", bg="green")
         else:
-            self.proc_whisper.terminate()
-            self.proc_whisper = None
+            self.pipeline.stop_transcribing()
             self.trans_btn.config(text="Start Transcribing", bg="SystemButtonFace")
 
+    def update_status(self):
+        if self.stopping:
+            return # leave "stopping..." up
+        # one line per refresh: state, latency and queue depth for each stage
+        parts = []
+        for s in self.pipeline.status():
+            lat = "-" if s["latency_ms"] is None else f"{s['latency_ms']:.0f}ms"
+            part = f"{s['name']}: {s['state']} {lat} q{s['depth']}"
+            if s["restarts"]:
+                part += f" r{s['restarts']}"
+            parts.append(part)
+        if self.pipeline.supervisor.is_running("transcriber") and not self.pipeline.model_ready.is_set():
+            parts.append("model: " + (self.pipeline.model_error or "loading"))
+        self.status_label.config(text="   ".join(parts) + "   " + self.pipeline.stats())
+        self.root.after(1000, self.update_status)
+
     def emergency_stop(self):
-        """Kills all sub-processes and exits"""
-        if self.proc_receiver: self.proc_receiver.terminate()
-        if self.proc_whisper: self.proc_whisper.terminate()
-        self.root.quit()
+        """Stops the pipeline and exits"""
+        if self.stopping:
+            return # already on the way out
+        self.stopping = True
+        self.status_label.config(text="stopping...")
+        self.settings.flush()
+        self.follower.close()
+        # joining the stages can take seconds, so not on the tk thread
+        done = threading.Event()
+        def _shutdown():
+            try:
+                self.pipeline.shutdown()
+            finally:
+                done.set()
+        threading.Thread(target=_shutdown, daemon=True, name="shutdown").start()
+        self.quit_when_done(done)
+
+    def quit_when_done(self, done):
+        # tk calls stay on the tk thread: check back until the worker is finished
+        if done.is_set():
+            self.root.quit()
+        else:
+            self.root.after(50, self.quit_when_done, done)
 
     # --- Layout Logic ---
 
-    def load_settings(self):
-        if os.path.exists(CONFIG_FILE):
-            with open(CONFIG_FILE, "r") as f:
-                data = json.load(f)
-                self.root.geometry(f"{data['w']}x{data['h']}+{data['x']}+{data['y']}")
-        else:
-            self.root.geometry("800x600+100+100")
-
-    def save_settings_trigger(self, event):
-        if event.widget == self.root:
-            geometry = self.root.geometry() 
-            w, rest = geometry.split('x')
-            h, x, y = rest.replace('+', ' ').replace('-', ' ').split()
-            settings = {"w": w, "h": h, "x": x, "y": y}
-            with open(CONFIG_FILE, "w") as f:
-                json.dump(settings, f)
+    def apply_settings(self, values):
+        # called once the saved settings have been read
+        self.root.geometry(geometry(values))
+        self.font_size = values["font_size"]
+        self.display.configure(font=("Arial", self.font_size))
+        if values["color"] in self.colors:
+            self.color_index = self.colors.index(values["color"])
+        self.display.config(fg=values["color"])
 
     def adjust_font(self, delta):
-        self.font_size += delta
+        self.font_size = max(6, self.font_size + delta)
         self.display.configure(font=("Arial", self.font_size))
+        self.settings.set(font_size=self.font_size)
 
     def monitor_file(self):
-        if os.path.exists(self.live_file):
-            size = os.path.getsize(self.live_file)
-            if size > self.last_size:
-                with open(self.live_file, "r") as f:
-                    self.display.delete('1.0', tk.END)
-                    self.display.insert(tk.END, f.read())
-                    self.display.see(tk.END)
-                self.last_size = size
-        self.root.after(500, self.monitor_file)
+        # inotify wakes us when the file changes (linux); otherwise poll
+        self.show_new_text()
+        fd = self.follower.fileno()
+        if fd is not None:
+            try:
+                self.root.tk.createfilehandler(fd, tk.READABLE, self.on_file_event)
+                return
+            except (AttributeError, tk.TclError):
+                pass # no file handlers in this Tk build
+        self.poll_file()
+
+    def on_file_event(self, fd, mask):
+        if self.follower.drain_events():
+            self.show_new_text()
+
+    def poll_file(self):
+        self.show_new_text()
+        self.root.after(500, self.poll_file)
+
+    def show_new_text(self):
+        # only the appended text goes into the widget
+        text, reset = self.follower.read_new()
+        if reset:
+            self.display.delete('1.0', tk.END) # file was truncated or replaced
+        if text:
+            self.display.insert(tk.END, text)
+            self.display.see(tk.END)
 
 if __name__ == "__main__":
     root = tk.Tk()
@@ -0,0 +1,158 @@
+"""
+GUI Settings Persistence
+========================
+The Tk GUIs used to rewrite gui_config.json on every <Configure> event --
+hundreds of synchronous writes a second on the SD card while the window
+was dragged, and a crash mid-write left a truncated file that failed to
+load.  Settings replaces that:
+
+  * Debounced.  Changes (geometry, font size, colour) are saved once the
+    window has been still for delay_ms, and only if something changed.
+  * Atomic.  Written to gui_config.json.tmp, fsynced, then os.replace()d
+    over the old file, off the Tk thread: a reader sees the old settings
+    or the new ones, never half of each.
+  * Asynchronous load.  The file is read on a background thread; the GUI
+    comes up with defaults and on_loaded(values) is called on the Tk
+    thread when the read finishes.  An unreadable file means defaults.
+
+    settings = Settings(root)
+    settings.load_async(app.apply_settings)
+    root.bind("<Configure>", settings.track_geometry)
+    settings.set(font_size=20)          # saved delay_ms later
+    settings.flush()                    # at exit
+"""
+
+import json
+import os
+import re
+import threading
+
+CONFIG_FILE = "gui_config.json"
+DEBOUNCE_MS = 500
+DEFAULTS    = {"w": 800, "h": 600, "x": 100, "y": 100, "font_size": 18, "color": "white"}
+
+_GEOMETRY = re.compile(r"(\d+)x(\d+)([+-]-?\d+)([+-]-?\d+)")
+
+
+def parse_geometry(geometry: str):
+    """'WxH+X+Y' -> dict(w, h, x, y), or None.  Negative offsets are kept."""
+    m = _GEOMETRY.fullmatch(geometry)
+    if m is None:
+        return None
+    w, h, x, y = m.groups()
+    return {"w": int(w), "h": int(h), "x": int(x.lstrip("+")), "y": int(y.lstrip("+"))}
+
+
+def geometry(values: dict) -> str:
+    return f"{int(values['w'])}x{int(values['h'])}+{int(values['x'])}+{int(values['y'])}"
+
+
+def read_settings(path: str = CONFIG_FILE, defaults: dict = DEFAULTS) -> dict:
+    """Defaults overlaid with whatever valid keys the file has."""
+    values = dict(defaults)
+    try:
+        with open(path, "r") as f:
+            data = json.load(f)
+    except (OSError, ValueError):
+        return values
+    if isinstance(data, dict):
+        for key, default in defaults.items():
+            try:
+                values[key] = type(default)(data[key])   # old files stored "838"
+            except (KeyError, TypeError, ValueError):
+                pass
+    return values
+
+
+def write_settings(values: dict, path: str = CONFIG_FILE) -> None:
+    tmp = path + ".tmp"
+    with open(tmp, "w") as f:
+        json.dump(values, f)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, path)
+
+
+class Settings:
+    """Debounced, atomic gui_config.json; all methods are called on the Tk thread."""
+
+    def __init__(self, root, path: str = CONFIG_FILE, defaults: dict = DEFAULTS,
+                 delay_ms: int = DEBOUNCE_MS):
+        self.root      = root
+        self.path      = path
+        self.delay_ms  = delay_ms
+        self.values    = dict(defaults)
+        self.defaults  = defaults
+        self.loaded    = False
+        self.writes    = 0
+        self._early    = {}             # set() before the load finished
+        self._saved    = None
+        self._after    = None
+        self._lock     = threading.Lock()
+
+    def load_async(self, on_loaded, poll_ms: int = 10) -> None:
+        result = []
+        threading.Thread(target=lambda: result.append(read_settings(self.path, self.defaults)),
+                         daemon=True, name="settings-load").start()
+
+        def _check():
+            if not result:
+                self.root.after(poll_ms, _check)
+                return
+            self._saved = dict(result[0])
+            self.values = {**result[0], **self._early}
+            self.loaded = True
+            on_loaded(dict(self.values))
+            if self._early:
+                self._schedule()
+        _check()
+
+    def set(self, **values) -> None:
+        self.values.update(values)
+        if not self.loaded:
+            self._early.update(values)
+            return
+        self._schedule()
+
+    def track_geometry(self, event) -> None:
+        """<Configure> handler for the root window."""
+        if event.widget is not self.root or not self.loaded:
+            return                      # children resizing, or before the saved geometry is applied
+        g = parse_geometry(self.root.geometry())
+        if g is not None and g["w"] > 1 and g["h"] > 1:
+            self.set(**g)
+
+    def _schedule(self) -> None:
+        if self._after is not None:
+            self.root.after_cancel(self._after)
+        self._after = self.root.after(self.delay_ms, self._save)
+
+    def _save(self) -> None:
+        self._after = None
+        if self.values == self._saved:
+            return
+        self._saved = dict(self.values)
+        threading.Thread(target=self._write, args=(self._saved,), daemon=True,
+                         name="settings-save").start()
+
+    def _write(self, values: dict) -> None:
+        with self._lock:
+            if values is not self._saved:
+                return                  # a newer save is on its way
+            try:
+                write_settings(values, self.path)
+                self.writes += 1
+            except OSError as exc:
+                print(f"Could not save settings: {exc}")
+
+    def flush(self) -> None:
+        """Write a pending change now (at exit)."""
+        if self._after is not None:
+            self.root.after_cancel(self._after)
+            self._after = None
+        if self.loaded and self.values != self._saved:
+            self._saved = dict(self.values)
+            self._write(self._saved)
+        else:
+            with self._lock:
+                pass                    # let a save already in flight finish
@@ -0,0 +1,294 @@
+"""
+Incremental Log-Mel Feature Cache
+=================================
+Computes Whisper log-mel frames once per audio sample, as packets arrive,
+and keeps them in a ring indexed by absolute sample offset.
+
+Why:
+  The fixed-window scripts (pi5testredux.py, pi5test319g.py) transcribe
+  CHUNK_SECONDS + OVERLAP_SECONDS windows, so the overlap is pushed through
+  the STFT twice.  The interim passes in pi5test329.py are worse -- every
+  1.5 s they recompute the spectrogram of the whole utterance prefix.
+  With the cache, the STFT + mel filterbank runs exactly once per hop and a
+  transcription window is just a slice of cached frames.
+
+How it plugs into faster-whisper:
+  WhisperModel.transcribe() calls model.feature_extractor(audio) internally.
+  install_feature_cache() swaps that for CachedFeatureExtractor, which hands
+  back the staged window from the cache instead of recomputing it:
+
+      extractor = install_feature_cache(model)
+      cache     = LogMelCache.for_model(model, seconds=30)   # or .for_whisper()
+      cache.push(samples)                     # UDP thread, every packet
+      ...
+      with extractor.use(cache.window(start, end, gain)):
+          model.transcribe(audio, vad_filter=False, ...)
+
+  vad_filter must be off on the cached path: the Silero pass trims the audio
+  before feature extraction, so the trimmed clip no longer lines up with the
+  cached frames and the extractor falls back to computing them from scratch.
+
+Frame layout matches faster-whisper's FeatureExtractor: Hann window of
+n_fft samples centred on every hop_length-th sample, power spectrum through
+the model's own mel filterbank, log10 clipped at 1e-10.  The per-window
+dynamic-range clamp (max - 8) and the (x + 4) / 4 scaling depend on the
+whole window, so they are applied when a window is assembled, not cached.
+"""
+
+import inspect
+import threading
+from contextlib import contextmanager
+
+import numpy as np
+
+LOG_FLOOR = -10.0   # log10(1e-10) -- value of an all-zero (padding) frame
+
+
+def mel_filters(sr: int = 16000, n_fft: int = 400, n_mels: int = 80) -> np.ndarray:
+    """
+    Slaney-style mel filterbank, shape (n_mels, n_fft // 2 + 1).
+
+    Same weights as faster_whisper's FeatureExtractor.get_mel_filters, kept
+    here so the cache can start filling before faster_whisper (and
+    CTranslate2 behind it) has been imported.
+    """
+    fftfreqs = np.fft.rfftfreq(n=n_fft, d=1.0 / sr)
+    mels     = np.linspace(0.0, 45.245640471924965, n_mels + 2)
+
+    # Linear below 1 kHz, logarithmic above
+    f_sp        = 200.0 / 3
+    freqs       = f_sp * mels
+    min_log_hz  = 1000.0
+    min_log_mel = min_log_hz / f_sp
+    logstep     = np.log(6.4) / 27.0
+    log_t       = mels >= min_log_mel
+    freqs[log_t] = min_log_hz * np.exp(logstep * (mels[log_t] - min_log_mel))
+
+    fdiff   = np.diff(freqs)
+    ramps   = freqs.reshape(-1, 1) - fftfreqs.reshape(1, -1)
+    lower   = -ramps[:-2] / fdiff[:-1, None]
+    upper   = ramps[2:] / fdiff[1:, None]
+    weights = np.maximum(0.0, np.minimum(lower, upper))
+
+    enorm = 2.0 / (freqs[2:n_mels + 2] - freqs[:n_mels])
+    return (weights * enorm[:, None]).astype(np.float32)
+
+
+class LogMelCache:
+    """Ring of log10 mel frames, fed incrementally with float32 samples."""
+
+    def __init__(self, mel_filters: np.ndarray, n_fft: int = 400,
+                 hop_length: int = 160, capacity_sec: float = 30.0,
+                 fs: int = 16000):
+        self.n_fft      = n_fft
+        self.hop_length = hop_length
+        self.fs         = fs
+        self.n_mels     = mel_filters.shape[0]
+
+        self._filters_t = np.ascontiguousarray(mel_filters.T, dtype=np.float32)
+        self._window    = np.hanning(n_fft + 1)[:-1].astype(np.float32)
+        self._offsets   = np.arange(n_fft)
+
+        self.capacity = int(capacity_sec * fs / hop_length)
+        self._ring    = np.full((self.capacity, self.n_mels), LOG_FLOOR, dtype=np.float32)
+        self._lock    = threading.Lock()
+
+        # Frame k is centred on absolute sample k * hop_length, so frame 0
+        # needs n_fft // 2 samples of left context -- zeros, like a stream
+        # that started in silence.
+        self._pending  = np.zeros(n_fft // 2, dtype=np.float32)
+        self.n_frames  = 0   # frames computed so far (absolute count)
+        self.n_samples = 0   # samples pushed so far (absolute count)
+
+    @classmethod
+    def for_whisper(cls, n_mels: int = 80, seconds: float = 30.0, fs: int = 16000) -> "LogMelCache":
+        """Build a cache with Whisper's STFT geometry without loading a model."""
+        return cls(mel_filters(fs, 400, n_mels), n_fft=400, hop_length=160,
+                   capacity_sec=seconds, fs=fs)
+
+    @classmethod
+    def for_model(cls, model, seconds: float = 30.0) -> "LogMelCache":
+        """Build a cache using the model's own filterbank and STFT geometry."""
+        fe = model.feature_extractor
+        fe = getattr(fe, "inner", fe)   # unwrap CachedFeatureExtractor
+        return cls(
+            np.asarray(fe.mel_filters),
+            n_fft=fe.n_fft,
+            hop_length=fe.hop_length,
+            capacity_sec=seconds,
+            fs=fe.sampling_rate,
+        )
+
+    # ── Producer side ─────────────────────────────────────────────────────────
+
+    def push(self, samples: np.ndarray) -> None:
+        """Append samples and compute every frame whose window is now complete."""
+        buf = np.concatenate((self._pending, samples.astype(np.float32, copy=False)))
+        n_new = 0
+        if len(buf) >= self.n_fft:
+            n_new = (len(buf) - self.n_fft) // self.hop_length + 1
+
+        if n_new:
+            idx    = self._offsets[None, :] + self.hop_length * np.arange(n_new)[:, None]
+            spec   = np.fft.rfft(buf[idx] * self._window, axis=1)
+            power  = (spec.real ** 2 + spec.imag ** 2).astype(np.float32)
+            logmel = np.log10(np.maximum(power @ self._filters_t, 1e-10))
+            self._store(logmel)
+
+        self._pending   = buf[n_new * self.hop_length:]
+        self.n_samples += len(samples)
+
+    def push_silence(self, n: int) -> None:
+        """
+        Append n zero samples (audio that never arrived).  Frames that would
+        scroll out of the ring before anything reads them are counted, not
+        computed, so a gap of minutes costs the same as a few seconds.
+        """
+        keep = self.capacity * self.hop_length + self.n_fft
+        skip = max(0, n - keep)
+        skip -= skip % self.hop_length
+        if skip:
+            # _pending now sits skip samples early; the zeros pushed below
+            # overwrite every ring frame that could have been built from it
+            self.n_frames  += skip // self.hop_length
+            self.n_samples += skip
+        chunk = self.fs
+        for i in range(0, n - skip, chunk):
+            self.push(np.zeros(min(chunk, n - skip - i), dtype=np.float32))
+
+    def _store(self, logmel: np.ndarray) -> None:
+        n = len(logmel)
+        if n > self.capacity:
+            logmel = logmel[-self.capacity:]
+            skipped = n - self.capacity
+        else:
+            skipped = 0
+        with self._lock:
+            pos   = (self.n_frames + skipped) % self.capacity
+            first = min(len(logmel), self.capacity - pos)
+            self._ring[pos:pos + first] = logmel[:first]
+            self._ring[:len(logmel) - first] = logmel[first:]
+            self.n_frames += n
+
+    # ── Consumer side ─────────────────────────────────────────────────────────
+
+    def log_frames(self, start_sample: int, end_sample: int) -> np.ndarray:
+        """
+        Raw log10 mel frames for [start_sample, end_sample), shape (n_mels, n).
+
+        The last frame of a window needs n_fft // 2 samples past its centre,
+        so it may not be computed yet; missing trailing frames are returned
+        as LOG_FLOOR (silence) rather than recomputed.
+        """
+        first = start_sample // self.hop_length
+        count = max(0, (end_sample - start_sample) // self.hop_length)
+        out   = np.full((count, self.n_mels), LOG_FLOOR, dtype=np.float32)
+
+        # Frames before the start of the stream (a window sliced before the
+        # ring filled up) are silence, same as the zeroed audio ring.
+        lead  = min(count, max(0, -first))
+        first = max(0, first)
+
+        with self._lock:
+            oldest = max(0, self.n_frames - self.capacity)
+            if first < oldest:
+                raise ValueError(
+                    f"window starts at frame {first}, cache only holds {oldest}+"
+                )
+            avail = max(0, min(count - lead, self.n_frames - first))
+            if avail:
+                pos = first % self.capacity
+                n1  = min(avail, self.capacity - pos)
+                out[lead:lead + n1] = self._ring[pos:pos + n1]
+                out[lead + n1:lead + avail] = self._ring[:avail - n1]
+        return out.T
+
+    def window(self, start_sample: int, end_sample: int, gain: float = 1.0) -> "CachedWindow":
+        """Assemble a transcription window from cached frames."""
+        frames = self.log_frames(start_sample, end_sample)
+        if gain <= 0:
+            frames = np.full_like(frames, LOG_FLOOR)   # gated / muted window
+        elif gain != 1.0:
+            # Scaling audio by g scales power by g^2 -> constant log10 offset
+            frames = frames + np.float32(2.0 * np.log10(gain))
+        return CachedWindow(frames, end_sample - start_sample)
+
+
+class CachedWindow:
+    """Log10 mel frames for one window, waiting to be handed to the encoder."""
+
+    __slots__ = ("log_frames", "n_samples")
+
+    def __init__(self, log_frames: np.ndarray, n_samples: int):
+        self.log_frames = log_frames
+        self.n_samples  = n_samples
+
+    def features(self, n_frames: int) -> np.ndarray:
+        """
+        Pad to n_frames with silence, then apply Whisper's per-window
+        dynamic-range clamp and scaling -- the same last two steps as
+        FeatureExtractor.__call__.
+        """
+        content = self.log_frames[:, :n_frames]
+        spec = np.full((content.shape[0], n_frames), LOG_FLOOR, dtype=np.float32)
+        spec[:, :content.shape[1]] = content
+        spec = np.maximum(spec, spec.max() - 8.0)
+        return (spec + 4.0) / 4.0
+
+
+class CachedFeatureExtractor:
+    """
+    Drop-in replacement for model.feature_extractor.
+
+    Returns the staged CachedWindow when the audio handed to it has the
+    staged length; anything else (VAD-trimmed clips, warm-up audio, a window
+    that was never staged) goes to the real extractor unchanged.
+    """
+
+    def __init__(self, inner):
+        self.inner  = inner
+        self._local = threading.local()
+        self.hits   = 0
+        self.misses = 0
+
+        # faster-whisper < 1.1 pads with a full 30 s chunk of zeros
+        # (padding=True); newer releases pad with 160 samples (padding=160).
+        param   = inspect.signature(inner.__call__).parameters.get("padding")
+        default = param.default if param is not None else 0
+        self._pad_samples = inner.n_samples if default is True else int(default or 0)
+
+    def __getattr__(self, name):
+        return getattr(self.inner, name)
+
+    @contextmanager
+    def use(self, window: CachedWindow):
+        """Stage a cached window for the next feature_extractor call on this thread."""
+        self._local.window = window
+        try:
+            yield
+        finally:
+            self._local.window = None
+
+    def __call__(self, waveform, padding=None, chunk_length=None, **kwargs):
+        window = getattr(self._local, "window", None)
+        if (window is None or chunk_length is not None
+                or len(waveform) != window.n_samples):
+            self.misses += 1
+            if padding is None:
+                return self.inner(waveform, chunk_length=chunk_length, **kwargs)
+            return self.inner(waveform, padding=padding, chunk_length=chunk_length, **kwargs)
+
+        self.hits += 1
+        pad = self._pad_samples if padding is None else (
+            self.inner.n_samples if padding is True else int(padding or 0)
+        )
+        return window.features((window.n_samples + pad) // self.inner.hop_length)
+
+
+def install_feature_cache(model) -> CachedFeatureExtractor:
+    """Wrap model.feature_extractor (idempotent) and return the wrapper."""
+    fe = model.feature_extractor
+    if not isinstance(fe, CachedFeatureExtractor):
+        fe = CachedFeatureExtractor(fe)
+        model.feature_extractor = fe
+    return fe
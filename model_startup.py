@@ -0,0 +1,308 @@
+"""
+Model Startup -- offline weight cache, warm-up and startup benchmark
+=====================================================================
+One place for everything between "process started" and "first caption":
+
+  1. Offline resolution.  Models are looked up in ./models (or
+     $ESCRIBE_MODEL_DIR) and the local Hugging Face cache only.  The hub is
+     never contacted at startup -- HF_HUB_OFFLINE is forced before
+     faster-whisper is imported, so the lecture AP can stay air-gapped.
+     Populate the cache once on a networked machine:
+
+         python model_startup.py fetch tiny.en base.en
+
+  2. Path load.  CTranslate2 is given the model directory and reads
+     model.bin into its own buffers itself.  Its files= argument is not
+     used: it copies whatever it is given into memory, so an mmap or bytes
+     object there only adds a second full copy to peak RSS.
+
+  3. Warm-up.  The first decode after load is slow (allocator, thread pool,
+     kernel selection).  warm_up() pays that on a short synthetic clip.
+
+  4. Benchmark.  Every start records import / load / first-decode time per
+     model and compute type to logs/startup_bench.jsonl:
+
+         python model_startup.py report
+         python model_startup.py bench tiny.en base.en --compute-type int8 float32
+
+  5. systemd.  notify_systemd("READY=1") tells a Type=notify unit that the
+     model is loaded and warm; see system/whisper.service.
+
+  6. Tuned settings.  `python autotune.py` benchmarks model size,
+     compute type and thread count on this machine and writes
+     tuned_config.json; tuned_settings() hands the scripts its choice in
+     place of their hard-coded defaults.
+"""
+
+import argparse
+import json
+import os
+import socket
+import subprocess
+import sys
+import time
+from datetime import datetime
+
+import numpy as np
+
+REPO_DIR     = os.path.dirname(os.path.abspath(__file__))
+BENCH_LOG    = os.path.join("logs", "startup_bench.jsonl")
+TUNED_CONFIG = os.path.join(REPO_DIR, "tuned_config.json")
+
+FS = 16000
+
+# Never reach for the hub from a running pipeline
+os.environ.setdefault("HF_HUB_OFFLINE", "1")
+
+
+def model_dir() -> str:
+    """Offline model cache: $ESCRIBE_MODEL_DIR (read late, after load_dotenv) or ./models."""
+    return os.getenv("ESCRIBE_MODEL_DIR", os.path.join(REPO_DIR, "models"))
+
+
+def tuned_config_path() -> str:
+    return os.getenv("ESCRIBE_TUNED_CONFIG", TUNED_CONFIG)
+
+
+def tuned_settings(model_size: str, compute_type: str, cpu_threads: int = 0) -> tuple:
+    """
+    (model_size, compute_type, cpu_threads) from the autotune config if
+    there is one, else the script's own defaults as passed in.
+    """
+    path = tuned_config_path()
+    try:
+        with open(path) as f:
+            chosen = json.load(f)["chosen"]
+    except (OSError, ValueError, KeyError, TypeError):
+        return model_size, compute_type, cpu_threads
+    print(f"Using tuned settings from {path}: {chosen['model']} [{chosen['compute_type']}] "
+          f"x{chosen['cpu_threads']} threads")
+    return chosen["model"], chosen["compute_type"], int(chosen["cpu_threads"])
+
+
+# ─── Import ───────────────────────────────────────────────────────────────────
+
+def import_faster_whisper() -> float:
+    """Import faster_whisper (CTranslate2, tokenizers, onnxruntime); return seconds taken."""
+    t0 = time.perf_counter()
+    import faster_whisper  # noqa: F401
+    return time.perf_counter() - t0
+
+
+# ─── Offline resolution ───────────────────────────────────────────────────────
+
+def resolve_model_path(model_size: str, cache_root: str = None) -> str:
+    """
+    Return a local directory holding the converted model, without network.
+
+    Looks at: an explicit directory path, <cache>/<size>,
+    <cache>/faster-whisper-<size>, then the HF cache (in <cache> and the
+    default location) with local_files_only.
+    """
+    cache_root = cache_root or model_dir()
+    if os.path.isfile(os.path.join(model_size, "model.bin")):
+        return model_size
+
+    for name in (model_size, f"faster-whisper-{model_size}"):
+        path = os.path.join(cache_root, name)
+        if os.path.isfile(os.path.join(path, "model.bin")):
+            return path
+
+    from faster_whisper.utils import download_model
+    for cache_dir in (cache_root, None):
+        try:
+            return download_model(model_size, local_files_only=True, cache_dir=cache_dir)
+        except Exception:
+            continue
+
+    raise FileNotFoundError(
+        f"Model '{model_size}' is not in {cache_root} or the local HF cache. "
+        f"On a networked machine run: python model_startup.py fetch {model_size}"
+    )
+
+
+def fetch_model(model_size: str, cache_root: str = None) -> str:
+    """Download a model into <cache>/<size> (the only online operation here)."""
+    os.environ["HF_HUB_OFFLINE"] = "0"
+    from faster_whisper.utils import download_model
+    return download_model(model_size, output_dir=os.path.join(cache_root or model_dir(), model_size))
+
+
+# ─── Load ─────────────────────────────────────────────────────────────────────
+
+def load_model(model_size: str, device: str = "cpu", compute_type: str = "int8",
+               cache_root: str = None, **kwargs):
+    """Load a WhisperModel from the offline cache.  Returns (model, path)."""
+    from faster_whisper import WhisperModel
+
+    path = resolve_model_path(model_size, cache_root)
+    return WhisperModel(path, device=device, compute_type=compute_type, **kwargs), path
+
+
+# ─── Warm-up ──────────────────────────────────────────────────────────────────
+
+def synthetic_clip(seconds: float = 1.5, fs: int = FS) -> np.ndarray:
+    """
+    Deterministic speech-like clip: a gliding harmonic tone with a 4 Hz
+    syllable envelope plus a little noise.  Enough to run the encoder and a
+    few decoder steps; silence would stop at the no-speech check.
+    """
+    t     = np.arange(int(seconds * fs)) / fs
+    f0    = 120.0 + 40.0 * np.sin(2 * np.pi * 0.7 * t)
+    phase = 2 * np.pi * np.cumsum(f0) / fs
+    voice = sum(np.sin(k * phase) / k for k in range(1, 6))
+    env   = 0.5 * (1 - np.cos(2 * np.pi * 4.0 * t))
+    noise = np.random.default_rng(0).standard_normal(len(t)) * 0.01
+    clip  = voice * env + noise
+    return (clip / np.max(np.abs(clip)) * 0.5).astype(np.float32)
+
+
+def warm_up(model, seconds: float = 1.5) -> float:
+    """Run one throwaway decode; return its wall time (the first-decode time)."""
+    t0 = time.perf_counter()
+    segments, _ = model.transcribe(
+        synthetic_clip(seconds),
+        beam_size=1,
+        temperature=0,
+        vad_filter=False,
+        condition_on_previous_text=False,
+        language="en",
+    )
+    list(segments)
+    return time.perf_counter() - t0
+
+
+# ─── Full startup + record ────────────────────────────────────────────────────
+
+def start_model(model_size: str, device: str = "cpu", compute_type: str = "int8",
+                cache_root: str = None, on_stage=None, record: bool = True, **kwargs):
+    """
+    Import, load from the offline cache and warm up.  on_stage(text) is
+    called before each stage (for a GUI status line).  Returns
+    (model, report) where report holds the per-stage timings.
+    """
+    stage = on_stage or (lambda text: None)
+
+    stage("Importing faster-whisper...")
+    import_s = import_faster_whisper()
+
+    stage(f"Loading {model_size} ({compute_type})...")
+    t0 = time.perf_counter()
+    model, path = load_model(model_size, device, compute_type, cache_root, **kwargs)
+    load_s = time.perf_counter() - t0
+
+    stage(f"Warming up {model_size}...")
+    first_decode_s = warm_up(model)
+
+    report = {
+        "time":           datetime.now().isoformat(timespec="seconds"),
+        "model":          model_size,
+        "compute_type":   compute_type,
+        "device":         device,
+        "cpu_threads":    kwargs.get("cpu_threads", 0),
+        "path":           path,
+        "import_s":       round(import_s, 3),
+        "load_s":         round(load_s, 3),
+        "first_decode_s": round(first_decode_s, 3),
+    }
+    if record:
+        record_startup(report)
+    return model, report
+
+
+def record_startup(report: dict, path: str = BENCH_LOG) -> None:
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    with open(path, "a") as f:
+        f.write(json.dumps(report) + "\n")
+
+
+def format_report(report: dict) -> str:
+    return (f"{report['model']} [{report['compute_type']}] "
+            f"import {report['import_s']:.2f}s  load {report['load_s']:.2f}s  "
+            f"first decode {report['first_decode_s']:.2f}s")
+
+
+# ─── systemd readiness ────────────────────────────────────────────────────────
+
+def notify_systemd(state: str = "READY=1") -> bool:
+    """
+    sd_notify() without libsystemd: send state to $NOTIFY_SOCKET.  A no-op
+    (returns False) when not running under a Type=notify unit.
+    """
+    addr = os.getenv("NOTIFY_SOCKET")
+    if not addr:
+        return False
+    if addr.startswith("@"):
+        addr = "\0" + addr[1:]   # abstract namespace
+    try:
+        with socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM) as s:
+            s.connect(addr)
+            s.sendall(state.encode())
+        return True
+    except OSError:
+        return False
+
+
+# ─── CLI ──────────────────────────────────────────────────────────────────────
+
+def _print_summary(path: str = BENCH_LOG) -> None:
+    if not os.path.exists(path):
+        print(f"No startup records in {path}")
+        return
+    rows = {}
+    with open(path) as f:
+        for line in f:
+            try:
+                r = json.loads(line)
+            except json.JSONDecodeError:
+                continue
+            rows.setdefault((r["model"], r["compute_type"]), []).append(r)
+
+    print(f"{'model':<14}{'compute':<10}{'runs':>5}{'import':>9}{'load':>9}{'1st dec':>9}")
+    for (model, ctype), rs in sorted(rows.items()):
+        med = lambda k: float(np.median([r[k] for r in rs]))
+        print(f"{model:<14}{ctype:<10}{len(rs):>5}"
+              f"{med('import_s'):>8.2f}s{med('load_s'):>8.2f}s{med('first_decode_s'):>8.2f}s")
+
+
+def main(argv=None) -> int:
+    ap  = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    sub = ap.add_subparsers(dest="cmd", required=True)
+
+    p_fetch = sub.add_parser("fetch", help="download models into the offline cache (needs network)")
+    p_fetch.add_argument("models", nargs="+")
+
+    sub.add_parser("report", help="summarise recorded startup times")
+
+    p_bench = sub.add_parser("bench", help="cold-start each model/compute type in a fresh process")
+    p_bench.add_argument("models", nargs="+")
+    p_bench.add_argument("--compute-type", nargs="+", default=["int8"])
+    p_bench.add_argument("--runs", type=int, default=1)
+
+    p_one = sub.add_parser("start", help=argparse.SUPPRESS)   # one bench run (child process)
+    p_one.add_argument("model")
+    p_one.add_argument("compute_type")
+
+    args = ap.parse_args(argv)
+
+    if args.cmd == "fetch":
+        for m in args.models:
+            print(f"{m} -> {fetch_model(m)}")
+    elif args.cmd == "report":
+        _print_summary()
+    elif args.cmd == "start":
+        _, report = start_model(args.model, compute_type=args.compute_type)
+        print(format_report(report))
+    elif args.cmd == "bench":
+        # Separate interpreters so import time is a real cold import
+        for m in args.models:
+            for ctype in args.compute_type:
+                for _ in range(args.runs):
+                    subprocess.run([sys.executable, os.path.abspath(__file__), "start", m, ctype],
+                                   check=False)
+        _print_summary()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
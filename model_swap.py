@@ -0,0 +1,115 @@
+"""
+Runtime Model Hot-Swap
+======================
+Changing MODEL_SIZE used to mean a restart: the UDP stream kept arriving
+while nothing listened, and the new model paid its warm-up in front of the
+audience.  ModelSwapper loads the replacement on a background thread while
+the current model keeps decoding, and hands it over only *between* clips:
+
+    request("base.en")          GUI / control socket / thermal governor
+      -> loader thread          start_model(): offline load + warm-up
+    poll()                      transcriber, between two clips
+      -> ("base.en", model)     caller installs it; the old one is released
+
+  * No gap.  Audio keeps queueing during the load; the clip being decoded
+    finishes on the old model and the next one starts on the new.
+  * Freed, not leaked.  The swapper drops its reference to the old model
+    at the handover; CTranslate2 releases the weights as soon as the last
+    decode still using it (e.g. a refinement pass) returns.
+  * One load at a time.  A request while another model is loading replaces
+    the pending choice once that load finishes; a failed load leaves the
+    current model in place.
+
+Peak memory during a swap is both models at once -- tiny.en + base.en is
+well inside a Pi 5's RAM, small.en on a 2 GB board is not.
+
+    swapper = ModelSwapper(lambda name: start_model(name, ...)[0], "tiny.en", model)
+    swapper.request("base.en")
+    ...
+    swap = swapper.poll()          # between clips
+    if swap is not None:
+        name, model = swap
+"""
+
+import threading
+import time
+
+
+class ModelSwapper:
+    """Background load of a replacement model, handed over by poll()."""
+
+    def __init__(self, load, name: str = None, model=None, on_event=None):
+        self._load     = load                   # name -> model (loaded and warm)
+        self._notify   = on_event or (lambda text: None)
+        self.name      = name
+        self.model     = model
+        self.loading   = None                   # name being loaded
+        self._wanted   = None                   # requested while loading
+        self._ready    = None                   # (name, model, load seconds) awaiting poll()
+        self._lock     = threading.Lock()
+        self.swaps     = 0
+        self.failures  = 0
+
+    def install(self, name: str, model) -> None:
+        """Record the model loaded at startup."""
+        with self._lock:
+            self.name, self.model = name, model
+
+    def request(self, name: str) -> str:
+        """Start loading name in the background; returns a one-line answer."""
+        with self._lock:
+            if self.loading:
+                if name == self.loading:
+                    return f"{name} is already loading"
+                self._wanted = name
+                return f"{name} queued after {self.loading}"
+            if name == self.name and self._ready is None:
+                return f"{name} is already live"
+            self.loading = name
+        threading.Thread(target=self._run, args=(name,), daemon=True,
+                         name=f"model-swap-{name}").start()
+        return f"loading {name}"
+
+    def _run(self, name: str) -> None:
+        self._notify(f"⟳ loading {name}")
+        t0 = time.monotonic()
+        try:
+            model = self._load(name)
+        except Exception as exc:
+            model = None
+            print(f"Model swap to {name} failed: {exc!r}")
+            self._notify(f"✖ {name} failed to load")
+        with self._lock:
+            if model is None:
+                self.failures += 1
+            else:
+                self._ready = (name, model, time.monotonic() - t0)
+            self.loading = None
+            wanted, self._wanted = self._wanted, None
+        if wanted and wanted != name:
+            self.request(wanted)
+
+    def poll(self):
+        """
+        Between clips: (name, model) if a replacement is ready -- the caller
+        switches to it -- else None.  The previous model is released here.
+        """
+        if self._ready is None:          # unlocked fast path, every clip
+            return None
+        with self._lock:
+            name, model, load_s = self._ready
+            self._ready = None
+            old_name    = self.name
+            self.name, self.model = name, model
+            self.swaps += 1
+        print(f"Model swapped {old_name} -> {name} (loaded in {load_s:.1f}s)")
+        return name, model
+
+    def stats(self) -> str:
+        parts = [f"model {self.name}"]
+        if self.loading:
+            parts.append(f"loading {self.loading}")
+        parts.append(f"{self.swaps} swap(s)")
+        if self.failures:
+            parts.append(f"{self.failures} failed")
+        return "  ".join(parts)
@@ -18,7 +18,9 @@ Key improvements vs previous version:
      the start of a word is never clipped.
 
   3. Vectorised DC-block via scipy.signal.lfilter (C-speed IIR) instead of
-     a per-sample Python loop -- 100-200x faster.
+     a per-sample Python loop -- 100-200x faster.  Receiver, DC block and
+     VAD state machine live in udp_audio.py, shared with pi5test329.py and
+     escribe_pipeline.py.
 
   4. temperature=0 passed to Whisper for deterministic, slightly faster decoding.
 
@@ -30,15 +32,19 @@ Tuning VAD_THRESHOLD:
   Set PRINT_RMS = True to see live RMS values and dial it in.
 """
 
-import socket
-import struct
 import os
 import queue
 import threading
 import time
 import numpy as np
-from faster_whisper import WhisperModel
-from scipy import signal
+from model_startup import tuned_settings, start_model, format_report, notify_systemd
+from spill_log import SpillLog
+from byte_queue import MB, ByteBudgetQueue, to_int16, to_float32
+from confidence import ConfidenceGate, summarise, RETRY_BEAM_SIZE, RETRY_TEMPERATURES
+from prompt_context import PromptContext, load_vocabulary
+from transcript_writer import TranscriptWriter
+from udp_audio import (PicoReceiver, DcBlocker, EnergyVad, frame_rms, clip_gain,
+                       ONSET, END, SPEECH)
 from datetime import datetime
 from zoneinfo import ZoneInfo
 from dotenv import load_dotenv
@@ -51,6 +57,9 @@ FS           = 16000            # must match Pico W SAMPLE_RATE
 MODEL_SIZE   = "tiny.en"
 DEVICE       = "cpu"
 COMPUTE_TYPE = "int8"
+CPU_THREADS  = 0             # 0 = CTranslate2 default
+# `python autotune.py` measures these on this machine; its choice wins
+MODEL_SIZE, COMPUTE_TYPE, CPU_THREADS = tuned_settings(MODEL_SIZE, COMPUTE_TYPE, CPU_THREADS)
 
 # VAD tuning
 # Each "frame" = one UDP packet = 10 ms of audio (160 samples at 16 kHz).
@@ -68,217 +77,199 @@ MAX_CLIP_SEC     = 12.0   # force-flush if a segment grows too long
 
 PRINT_RMS = False          # set True temporarily to calibrate VAD_THRESHOLD
 
+# Overflow: segments that don't fit in trans_queue go to an on-disk log
+# (spill_log.py) and are replayed in order -- also after a crash / restart.
+SPILL_FILE   = "spill/pi5test319c.spill"
+SPILL_MAX_MB = 512
+
+TRANS_QUEUE_MB = 4.0      # in-memory queue budget (int16: ~2 min of audio)
+
+# Rolling initial_prompt: last PROMPT_HISTORY finals + session vocabulary
+# (prompt_context.py), at most PROMPT_MAX_TOKENS.  Set PROMPT_CONTEXT = False
+# to decode every segment without context.
+PROMPT_CONTEXT    = True
+PROMPT_MAX_TOKENS = 64
+PROMPT_HISTORY    = 4
+PROMPT_VOCAB_FILE = "session_vocab.txt"
+
 # ─── Logging ──────────────────────────────────────────────────────────────────
 
 load_dotenv()
 LOG_DIR  = "logs"
 os.makedirs(LOG_DIR, exist_ok=True)
 dt_str   = datetime.now(ZoneInfo("America/Chicago")).strftime("%Y-%m-%d_%H-%M-%S")
-LOG_FILE = f"{LOG_DIR}/{dt_str}.txt"
+# Written by the writer thread: batched, fsync'd within a second, rotated
+# daily / past 64 MB (transcript_writer.py)
+transcript_log = TranscriptWriter(LOG_DIR, dt_str)
 
 # ─── Load Whisper model ───────────────────────────────────────────────────────
 
 print("Loading Whisper model...")
-model = WhisperModel(MODEL_SIZE, device=DEVICE, compute_type=COMPUTE_TYPE)
-print("Model loaded.\n")
+model, startup = start_model(MODEL_SIZE, DEVICE, COMPUTE_TYPE, cpu_threads=CPU_THREADS)   # offline cache + warm-up
+print(f"Model loaded. {format_report(startup)}\n")
+
+prompt_context = None
+if PROMPT_CONTEXT:
+    prompt_context = PromptContext(PROMPT_MAX_TOKENS, PROMPT_HISTORY, load_vocabulary(PROMPT_VOCAB_FILE))
+    prompt_context.bind(model.hf_tokenizer)
 
 stop_event  = threading.Event()
-trans_queue = queue.Queue(maxsize=10)
-
-# ─── DC-block filter (stateful scipy IIR -- runs at C speed) ──────────────────
-#
-#  Transfer function:  H(z) = (1 - z^-1) / (1 - 0.999 z^-1)
-#  Passes everything above ~8 Hz; removes DC offset from the ADC midpoint.
-#
-_b_dc   = np.array([1.0, -1.0],   dtype=np.float64)
-_a_dc   = np.array([1.0, -0.999], dtype=np.float64)
-_zi_dc  = signal.lfilter_zi(_b_dc, _a_dc) * 0.0   # initial filter state
-_dc_lck = threading.Lock()
-
-def dc_block(x: np.ndarray) -> np.ndarray:
-    """Apply DC-blocking high-pass filter, preserving state across packets."""
-    global _zi_dc
-    with _dc_lck:
-        y, _zi_dc = signal.lfilter(_b_dc, _a_dc, x, zi=_zi_dc)
-    return y.astype(np.float32)
+trans_queue = ByteBudgetQueue(int(TRANS_QUEUE_MB * MB))   # int16 segments, bounded by bytes
+
+spill = SpillLog(SPILL_FILE, max_mb=SPILL_MAX_MB)
+if spill.recovered:
+    print(f"[spill] {spill.recovered} segment(s) left by the previous run -- replaying\n")
 
 # ─── Segment flusher ─────────────────────────────────────────────────────────
 
 def _flush_segment(frames: list) -> None:
-    """Concatenate frames, normalise, and push to the transcription queue."""
+    """Concatenate frames, normalise, and push to the transcription queue as int16."""
     if not frames:
         return
     audio = np.concatenate(frames)
     dur   = len(audio) / FS
     if dur < MIN_CLIP_SEC:
         return                        # too short -- likely a noise burst
-    peak = np.max(np.abs(audio))
-    if peak > 0:
-        audio = audio / peak * 0.5   # normalise to half full-scale
-    try:
-        trans_queue.put_nowait(audio)
-    except queue.Full:
-        print("[VAD] transcription queue full -- dropping segment")
+    audio = audio * clip_gain(audio)  # normalise to half full-scale
+    pcm = to_int16(audio)            # half the bytes; float32 again only at the model
+    if not len(spill):
+        try:
+            trans_queue.put_nowait(pcm)
+            return
+        except queue.Full:
+            pass
+    # Queue full, or already spilling (keeps segments in order): go to disk
+    if not spill.append(pcm, {"captured": time.time()}):
+        print("[VAD] spill log full -- dropping segment")
 
 # ─── UDP receive + VAD thread ─────────────────────────────────────────────────
 
 def udp_vad_loop() -> None:
     """
     Receives UDP audio packets from the Pico W.
-    Runs a per-frame energy VAD state machine and pushes complete speech
-    segments to trans_queue for transcription.
+    Runs a per-frame energy VAD state machine (udp_audio.py) and pushes
+    complete speech segments to trans_queue for transcription.
     """
-    sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
-    sock.bind(("0.0.0.0", UDP_PORT))
-    sock.settimeout(1.0)
+    rx       = PicoReceiver(PICO_W_IP, UDP_PORT)
+    dc_block = DcBlocker()      # DC offset from the ADC midpoint, state kept across packets
+    vad      = EnergyVad(VAD_THRESHOLD, VAD_SPEECH_ONSET, VAD_SILENCE_END, VAD_PRE_ROLL)
 
-    def send_hello():
-        with socket.socket(socket.AF_INET, socket.SOCK_DGRAM) as s:
-            s.sendto(b"HELLO", (PICO_W_IP, UDP_PORT))
-
-    send_hello()
+    rx.hello()
     print(f"Sent HELLO to Pico W at {PICO_W_IP}:{UDP_PORT}")
     print(f"Listening for audio on UDP port {UDP_PORT}...\n")
     if PRINT_RMS:
         print("[RMS calibration mode ON -- set VAD_THRESHOLD based on values below]")
 
-    # VAD state machine
-    state         = "SILENCE"
-    speech_count  = 0        # consecutive loud frames
-    silence_count = 0        # consecutive quiet frames
-    pre_roll      = []       # ring of recent frames (size = VAD_PRE_ROLL)
-    current_seg   = []       # frames accumulating for current speech segment
-
-    last_seq   = None
-    recv_count = 0
-    drop_count = 0
+    current_seg = []            # frames accumulating for current speech segment
+    seg_samples = 0
 
     try:
         while not stop_event.is_set():
-            # Receive packet
-            try:
-                data, _ = sock.recvfrom(4096)
-            except socket.timeout:
-                # Re-announce in case the Pico W rebooted
-                send_hello()
-                continue
-
-            if len(data) < 5:
-                continue
-
-            seq, _    = struct.unpack_from(">HH", data, 0)
-            payload   = data[4:]
-            n_samples = len(payload) // 2   # 2 bytes per int16
-
-            # Dropped packet accounting
-            if last_seq is not None:
-                gap = (seq - last_seq - 1) & 0xFFFF
-                if 0 < gap < 200:
-                    drop_count += gap
-            last_seq    = seq
-            recv_count += 1
-
-            # Decode 16-bit PCM -> float32
-            frame_i16 = np.frombuffer(payload, dtype="<i2").copy()
-            frame_f32 = frame_i16.astype(np.float32) / 32768.0
-            frame_f32 = dc_block(frame_f32)
+            packet = rx.recv()
+            if packet is None:
+                continue            # timed out; HELLO re-sent in case the Pico W rebooted
+
+            # Decode 16-bit PCM -> DC-free float32
+            frame_f32 = dc_block(packet[1])
 
             # Energy VAD
-            rms = float(np.sqrt(np.mean(frame_f32 ** 2)))
+            rms = frame_rms(frame_f32)
             if PRINT_RMS:
                 bar = "#" * min(int(rms / 0.001), 60)
                 print(f"RMS {rms:.4f}  |{bar}")
 
-            if state == "SILENCE":
-                # Maintain pre-roll so we don't clip word onsets
-                pre_roll.append(frame_f32)
-                if len(pre_roll) > VAD_PRE_ROLL:
-                    pre_roll.pop(0)
-
-                if rms > VAD_THRESHOLD:
-                    speech_count += 1
-                    if speech_count >= VAD_SPEECH_ONSET:
-                        # Transition: SILENCE -> SPEECH
-                        state         = "SPEECH"
-                        current_seg   = list(pre_roll)   # include pre-roll audio
-                        pre_roll      = []
-                        speech_count  = 0
-                        silence_count = 0
-                else:
-                    speech_count = 0
-
-            else:  # state == "SPEECH"
+            event = vad.push(frame_f32, rms)
+            if event == ONSET:
+                # SILENCE -> SPEECH: include pre-roll audio so onsets aren't clipped
+                current_seg = vad.take_pre_roll()
+                seg_samples = sum(len(f) for f in current_seg)
+            elif vad.state == SPEECH or event == END:
                 current_seg.append(frame_f32)
+                seg_samples += len(frame_f32)
 
-                if rms < VAD_THRESHOLD:
-                    silence_count += 1
-                    if silence_count >= VAD_SILENCE_END:
-                        # Transition: SPEECH -> SILENCE -- flush segment
-                        _flush_segment(current_seg)
-                        state         = "SILENCE"
-                        current_seg   = []
-                        silence_count = 0
-                        speech_count  = 0
-                else:
-                    silence_count = 0
-
-                # Force flush if segment grows too long (continuous speech)
-                clip_dur = len(current_seg) * n_samples / FS
-                if clip_dur >= MAX_CLIP_SEC:
+                # SPEECH -> SILENCE, or force flush if continuous speech runs too long
+                if event == END or seg_samples >= MAX_CLIP_SEC * FS:
                     _flush_segment(current_seg)
-                    current_seg   = []
-                    silence_count = 0
+                    vad.split()
+                    current_seg, seg_samples = [], 0
 
             # Periodic stats
-            if recv_count > 0 and recv_count % 1000 == 0:
-                pct = 100.0 * drop_count / max(recv_count + drop_count, 1)
-                print(f"[UDP] recv={recv_count}  dropped={drop_count} ({pct:.1f}%)")
+            if rx.received % 1000 == 0:
+                print(f"[UDP] recv={rx.received}  dropped={rx.lost} ({rx.loss_pct():.1f}%)")
     finally:
-        sock.close()
+        rx.close()
 
 # ─── Transcription thread ─────────────────────────────────────────────────────
 
 def transcribe_loop() -> None:
     """
     Pulls speech segments from trans_queue and transcribes with faster-whisper.
-    Prints each result with a wall-clock timestamp and inference time.
+    Prints each result with its inference time; the log writer thread adds
+    the wall-clock timestamp.
+    Results are scored by confidence.ConfidenceGate: hallucinations are
+    dropped, low-confidence clips get one beam-search re-decode.
     """
-    with open(LOG_FILE, "a") as log:
-        while not stop_event.is_set():
-            try:
-                audio = trans_queue.get(timeout=1.0)
-            except queue.Empty:
-                continue
-
-            t0 = time.monotonic()
-
-            segments, _ = model.transcribe(
-                audio,
-                beam_size=1,
-                temperature=0,               # deterministic, slightly faster
-                vad_filter=True,             # second-pass VAD inside Whisper
-                condition_on_previous_text=False,
-                language="en",
-            )
-
-            parts = [seg.text.strip() for seg in segments if seg.text.strip()]
-
-            if parts:
-                elapsed = time.monotonic() - t0
-                text    = " ".join(parts)
-                ts      = datetime.now(ZoneInfo("America/Chicago")).strftime("%H:%M:%S")
-                line    = f"[{ts}] ({elapsed:.2f}s) {text}"
-                print(line)
-                log.write(line + "\n")
-                log.flush()
-
+    gate = ConfidenceGate()
+
+    def _decode(audio, beam_size=1, temperature=0):
+        segments, _ = model.transcribe(
+            audio,
+            beam_size=beam_size,
+            temperature=temperature,     # 0: deterministic, slightly faster
+            vad_filter=True,             # second-pass VAD inside Whisper
+            condition_on_previous_text=False,
+            initial_prompt=prompt_context.tokens() if prompt_context else None,
+            language="en",
+        )
+        return segments
+
+    while not stop_event.is_set():
+        # In-memory queue first (older), then the spill log, then wait
+        captured = None
+        try:
+            pcm = trans_queue.get_nowait()
+        except queue.Empty:
+            rec = spill.peek(raw=True)
+            if rec is not None:
+                pcm, meta = rec
+                captured  = meta["captured"]
+            else:
+                try:
+                    pcm = trans_queue.get(timeout=1.0)
+                except queue.Empty:
+                    continue
+
+        t0    = time.monotonic()
+        audio = to_float32(pcm)
+
+        raw = summarise(_decode(audio))
+        hyp = gate.check(raw, redecode=lambda: _decode(audio, RETRY_BEAM_SIZE, RETRY_TEMPERATURES))
+        if raw is not None and hyp is None:
+            print(f"[gate] rejected: {raw.text!r}  ({gate.stats()})")
+
+        if hyp is not None:
+            elapsed = time.monotonic() - t0
+            text    = hyp.text
+            if prompt_context:
+                prompt_context.add_final(text)
+            # Replayed segments keep the time they were spoken; the writer
+            # thread formats the timestamp and does the file I/O
+            line    = f"({elapsed:.2f}s) {text}"
+            print(line)
+            transcript_log.append(line, captured)
+
+        if captured is None:
             trans_queue.task_done()
+        else:
+            spill.commit()     # only now -- a crash mid-decode replays it
 
 # ─── Entry point ──────────────────────────────────────────────────────────────
 
 if __name__ == "__main__":
     print("Starting live transcription -- speak into the mic (Ctrl+C to stop)\n")
 
+    writer = threading.Thread(target=transcript_log.run, daemon=True, name="writer")
+    writer.start()
     threads = [
         threading.Thread(target=udp_vad_loop,    daemon=True, name="udp-vad"),
         threading.Thread(target=transcribe_loop, daemon=True, name="transcribe"),
@@ -286,6 +277,10 @@ if __name__ == "__main__":
     for t in threads:
         t.start()
 
+    # Model is loaded and warm and audio is flowing -- let a Type=notify
+    # systemd unit report the service as started.
+    notify_systemd("READY=1")
+
     try:
         while True:
             time.sleep(1)
@@ -294,5 +289,6 @@ if __name__ == "__main__":
         stop_event.set()
         for t in threads:
             t.join(timeout=5)
+        transcript_log.close()     # after the transcriber: its last lines are synced
 
     print("Goodbye")
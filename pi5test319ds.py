@@ -9,7 +9,7 @@ then transcribes with faster-whisper.
 import socket
 import struct
 import numpy as np
-from faster_whisper import WhisperModel
+from model_startup import start_model, format_report, notify_systemd
 import os
 import queue
 import threading
@@ -23,12 +23,11 @@ from datetime import datetime
 dt = datetime.now(ZoneInfo("America/Chicago"))
 dt_str = f"{dt:%Y-%m-%d_%H-%M-%S}"
 
-# ─── Environment / HF token ───────────────────────────────────────────────────
+# ─── Environment ──────────────────────────────────────────────────────────────
+# Models come from the offline cache (model_startup.py) -- no HF_TOKEN and no
+# hub access at startup.  .env may still set ESCRIBE_MODEL_DIR.
 
 load_dotenv()
-hf_token = os.getenv("HF_TOKEN")
-if hf_token:
-    os.environ["HF_TOKEN"] = hf_token
 
 # ─── Configuration ────────────────────────────────────────────────────────────
 
@@ -48,8 +47,8 @@ LOG_FILE = f"{LOG_DIR}/{dt_str}.txt"
 # ─── Load Whisper model ───────────────────────────────────────────────────────
 
 print("Loading Whisper model...")
-model = WhisperModel(MODEL_SIZE, device=DEVICE, compute_type=COMPUTE_TYPE)
-print("Model loaded.\n")
+model, startup = start_model(MODEL_SIZE, DEVICE, COMPUTE_TYPE)   # offline cache + warm-up
+print(f"Model loaded. {format_report(startup)}\n")
 
 # ─── Ring buffer ──────────────────────────────────────────────────────────────
 
@@ -238,6 +237,8 @@ udp_thread.start()
 slicer_thread.start()
 trans_thread.start()
 
+notify_systemd("READY=1")
+
 try:
     while True:
         time.sleep(1)
@@ -9,7 +9,10 @@ then transcribes with faster-whisper.
 import socket
 import struct
 import numpy as np
-from faster_whisper import WhisperModel
+from model_startup import tuned_settings, start_model, format_report, notify_systemd
+from mel_cache import LogMelCache, install_feature_cache
+from stitcher import TranscriptStitcher, format_words
+from byte_queue import ByteBudgetQueue, to_int16, to_float32
 import os
 import queue
 import threading
@@ -23,12 +26,11 @@ from datetime import datetime
 dt = datetime.now(ZoneInfo("America/Chicago"))
 dt_str = f"{dt:%Y-%m-%d_%H-%M-%S}"
 
-# ─── Environment / HF token ───────────────────────────────────────────────────
+# ─── Environment ──────────────────────────────────────────────────────────────
+# Models come from the offline cache (model_startup.py) -- no HF_TOKEN and no
+# hub access at startup.  .env may still set ESCRIBE_MODEL_DIR.
 
 load_dotenv()
-hf_token = os.getenv("HF_TOKEN")
-if hf_token:
-    os.environ["HF_TOKEN"] = hf_token
 
 # ─── Configuration ────────────────────────────────────────────────────────────
 
@@ -40,6 +42,10 @@ OVERLAP_SECONDS = 0.5
 MODEL_SIZE  = "tiny.en"         # tiny / base / small — swap to base.en for accuracy
 DEVICE      = "cpu"
 COMPUTE_TYPE = "int8"
+CPU_THREADS  = 0             # 0 = CTranslate2 default
+# `python autotune.py` measures these on this machine; its choice wins
+MODEL_SIZE, COMPUTE_TYPE, CPU_THREADS = tuned_settings(MODEL_SIZE, COMPUTE_TYPE, CPU_THREADS)
+USE_MEL_CACHE = True            # build windows from cached log-mel frames (mel_cache.py)
 
 LOG_DIR  = "logs"
 os.makedirs(LOG_DIR, exist_ok=True)
@@ -48,31 +54,48 @@ LOG_FILE = f"{LOG_DIR}/{dt_str}.txt"
 # ─── Load Whisper model ───────────────────────────────────────────────────────
 
 print("Loading Whisper model...")
-model = WhisperModel(MODEL_SIZE, device=DEVICE, compute_type=COMPUTE_TYPE)
-print("Model loaded.\n")
+model, startup = start_model(MODEL_SIZE, DEVICE, COMPUTE_TYPE, cpu_threads=CPU_THREADS)   # offline cache + warm-up
+print(f"Model loaded. {format_report(startup)}\n")
 
 # ─── Ring buffer ──────────────────────────────────────────────────────────────
 
 buffer_len   = int((CHUNK_SECONDS + OVERLAP_SECONDS) * FS)
-audio_buffer = np.zeros(buffer_len, dtype=np.float32)
+audio_buffer = np.zeros(buffer_len, dtype=np.int16)   # int16: the ADC's own width, half of float32
 buffer_lock  = threading.Lock()
 write_pos    = 0
+samples_written = 0             # absolute sample count -- indexes the mel cache
 
 stop_event = threading.Event()
-audio_queue = queue.Queue(maxsize=3)
+
+# Windows waiting for the model, bounded by bytes (int16) rather than count
+QUEUE_WINDOWS = 3
+audio_queue   = ByteBudgetQueue(QUEUE_WINDOWS * buffer_len * 2)
+
+# ─── Log-mel feature cache ────────────────────────────────────────────────────
+# Frames are computed once, as samples land in the ring; every window handed
+# to Whisper is assembled from the cache, so the overlap is never re-extracted.
+# Sized for the queued windows plus the one being decoded.
+feature_extractor = install_feature_cache(model)
+mel_cache = LogMelCache.for_model(
+    model, seconds=(CHUNK_SECONDS + OVERLAP_SECONDS) * (QUEUE_WINDOWS + 2)
+)
 
 def _write_to_ring(samples_f32: np.ndarray):
-    """Write float32 samples into the circular ring buffer (thread-safe)."""
-    global write_pos
-    n = len(samples_f32)
+    """Write float32 samples into the circular int16 ring buffer (thread-safe)."""
+    global write_pos, samples_written
+    n   = len(samples_f32)
+    pcm = to_int16(samples_f32)
     with buffer_lock:
+        if USE_MEL_CACHE:
+            mel_cache.push(samples_f32)
+        samples_written += n
         end = write_pos + n
         if end <= buffer_len:
-            audio_buffer[write_pos:end] = samples_f32
+            audio_buffer[write_pos:end] = pcm
         else:
             first = buffer_len - write_pos
-            audio_buffer[write_pos:] = samples_f32[:first]
-            audio_buffer[:n - first] = samples_f32[first:]
+            audio_buffer[write_pos:] = pcm[:first]
+            audio_buffer[:n - first] = pcm[first:]
         write_pos = (write_pos + n) % buffer_len
 
 # ─── DC‑blocking filter (single‑sample IIR, cutoff ~20 Hz) ────────────────────
@@ -174,6 +197,7 @@ def slicer_loop():
         with buffer_lock:
             start = (write_pos - step - int(OVERLAP_SECONDS * FS)) % buffer_len
             end   = write_pos
+            end_sample = samples_written
 
             if start < end:
                 chunk = audio_buffer[start:end].copy()
@@ -181,51 +205,79 @@ def slicer_loop():
                 chunk = np.concatenate((audio_buffer[start:], audio_buffer[:end])).copy()
 
         try:
-            audio_queue.put(chunk, timeout=0.5)
+            audio_queue.put((chunk, end_sample), timeout=0.5)
         except queue.Full:
             pass
 
 # ─── Transcription thread ─────────────────────────────────────────────────────
 
+def _transcribe_window(audio, end_sample, gain):
+    """
+    Transcribe one window.  With USE_MEL_CACHE the features come from the
+    cache (the gain is applied in the log domain); the Silero VAD pass is
+    skipped there because it would trim the audio out of step with the frames.
+    """
+    if USE_MEL_CACHE:
+        try:
+            window = mel_cache.window(end_sample - len(audio), end_sample, gain)
+        except ValueError:
+            window = None           # fell out of the cache -- extract from audio
+        if window is not None:
+            with feature_extractor.use(window):
+                return model.transcribe(
+                    audio,
+                    beam_size=1,
+                    vad_filter=False,
+                    condition_on_previous_text=False,
+                    word_timestamps=True,
+                    language="en"
+                )
+
+    return model.transcribe(
+        audio,
+        beam_size=1,
+        vad_filter=True,
+        condition_on_previous_text=False,
+        word_timestamps=True,
+        language="en"
+    )
+
+def _log_words(log, words):
+    """Print + log one line per batch of stitched words, on absolute stream time."""
+    if not words:
+        return
+    line = f"[{words[0].start:6.2f}s → {words[-1].end:6.2f}s] {format_words(words)}"
+    print(line)
+    log.write(line + "\n")
+    log.flush()
+
 def transcribe_loop():
-    global_time = 0.0
+    # Word timestamps + absolute sample offsets: each word in the overlap is
+    # kept from exactly one window (see stitcher.py).
+    stitcher = TranscriptStitcher(fs=FS, overlap_sec=OVERLAP_SECONDS)
 
     with open(LOG_FILE, "a") as log:
         while not stop_event.is_set():
             try:
-                audio = audio_queue.get(timeout=1)
+                pcm, end_sample = audio_queue.get(timeout=1)
             except queue.Empty:
                 continue
 
             # Normalize audio to peak = 0.5 (prevents Whisper from seeing overly quiet/loud segments)
-            max_amp = np.max(np.abs(audio))
-            if max_amp > 0:
-                audio = audio / max_amp * 0.5
-
-            segments, _ = model.transcribe(
-                audio,
-                beam_size=1,
-                vad_filter=True,
-                condition_on_previous_text=False,
-                language="en"
-            )
-
-            for seg in segments:
-                start = seg.start + global_time
-                end   = seg.end   + global_time
-                text  = seg.text.strip()
-
-                if not text:
-                    continue
-
-                line = f"[{start:6.2f}s → {end:6.2f}s] {text}"
-                print(line)
-                log.write(line + "\n")
-                log.flush()
-
-            global_time += CHUNK_SECONDS
+            max_amp = int(np.max(np.abs(pcm.astype(np.int32)))) / 32768.0
+            gain    = 0.5 / max_amp if max_amp > 0 else 1.0
+            audio   = to_float32(pcm, gain)     # float32 only at the model boundary
+
+            segments, _ = _transcribe_window(audio, end_sample, gain)
+
+            words = stitcher.add_window(end_sample - len(audio), end_sample, segments)
+            _log_words(log, words)
+
             audio_queue.task_done()
 
+        # Words held back for the next window that will never come
+        _log_words(log, stitcher.flush())
+
 # ─── Start everything ─────────────────────────────────────────────────────────
 
 print("Starting live transcription (Ctrl+C to stop)\n")
@@ -238,6 +290,8 @@ udp_thread.start()
 slicer_thread.start()
 trans_thread.start()
 
+notify_systemd("READY=1")
+
 try:
     while True:
         time.sleep(1)
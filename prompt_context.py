@@ -0,0 +1,118 @@
+"""
+Rolling Prompt Context
+======================
+Each VAD clip is decoded on its own (condition_on_previous_text=False), so
+Whisper re-guesses every proper noun and piece of lecture jargon from
+scratch.  PromptContext carries a small, token-budgeted initial_prompt
+from clip to clip:
+
+    [session vocabulary] [last N finals, oldest trimmed first]
+
+  * Token budget.  The prompt is prefilled on every decode, so it is kept
+    short (max_tokens, default 64).  The vocabulary gets at most half of it;
+    the newest finals fill the rest.  faster-whisper itself would cut the
+    prompt at 223 tokens.
+  * Cached tokenisation.  Each final is tokenised once, when it is added,
+    and the assembled prompt is rebuilt only then.  transcribe() receives
+    the token ids directly (initial_prompt accepts an iterable of ints), so
+    a decode pays nothing for the prompt beyond the decoder prefill.
+  * Session vocabulary.  One term per line in a text file (# comments
+    allowed), e.g. course names, speaker names, acronyms.
+
+    context = PromptContext(max_tokens=64, history=4,
+                            vocabulary=load_vocabulary("session_vocab.txt"))
+    context.bind(model.hf_tokenizer)          # once the model is loaded
+    model.transcribe(audio, initial_prompt=context.tokens(), ...)
+    context.add_final(text)                   # after each accepted final
+
+  * Sub-windows.  A long clip decoded in slices passes the text of the
+    slices before it through tokens_with(text); it is budgeted like the
+    newest final, so the slice continues the sentence it was cut from.
+"""
+
+import os
+import threading
+from collections import deque
+
+
+def load_vocabulary(path: str) -> list:
+    """Terms from a one-per-line file; [] if the file does not exist."""
+    if not path or not os.path.exists(path):
+        return []
+    with open(path, encoding="utf-8") as f:
+        return [line.strip() for line in f
+                if line.strip() and not line.lstrip().startswith("#")]
+
+
+class PromptContext:
+    """Token-budgeted initial_prompt built from recent finals + a vocabulary."""
+
+    def __init__(self, max_tokens: int = 64, history: int = 4, vocabulary=()):
+        self.max_tokens = max_tokens
+        self.vocabulary = list(vocabulary)
+        self._finals    = deque(maxlen=history)   # (text, token ids or None)
+        self._encode    = None
+        self._vocab_ids = []
+        self._prompt    = None                    # cached token list
+        self._lock      = threading.Lock()
+
+    def bind(self, tokenizer) -> None:
+        """
+        Attach the model's tokenizers.Tokenizer (model.hf_tokenizer).  Until
+        then tokens() is None; finals added earlier are tokenised now.
+        """
+        encode = lambda text: tokenizer.encode(text, add_special_tokens=False).ids
+        with self._lock:
+            self._encode    = encode
+            self._vocab_ids = []
+            if self.vocabulary:
+                ids = encode(" Glossary: " + ", ".join(self.vocabulary) + ".")
+                self._vocab_ids = ids[:self.max_tokens // 2]
+            self._finals = deque(((text, encode(" " + text)) for text, _ in self._finals),
+                                 maxlen=self._finals.maxlen)
+            self._rebuild()
+
+    def add_final(self, text: str) -> None:
+        text = text.strip()
+        if not text:
+            return
+        with self._lock:
+            ids = self._encode(" " + text) if self._encode else None
+            self._finals.append((text, ids))
+            self._rebuild()
+
+    def clear(self) -> None:
+        """Forget the finals (e.g. a new session); the vocabulary stays."""
+        with self._lock:
+            self._finals.clear()
+            self._rebuild()
+
+    def tokens(self):
+        """Token ids for transcribe(initial_prompt=...), or None."""
+        return self._prompt
+
+    def tokens_with(self, text: str):
+        """tokens() with text (earlier slices of the same clip) as the newest entry."""
+        text = text.strip()
+        if not text:
+            return self._prompt
+        with self._lock:
+            if self._encode is None:
+                return None
+            return self._assemble(list(self._finals) + [(text, self._encode(" " + text))])
+
+    def _rebuild(self) -> None:
+        self._prompt = None if self._encode is None else self._assemble(self._finals)
+
+    def _assemble(self, finals):
+        budget = self.max_tokens - len(self._vocab_ids)
+        recent = []
+        for _, ids in reversed(finals):
+            if len(ids) <= budget:
+                recent[:0] = ids
+                budget    -= len(ids)
+            else:
+                if not recent:
+                    recent = ids[-budget:] if budget > 0 else []  # newest final alone overflows
+                break
+        return self._vocab_ids + recent or None
@@ -0,0 +1,129 @@
+"""
+Idle-Time Refinement
+====================
+The live path decodes greedily (beam 1, temperature 0) with the small model
+so it keeps up with speech.  Between sentences the Pi sits idle.  Refiner
+spends that idle time re-decoding the most recent finals with a stronger
+setup -- a larger model and/or beam search -- and swaps the text in the log
+and the GUI when the new hypothesis is clearly better.
+
+    refiner = Refiner(decode=..., is_idle=..., on_revise=...)
+    threading.Thread(target=refiner.run, args=(stop_event, prepare), daemon=True).start()
+    ...
+    refiner.submit(final_id, pcm, gain, summarise(segments), meta)   # after each final
+
+Rules:
+  * Work starts only after the live path has been idle (is_idle() true) for
+    idle_sec, and the newest final is refined first -- it is the one still
+    on screen.  Each final is tried at most once.
+  * The refinement thread lowers its own scheduling priority (nice) before
+    prepare() loads its model, so CTranslate2's worker threads for that
+    model inherit it and a live segment arriving mid-refinement still gets
+    the CPU first.
+  * "Better" is confidence.is_better(): a higher duration-weighted
+    avg_logprob by at least MIN_LOGPROB_GAIN, and not a repetition loop.
+    A live hypothesis that *was* a loop is replaced by any sane one.
+
+The transcript file's "update in place" half is transcript_writer.EditableLog.
+"""
+
+import os
+import threading
+import time
+from collections import deque
+
+from byte_queue import to_float32
+from confidence import summarise, is_better
+
+REFINE_NICE = 10     # nice value of the refinement thread
+
+
+# ─── Worker ───────────────────────────────────────────────────────────────────
+
+class Refiner:
+    """
+    decode(audio_f32) -> segments    the stronger decode (called on this thread;
+                                     may instead be returned by run()'s prepare)
+    is_idle() -> bool                live queue empty and nothing being decoded
+    on_revise(final_id, hyp, meta)   called when a final's text was improved
+    """
+
+    def __init__(self, decode=None, is_idle=None, on_revise=None, history: int = 8,
+                 idle_sec: float = 0.5):
+        self.decode    = decode
+        self.is_idle   = is_idle
+        self.on_revise = on_revise
+        self.idle_sec  = idle_sec
+        self._pending  = deque(maxlen=history)   # newest last; oldest fall off unrefined
+        self._lock     = threading.Lock()
+
+        self.off     = False                     # no decoder: submit() is a no-op
+        self.tried   = 0
+        self.revised = 0
+        self.busy_s  = 0.0
+
+    def submit(self, final_id, pcm, gain: float, hyp, meta=None) -> None:
+        """Queue a live final (int16 pcm + its gain) for refinement."""
+        with self._lock:
+            if self.off:
+                return
+            self._pending.append((final_id, pcm, gain, hyp, meta))
+
+    def _take(self):
+        with self._lock:
+            return self._pending.pop() if self._pending else None
+
+    def _wait_idle(self, stop_event) -> bool:
+        """Block until the live path has been idle for idle_sec; False on stop."""
+        since = None
+        while not stop_event.is_set():
+            if not self.is_idle():
+                since = None
+            elif since is None:
+                since = time.monotonic()
+            elif time.monotonic() - since >= self.idle_sec:
+                return True
+            stop_event.wait(0.1)
+        return False
+
+    def run(self, stop_event, prepare=None) -> None:
+        """
+        Thread body.  prepare() -- e.g. loading the refinement model -- runs
+        after the priority drop and may return the decode callable.  With no
+        decode callable at all, refinement is switched off and run() returns.
+        """
+        try:
+            os.setpriority(os.PRIO_PROCESS, threading.get_native_id(), REFINE_NICE)
+        except (AttributeError, OSError):
+            pass   # not Linux, or not permitted -- idle gating still applies
+        if prepare is not None:
+            self.decode = prepare() or self.decode
+        if self.decode is None:
+            with self._lock:
+                self.off = True
+                self._pending.clear()
+            return
+
+        while self._wait_idle(stop_event):
+            job = self._take()
+            if job is None:
+                stop_event.wait(0.2)
+                continue
+            final_id, pcm, gain, live, meta = job
+
+            t0 = time.monotonic()
+            try:
+                refined = summarise(self.decode(to_float32(pcm, gain)))
+            except Exception as exc:
+                print(f"[refine] decode failed: {exc!r}")
+                continue
+            finally:
+                self.busy_s += time.monotonic() - t0
+            self.tried += 1
+
+            if is_better(refined, live):
+                self.revised += 1
+                self.on_revise(final_id, refined, meta)
+
+    def stats(self) -> str:
+        return f"refined {self.revised}/{self.tried} ({self.busy_s:.0f}s idle CPU)"
@@ -0,0 +1,256 @@
+"""
+Spill-to-Disk Segment Log
+=========================
+Overflow tier for the transcription queue.  When the in-memory queue is
+full, speech segments are appended here instead of being dropped, and the
+transcriber replays them in order once it has caught up.  The log lives in
+a memory-mapped file, so it also survives a crash or a systemd restart --
+pending segments are picked up again by the next process.
+
+File layout (little-endian):
+
+    header  (32 bytes)  magic "ESPL" | version u32 | read_off u64
+                        | write_off u64 | count u64
+    record              magic u32 | meta_len u32 | n_samples u32 | crc32 u32
+                        | meta (JSON, utf-8) | audio (int16 PCM)
+                        | zero padding to 8 bytes
+
+Records live in [read_off, write_off).  append() writes the record first
+and only then publishes it by moving write_off, so a crash mid-write
+leaves the torn record outside the live range.  commit(), after peek(),
+advances read_off; when the log empties both offsets rewind to the start
+and the space is reused.  Audio is stored as int16 -- half of float32, and the source is
+16-bit anyway.
+
+Compaction never overwrites a live record.  The live records are copied
+down over consumed space only when that space is at least as large as
+they are; the copy is synced before the header is pointed at it, so a
+crash at any point leaves one intact copy under the header on disk.
+Otherwise the file grows (up to max_mb).
+
+Durability: append() returns once its record and header are synced.
+commit() syncs the header page, so a segment is replayed after a power
+cut only if the cut lands inside commit() itself.  A process crash loses
+nothing either way -- the mapping is the page cache.
+
+Usage:
+    spill = SpillLog("spill/pi5test329.spill")
+    if queue_full or len(spill):            # keep order: once spilling,
+        spill.append(audio, {"kind": ...})  # everything goes to the log
+    ...
+    rec = spill.peek()                      # (float32 audio, meta) or None
+    ...transcribe...
+    spill.commit()                          # at-least-once across crashes
+"""
+
+import fcntl
+import json
+import mmap
+import os
+import struct
+import threading
+import zlib
+
+import numpy as np
+
+_HEADER     = struct.Struct("<4sIQQQ")
+_RECORD     = struct.Struct("<IIII")
+_MAGIC      = b"ESPL"
+_REC_MAGIC  = 0x53454731          # "1GES"
+_VERSION    = 1
+
+
+def _pad8(n: int) -> int:
+    return (n + 7) & ~7
+
+
+class SpillLog:
+    """Append-only, crash-safe FIFO of (int16 audio, metadata) records."""
+
+    def __init__(self, path: str, initial_mb: float = 16.0, max_mb: float = 512.0):
+        self.path      = path
+        self.max_bytes = int(max_mb * 1024 * 1024)
+        self._lock     = threading.Lock()
+
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o644)
+        # One process per log -- a second instance would corrupt the offsets
+        fcntl.flock(self._fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+
+        size = os.fstat(self._fd).st_size
+        if size < _HEADER.size:
+            size = max(int(initial_mb * 1024 * 1024), 4096)
+            os.ftruncate(self._fd, size)
+        self._mm = mmap.mmap(self._fd, size)
+
+        self.spilled  = 0     # records appended by this process
+        self.replayed = 0     # records popped by this process
+        self.rejected = 0     # appends refused (max_mb reached)
+        self._recover()
+
+    # ── Header ────────────────────────────────────────────────────────────────
+
+    def _read_header(self):
+        magic, version, read_off, write_off, count = _HEADER.unpack_from(self._mm, 0)
+        return magic, version, read_off, write_off, count
+
+    def _write_header(self) -> None:
+        _HEADER.pack_into(self._mm, 0, _MAGIC, _VERSION,
+                          self._read_off, self._write_off, self._count)
+
+    def _recover(self) -> None:
+        """Validate the header and the live records left by a previous run."""
+        magic, version, read_off, write_off, _ = self._read_header()
+        size = len(self._mm)
+        if (magic != _MAGIC or version != _VERSION
+                or not _HEADER.size <= read_off <= write_off <= size):
+            read_off = write_off = _HEADER.size
+
+        # Count intact records; stop at the first damaged one
+        count, off = 0, read_off
+        while off < write_off:
+            nxt = self._check_record(off, write_off)
+            if nxt is None:
+                break
+            count, off = count + 1, nxt
+
+        self._read_off, self._write_off, self._count = read_off, off, count
+        self._write_header()
+        self._mm.flush()
+        self.recovered = count
+
+    def _check_record(self, off: int, limit: int):
+        """Offset of the next record if the one at off is intact, else None."""
+        if off + _RECORD.size > limit:
+            return None
+        magic, meta_len, n_samples, crc = _RECORD.unpack_from(self._mm, off)
+        body = off + _RECORD.size
+        end  = body + meta_len + 2 * n_samples
+        if magic != _REC_MAGIC or end > limit:
+            return None
+        if zlib.crc32(self._mm[body:end]) != crc:
+            return None
+        return _pad8(end)
+
+    # ── Space management ──────────────────────────────────────────────────────
+
+    def _make_room(self, need: int) -> bool:
+        size = len(self._mm)
+        if self._write_off + need <= size:
+            return True
+
+        live = self._write_off - self._read_off
+        if _HEADER.size + live <= self._read_off and _HEADER.size + live + need <= size:
+            # Copy the live records down into consumed space they don't
+            # overlap; sync the copy, then flip the header to it
+            self._mm.move(_HEADER.size, self._read_off, live)
+            self._mm.flush()
+            self._read_off, self._write_off = _HEADER.size, _HEADER.size + live
+            self._write_header()
+            self._mm.flush(0, mmap.PAGESIZE)
+            return True
+
+        # Double, but never past max_bytes -- the last step may be a short one
+        new_size = min(max(size * 2, self._write_off + need), self.max_bytes)
+        if new_size < self._write_off + need:
+            return False
+        self._mm.flush()
+        self._mm.close()
+        os.ftruncate(self._fd, new_size)
+        self._mm = mmap.mmap(self._fd, new_size)
+        return True
+
+    # ── Public API ────────────────────────────────────────────────────────────
+
+    def append(self, audio: np.ndarray, meta: dict) -> bool:
+        """Append one segment (float32 in [-1, 1] or int16).  False if the log is full."""
+        if audio.dtype != np.int16:
+            audio = np.clip(audio * 32767.0, -32768, 32767).astype(np.int16)
+        meta_b  = json.dumps(meta, separators=(",", ":")).encode()
+        payload = meta_b + audio.astype("<i2", copy=False).tobytes()
+        need    = _pad8(_RECORD.size + len(payload))
+
+        with self._lock:
+            if not self._make_room(need):
+                self.rejected += 1
+                return False
+            off = self._write_off
+            _RECORD.pack_into(self._mm, off, _REC_MAGIC, len(meta_b), len(audio), zlib.crc32(payload))
+            body = off + _RECORD.size
+            self._mm[body:body + len(payload)] = payload
+
+            # Publish only after the record is fully written
+            self._write_off = off + need
+            self._count    += 1
+            self._write_header()
+            self._mm.flush()
+            self.spilled += 1
+        return True
+
+    def peek(self, raw: bool = False):
+        """
+        Oldest (float32 audio, meta) without removing it, or None if empty;
+        raw=True returns the stored int16 samples instead.  Call commit()
+        once it has been transcribed -- a crash in between replays the
+        segment on the next start instead of losing it.
+        """
+        with self._lock:
+            if self._count == 0:
+                return None
+            off = self._read_off
+            if self._check_record(off, self._write_off) is None:
+                # Damaged tail (should not happen outside disk faults) -- drop it
+                self._read_off = self._write_off = _HEADER.size
+                self._count    = 0
+                self._write_header()
+                return None
+
+            _, meta_len, n_samples, _ = _RECORD.unpack_from(self._mm, off)
+            body  = off + _RECORD.size
+            meta  = json.loads(self._mm[body:body + meta_len])
+            start = body + meta_len
+            audio = np.frombuffer(self._mm[start:start + 2 * n_samples], dtype="<i2")
+        if raw:
+            return audio.astype(np.int16), meta
+        return audio.astype(np.float32) / 32768.0, meta
+
+    def commit(self) -> None:
+        """Drop the record last returned by peek()."""
+        with self._lock:
+            if self._count == 0:
+                return
+            nxt = self._check_record(self._read_off, self._write_off)
+            self._count -= 1
+            if self._count == 0 or nxt is None:
+                self._read_off = self._write_off = _HEADER.size   # reuse from the top
+                self._count    = 0
+            else:
+                self._read_off = nxt
+            self._write_header()
+            self._mm.flush(0, mmap.PAGESIZE)    # header only
+            self.replayed += 1
+
+    def pop(self):
+        """peek() + commit() in one step."""
+        rec = self.peek()
+        if rec is not None:
+            self.commit()
+        return rec
+
+    def __len__(self) -> int:
+        return self._count
+
+    @property
+    def pending_bytes(self) -> int:
+        return self._write_off - self._read_off
+
+    def stats(self) -> str:
+        return (f"spill {self._count} pending ({self.pending_bytes / 1e6:.1f} MB)  "
+                f"spilled {self.spilled}  replayed {self.replayed}"
+                + (f"  rejected {self.rejected}" if self.rejected else ""))
+
+    def close(self) -> None:
+        with self._lock:
+            self._mm.flush()
+            self._mm.close()
+            os.close(self._fd)
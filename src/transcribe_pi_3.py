@@ -2,8 +2,8 @@
 
 import sounddevice as sd
 import numpy as np
-from faster_whisper import WhisperModel
 import os
+import sys
 import queue
 import threading
 import time
@@ -11,15 +11,17 @@ from dotenv import load_dotenv
 from zoneinfo import ZoneInfo
 from datetime import datetime
 
+# model_startup.py lives at the repo root
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from model_startup import start_model, format_report
+
 # Date / Time
 dt = datetime.now(ZoneInfo("America/Chicago"))
 dt_str = f"{dt:%Y-%m-%d_%H-%M-%S}"
 
-# Environment / HF token
+# Environment -- models come from the offline cache (model_startup.py),
+# no HF_TOKEN and no hub access at startup
 load_dotenv()
-hf_token = os.getenv("HF_TOKEN")
-if hf_token:
-    os.environ["HF_TOKEN"] = hf_token
 
 # Configuration (Pi 5 tuned)
 FS = 16000
@@ -53,14 +55,8 @@ print(f"Using mic {mic_index}: {sd.query_devices(mic_index)['name']}")
 
 # Load Whisper model
 print("Loading Whisper model...")
-model = WhisperModel(
-    MODEL_SIZE,
-    device=DEVICE,
-    compute_type=COMPUTE_TYPE,
-    cpu_threads=4,
-    num_workers=1
-)
-print("Model loaded.\n")
+model, startup = start_model(MODEL_SIZE, DEVICE, COMPUTE_TYPE, cpu_threads=4, num_workers=1)
+print(f"Model loaded. {format_report(startup)}\n")
 
 # Ring buffer for audio
 buffer_len = int((CHUNK_SECONDS + OVERLAP_SECONDS) * FS)
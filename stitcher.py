@@ -0,0 +1,153 @@
+"""
+Overlap-Aware Transcript Stitcher
+=================================
+Merges word-timestamped output from consecutive overlapping windows into one
+clean running transcript.
+
+The fixed-window scripts slice CHUNK_SECONDS + OVERLAP_SECONDS of audio every
+CHUNK_SECONDS, so the last OVERLAP_SECONDS of one window is the first
+OVERLAP_SECONDS of the next.  Printing every segment as-is gives words twice
+(once from each window) or cut in half (a word straddling a window edge).
+
+Rule used here -- midpoint partition on absolute time:
+
+    window N      |=========================|
+    window N+1                          |=========================|
+                                        ^   ^   ^
+                                 N+1 start  |   N end
+                                           cut = N end - overlap / 2
+
+  * A word belongs to the window in which its midpoint falls before the cut,
+    so each word is committed exactly once.
+  * Words past the cut are held back: the next window sees them whole.
+    If the next window never comes (dropped slice, shutdown) the held-back
+    words are committed from the window that produced them.
+  * Words clipped by the start of a window are ignored when the previous
+    window already covered that audio.
+  * A text check drops a word repeated right at the seam when the two
+    windows disagree slightly on its timestamps.
+  * A segment without word timestamps is stitched as one unit on its own
+    start / end, rather than dropped.
+
+All times are absolute seconds from the first sample, derived from the
+window's sample offsets -- no wall-clock drift.
+
+Usage:
+    stitcher = TranscriptStitcher(fs=FS, overlap_sec=OVERLAP_SECONDS)
+    segments, _ = model.transcribe(audio, word_timestamps=True, ...)
+    words = stitcher.add_window(start_sample, end_sample, segments)
+    ...
+    words = stitcher.flush()     # on shutdown
+"""
+
+import re
+from collections import deque, namedtuple
+
+# One committed word, absolute seconds.
+StitchedWord = namedtuple("StitchedWord", "start end text probability")
+
+EDGE_SEC     = 0.05   # a word starting this close to a window edge may be clipped
+DUP_GAP_SEC  = 0.30   # same word again within this gap at a seam = duplicate
+
+_norm_re = re.compile(r"[^\w']+")
+
+
+def _norm(text: str) -> str:
+    return _norm_re.sub("", text.lower())
+
+
+def _word_spans(seg) -> list:
+    """(text, start, end, probability) per word; no word timestamps = one span."""
+    if seg.words:
+        return [(w.word, w.start, w.end, w.probability) for w in seg.words]
+    return [(seg.text, seg.start, seg.end, None)]
+
+
+def format_words(words: list) -> str:
+    """Join stitched words into display text (Whisper words carry their own spacing)."""
+    return "".join(w.text for w in words).strip()
+
+
+class TranscriptStitcher:
+    """Stateful merger for consecutive windows; one instance per stream."""
+
+    def __init__(self, fs: int = 16000, overlap_sec: float = 0.5, history: int = 8):
+        self.fs              = fs
+        self.overlap_sec     = overlap_sec
+        self.committed_until = 0.0            # absolute time already owned by earlier windows
+        self.pending         = []             # held back past the last cut
+        self.recent          = deque(maxlen=history)
+        self.dropped         = 0              # duplicate / clipped words removed
+
+    def add_window(self, start_sample: int, end_sample: int, segments, final: bool = False) -> list:
+        """
+        Feed one window's segments (with .words) and return newly committed
+        StitchedWords in time order.  final=True commits everything up to the
+        end of the window instead of holding back the overlap.
+        """
+        t0  = start_sample / self.fs
+        t1  = end_sample / self.fs
+        cut = t1 if final else t1 - self.overlap_sec / 2
+
+        out = self._settle_pending(t0)
+
+        for seg in segments:
+            for text, w_start, w_end, probability in _word_spans(seg):
+                if not text.strip():
+                    continue
+                s, e = t0 + w_start, t0 + w_end
+                mid  = (s + e) / 2
+
+                if mid < self.committed_until:
+                    self.dropped += 1           # previous window owns it
+                    continue
+                if s < t0 + EDGE_SEC and t0 > 0 and self.committed_until > t0:
+                    self.dropped += 1           # clipped by this window's start
+                    continue
+
+                word = StitchedWord(s, e, text, probability)
+                if mid < cut:
+                    if s < t0 + self.overlap_sec and self._is_duplicate(word):
+                        self.dropped += 1           # same word re-decoded at the seam
+                        continue
+                    self._commit(word, out)
+                else:
+                    self.pending.append(word)
+
+        self.committed_until = max(self.committed_until, cut)
+        return out
+
+    def flush(self) -> list:
+        """Commit whatever is still held back (end of stream)."""
+        out = []
+        for word in self.pending:
+            self._commit(word, out)
+        self.pending = []
+        return out
+
+    # ── Internals ─────────────────────────────────────────────────────────────
+
+    def _settle_pending(self, t0: float) -> list:
+        """
+        Commit held-back words the new window cannot see whole (it starts
+        after them -- e.g. a slice was dropped); discard the rest, the new
+        window will decode them again.
+        """
+        out = []
+        for word in self.pending:
+            if word.start < t0 + EDGE_SEC:
+                self._commit(word, out)
+                self.committed_until = max(self.committed_until, word.end)
+        self.pending = []
+        return out
+
+    def _is_duplicate(self, word: StitchedWord) -> bool:
+        if not self.recent:
+            return False
+        last = self.recent[-1]
+        return (_norm(word.text) == _norm(last.text)
+                and word.start < last.end + DUP_GAP_SEC)
+
+    def _commit(self, word: StitchedWord, out: list) -> None:
+        self.recent.append(word)
+        out.append(word)
@@ -0,0 +1,183 @@
+"""
+Streaming Subtitle Export
+=========================
+Writes the session's finals as SRT and WebVTT while the lecture is still
+running, so the recording can be captioned the moment class ends.
+
+  * Timing.  Cue times come from each clip's absolute sample offsets in the
+    UDP stream (span), not from wall-clock stamps or per-chunk estimates,
+    so they stay aligned with a recording of the same stream for hours.
+    That only holds if the offsets count the audio the pipeline never saw:
+    StreamClock turns lost packets (sequence gaps), packets discarded
+    while paused and stretches where the Pico W sent nothing into samples
+    to fill with silence before the next packet.
+  * Readable cues.  Short finals are merged into one cue until it reaches
+    max_chars or max_cue_sec, the speaker pauses for more than max_gap_sec,
+    or a sentence ends after at least min_cue_sec.  Cues are wrapped onto
+    two lines and shown for at least min_cue_sec.
+  * Append-only.  A finished cue is appended to both files and never
+    touched again: O(1) per cue however long the session.  Only the cue
+    still being assembled can take a refiner revision.
+
+    subs = SubtitleWriter("logs/2026-10-19_09-00-00", fs=16000)
+    subs.add(final_id, start_sample, end_sample, text)   # after each final
+    subs.tick(samples_seen)                              # emits a cue after a pause
+    subs.close()                                         # last cue
+"""
+
+import os
+import threading
+
+SENTENCE_END = (".", "?", "!")
+
+MAX_SEQ_GAP = 200      # a bigger jump in the 16-bit sequence is a Pico restart, not loss
+STALL_SEC   = 0.5      # no packets for this long: the gap is measured by the wall clock
+
+
+def _stamp(seconds: float, sep: str) -> str:
+    ms    = int(round(seconds * 1000))
+    h, ms = divmod(ms, 3_600_000)
+    m, ms = divmod(ms, 60_000)
+    s, ms = divmod(ms, 1000)
+    return f"{h:02d}:{m:02d}:{s:02d}{sep}{ms:03d}"
+
+
+def wrap(text: str, width: int = 42) -> str:
+    """Break a cue onto two lines at the space nearest the middle."""
+    if len(text) <= width:
+        return text
+    mid    = len(text) // 2
+    spaces = [i for i, c in enumerate(text) if c == " "]
+    if not spaces:
+        return text
+    cut = min(spaces, key=lambda i: abs(i - mid))
+    return text[:cut] + "\n" + text[cut + 1:]
+
+
+class StreamClock:
+    """
+    Missing-sample accounting for the UDP stream.  packet() is called for
+    every packet received, before its samples are counted; it returns how
+    many samples of silence to insert first so the stream offset keeps
+    pace with real time:
+
+      * a sequence gap of 1..MAX_SEQ_GAP-1 packets -> gap * n_samples
+      * no packets for more than stall_sec (Pico W paused, rebooted or out
+        of range) -> the wall-clock time since the last packet, less this
+        packet's own samples
+    """
+
+    def __init__(self, fs: int = 16000, max_seq_gap: int = MAX_SEQ_GAP, stall_sec: float = STALL_SEC):
+        self.fs          = fs
+        self.max_seq_gap = max_seq_gap
+        self.stall_sec   = stall_sec
+        self.last_seq    = None
+        self.last_time   = None
+        self.lost_packets = 0
+        self.filled      = 0           # samples of silence handed out
+
+    def packet(self, seq: int, n_samples: int, now: float) -> int:
+        missing = 0
+        if self.last_seq is not None:
+            gap = (seq - self.last_seq - 1) & 0xFFFF
+            if 0 < gap < self.max_seq_gap:
+                self.lost_packets += gap
+                missing = gap * n_samples
+            idle = now - self.last_time
+            if idle > self.stall_sec:
+                missing = max(missing, int(round(idle * self.fs)) - n_samples)
+        self.last_seq, self.last_time = seq, now
+        self.filled += missing
+        return missing
+
+
+class SubtitleWriter:
+    """Merges finals into cues and appends each finished cue to .srt and .vtt."""
+
+    def __init__(self, base_path: str, fs: int = 16000, min_cue_sec: float = 1.2,
+                 max_cue_sec: float = 6.0, max_chars: int = 84, max_gap_sec: float = 1.0):
+        self.fs          = fs
+        self.min_cue_sec = min_cue_sec
+        self.max_cue_sec = max_cue_sec
+        self.max_chars   = max_chars
+        self.max_gap_sec = max_gap_sec
+        self._lock       = threading.Lock()
+        self._pending    = None          # [start_s, end_s, [(final_id, text), ...]]
+        self._last_end   = 0.0           # end of the last written cue
+        self.cues        = 0
+
+        os.makedirs(os.path.dirname(base_path) or ".", exist_ok=True)
+        self.srt_path = base_path + ".srt"
+        self.vtt_path = base_path + ".vtt"
+        self._srt = open(self.srt_path, "a", encoding="utf-8")
+        self._vtt = open(self.vtt_path, "a", encoding="utf-8")
+        if self._vtt.tell() == 0:
+            self._vtt.write("WEBVTT\n\n")
+            self._vtt.flush()
+
+    def add(self, final_id, start_sample: int, end_sample: int, text: str) -> None:
+        text = text.strip()
+        if not text:
+            return
+        start, end = start_sample / self.fs, end_sample / self.fs
+        with self._lock:
+            cue = self._pending
+            if cue is not None:
+                joined = len(self._text(cue)) + 1 + len(text)
+                if (start - cue[1] > self.max_gap_sec or end - cue[0] > self.max_cue_sec
+                        or joined > self.max_chars):
+                    self._emit(next_start=start)
+                    cue = None
+            if cue is None:
+                self._pending = [max(start, self._last_end), end, [(final_id, text)]]
+            else:
+                cue[1] = max(cue[1], end)
+                cue[2].append((final_id, text))
+            cue = self._pending
+            if cue[1] - cue[0] >= self.min_cue_sec and text.endswith(SENTENCE_END):
+                self._emit()
+
+    def revise(self, final_id, text: str) -> bool:
+        """Swap a final's text if its cue has not been written yet."""
+        with self._lock:
+            if self._pending is None:
+                return False
+            parts = self._pending[2]
+            for i, (fid, _) in enumerate(parts):
+                if fid == final_id:
+                    parts[i] = (fid, text.strip())
+                    return True
+            return False
+
+    def tick(self, now_sample: int) -> None:
+        """Write the pending cue once the stream has moved max_gap_sec past it."""
+        if self._pending is None:
+            return
+        with self._lock:
+            if self._pending is not None and now_sample / self.fs - self._pending[1] > self.max_gap_sec:
+                self._emit()
+
+    def close(self) -> None:
+        with self._lock:
+            if self._pending is not None:
+                self._emit()
+            self._srt.close()
+            self._vtt.close()
+
+    @staticmethod
+    def _text(cue) -> str:
+        return " ".join(t for _, t in cue[2])
+
+    def _emit(self, next_start: float = None) -> None:
+        start, end, _ = self._pending
+        text          = wrap(self._text(self._pending))
+        self._pending = None
+        end = max(end, start + self.min_cue_sec)
+        if next_start is not None:
+            end = max(min(end, next_start), start + 0.1)
+        self.cues     += 1
+        self._last_end = end
+        self._srt.write(f"{self.cues}\n{_stamp(start, ',')} --> {_stamp(end, ',')}\n{text}\n\n")
+        self._vtt.write(f"{_stamp(start, '.')} --> {_stamp(end, '.')}\n{text}\n\n")
+        self._srt.flush()
+        self._vtt.flush()
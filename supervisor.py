@@ -0,0 +1,172 @@
+"""
+Pipeline Stage Supervisor
+=========================
+Runs pipeline stages on their own threads, keeps them running, and reports
+on them:
+
+    supervisor = Supervisor([Stage("receiver", receive),
+                             Stage("vad", segment, inbox=frames),
+                             Stage("transcriber", transcribe, inbox=clips)])
+    threading.Thread(target=supervisor.run, args=(stop_event,), daemon=True).start()
+    supervisor.start("receiver", "vad")
+    supervisor.status()   # [{"name", "state", "latency_ms", "depth", "restarts", ...}]
+
+A stage target, target(stage), loops until stage.stopping is set, calling
+stage.beat() at least every few seconds and stage.record(latency_s) per
+item.
+
+  * Crash.  An exception out of the target is caught.  The stage is
+    restarted after a backoff (1 s, doubling up to 30 s, reset after a
+    minute of healthy running).  Shared state the target closes over, such
+    as a loaded model, survives the restart: only the thread is replaced.
+  * Stall.  A running stage that has not beaten for stall_sec is reported
+    as "stalled".  Python threads cannot be killed, so it is left to
+    recover (a very long decode is the usual cause).
+  * Status.  State, smoothed per-item latency, inbox depth, restarts and
+    the last error, for a status line.
+"""
+
+import threading
+import time
+import traceback
+
+STOPPED, RUNNING, CRASHED, STALLED = "stopped", "running", "crashed", "stalled"
+
+BACKOFF_MIN_SEC = 1.0
+BACKOFF_MAX_SEC = 30.0
+HEALTHY_SEC     = 60.0     # running this long resets the backoff
+
+
+class Stage:
+    """One supervised thread; target(stage) loops until stage.stopping is set."""
+
+    def __init__(self, name: str, target, inbox=None, stall_sec: float = 30.0, alpha: float = 0.2):
+        self.name       = name
+        self.target     = target
+        self.inbox      = inbox
+        self.stall_sec  = stall_sec
+        self.alpha      = alpha
+        self.stopping   = threading.Event()
+        self.wanted     = False           # should be running
+        self.state      = STOPPED
+        self.thread     = None
+        self.heartbeat  = 0.0
+        self.started_at = 0.0
+        self.latency_s  = None            # smoothed per-item latency
+        self.items      = 0
+        self.restarts   = 0
+        self.last_error = None
+        self.backoff    = BACKOFF_MIN_SEC
+        self.retry_at   = 0.0
+
+    # Called by the target
+    def beat(self) -> None:
+        self.heartbeat = time.monotonic()
+
+    def record(self, latency_s: float) -> None:
+        self.heartbeat = time.monotonic()
+        self.items    += 1
+        self.latency_s = latency_s if self.latency_s is None else \
+            self.alpha * latency_s + (1 - self.alpha) * self.latency_s
+
+    # Called by the supervisor
+    @property
+    def alive(self) -> bool:
+        return self.thread is not None and self.thread.is_alive()
+
+    def _main(self) -> None:
+        try:
+            self.target(self)
+        except Exception as exc:
+            self.last_error = f"{type(exc).__name__}: {exc}"
+            self.state      = CRASHED
+            print(f"[{self.name}] crashed: {self.last_error}")
+            traceback.print_exc()
+            return
+        if not self.stopping.is_set():
+            self.last_error = "exited"
+            self.state      = CRASHED
+        else:
+            self.state = STOPPED
+
+    def start(self) -> None:
+        if self.alive:
+            return
+        self.stopping.clear()
+        self.state      = RUNNING
+        self.started_at = self.heartbeat = time.monotonic()
+        self.thread     = threading.Thread(target=self._main, daemon=True, name=self.name)
+        self.thread.start()
+
+    def stop(self, timeout: float = 2.0) -> None:
+        self.stopping.set()
+        if self.alive and self.thread is not threading.current_thread():
+            self.thread.join(timeout)
+        if not self.alive:
+            self.state = STOPPED
+
+    def depth(self) -> int:
+        return self.inbox.qsize() if self.inbox is not None else 0
+
+
+class Supervisor:
+    """Starts, stops, health-checks and restarts a set of stages."""
+
+    def __init__(self, stages: list, check_sec: float = 1.0):
+        self.stages    = {s.name: s for s in stages}
+        self.check_sec = check_sec
+        self._lock     = threading.Lock()
+
+    def start(self, *names) -> None:
+        with self._lock:
+            for name in names or self.stages:
+                stage = self.stages[name]
+                stage.wanted, stage.backoff = True, BACKOFF_MIN_SEC
+                stage.start()
+
+    def stop(self, *names) -> None:
+        with self._lock:
+            for name in names or reversed(list(self.stages)):
+                stage = self.stages[name]
+                stage.wanted = False
+                stage.stop()
+
+    def is_running(self, name: str) -> bool:
+        return self.stages[name].wanted
+
+    def check(self) -> None:
+        """One health pass: restart crashed stages (with backoff), flag stalled ones."""
+        now = time.monotonic()
+        with self._lock:
+            for stage in self.stages.values():
+                if not stage.wanted:
+                    continue
+                if not stage.alive:
+                    if stage.retry_at == 0.0:
+                        stage.retry_at = now + stage.backoff
+                    elif now >= stage.retry_at:
+                        stage.restarts += 1
+                        stage.retry_at  = 0.0
+                        stage.backoff   = min(stage.backoff * 2, BACKOFF_MAX_SEC)
+                        print(f"[supervisor] restarting {stage.name} (#{stage.restarts})")
+                        stage.start()
+                    continue
+                if now - stage.started_at > HEALTHY_SEC:
+                    stage.backoff = BACKOFF_MIN_SEC
+                stage.state = STALLED if now - stage.heartbeat > stage.stall_sec else RUNNING
+
+    def run(self, stop_event) -> None:
+        """Health-check every check_sec until stop_event; then stop everything."""
+        while not stop_event.wait(self.check_sec):
+            self.check()
+        self.stop()
+
+    def status(self) -> list:
+        return [{"name":       s.name,
+                 "state":      s.state if s.wanted or s.alive else STOPPED,
+                 "latency_ms": None if s.latency_s is None else s.latency_s * 1000,
+                 "depth":      s.depth(),
+                 "items":      s.items,
+                 "restarts":   s.restarts,
+                 "error":      s.last_error}
+                for s in self.stages.values()]
@@ -0,0 +1,121 @@
+"""
+Incremental File Follower
+=========================
+gui.py used to re-read the whole of live_transcript.txt and repaint the
+Text widget every time the file grew -- O(file size) per update, visibly
+sluggish an hour into a lecture.  FileFollower keeps a byte offset and
+returns only what was appended since the last call:
+
+    text, reset = follower.read_new()
+    if reset:                      # file truncated or replaced (rotation)
+        widget.delete("1.0", "end")
+    widget.insert("end", text)
+
+  * Truncation (size < offset) and rotation (a different inode at the
+    path) restart from the top of the new contents, with reset=True.
+  * Bytes are decoded incrementally, so a UTF-8 character split across two
+    writes is not mangled.
+  * Wake-ups.  On Linux, fileno() is an inotify descriptor watching the
+    file's directory (so a rotated-in replacement is seen too); register it
+    with Tk's createfilehandler and call read_new() when it is readable.
+    Elsewhere fileno() is None and the caller polls.
+"""
+
+import codecs
+import ctypes
+import ctypes.util
+import os
+import struct
+
+# inotify(7)
+IN_MODIFY      = 0x00000002
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_TO    = 0x00000080
+IN_CREATE      = 0x00000100
+IN_DELETE      = 0x00000200
+IN_NONBLOCK    = 0o4000
+IN_CLOEXEC     = 0o2000000
+
+_EVENT = struct.Struct("iIII")     # wd, mask, cookie, len
+
+
+def _inotify_dir(path: str):
+    """Non-blocking inotify fd watching path's directory, or None."""
+    try:
+        libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+        fd   = libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+    except (OSError, AttributeError):
+        return None
+    if fd < 0:
+        return None
+    directory = os.path.dirname(os.path.abspath(path)).encode()
+    mask      = IN_MODIFY | IN_CLOSE_WRITE | IN_MOVED_TO | IN_CREATE | IN_DELETE
+    if libc.inotify_add_watch(fd, directory, mask) < 0:
+        os.close(fd)
+        return None
+    return fd
+
+
+class FileFollower:
+    """Reads what was appended to a file since the last call."""
+
+    def __init__(self, path: str, use_inotify: bool = True):
+        self.path     = path
+        self._name    = os.path.basename(path).encode()
+        self._f       = None
+        self._id      = None          # (st_dev, st_ino) of the open file
+        self._decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+        self._fd      = _inotify_dir(path) if use_inotify else None
+
+    def fileno(self):
+        return self._fd
+
+    def drain_events(self) -> bool:
+        """Consume pending inotify events; True if any concerned our file."""
+        if self._fd is None:
+            return True
+        ours = False
+        while True:
+            try:
+                buf = os.read(self._fd, 4096)
+            except BlockingIOError:
+                return ours
+            except OSError:
+                return True
+            pos = 0
+            while pos + _EVENT.size <= len(buf):
+                _, _, _, length = _EVENT.unpack_from(buf, pos)
+                name = buf[pos + _EVENT.size:pos + _EVENT.size + length].rstrip(b"\0")
+                ours = ours or name == self._name
+                pos += _EVENT.size + length
+
+    def _reopen(self, st) -> None:
+        if self._f is not None:
+            self._f.close()
+        self._f  = open(self.path, "rb")
+        self._id = (st.st_dev, st.st_ino)
+        self._decoder.reset()
+
+    def read_new(self) -> tuple:
+        """(appended text, reset) -- reset means start the display over."""
+        try:
+            st = os.stat(self.path)
+        except FileNotFoundError:
+            return "", False            # rotated away; the replacement comes later
+        reset = False
+        if self._f is None or (st.st_dev, st.st_ino) != self._id:
+            reset = self._f is not None
+            self._reopen(st)
+        elif st.st_size < self._f.tell():
+            self._f.seek(0)              # truncated in place
+            self._decoder.reset()
+            reset = True
+        data = self._f.read()
+        return self._decoder.decode(data), reset
+
+    def close(self) -> None:
+        if self._f is not None:
+            self._f.close()
+        if self._fd is not None:
+            os.close(self._fd)
+            self._fd = None
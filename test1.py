@@ -2,18 +2,16 @@ import tkinter as tk
 from tkinter import scrolledtext
 import subprocess # to run other scripts
 import os
-import json # save window size for later
-
-# config file name
-CONFIG_FILE = "gui_config.json"
+from gui_settings import Settings, geometry # window size and font
 
 class TranscriptionApp:
     def __init__(self, root):
         self.root = root
         self.root.title("eScribe GUI Test")
         
-        # load save/defaults
-        self.load_settings()
+        # defaults now, saved settings once the background read finishes
+        self.settings = Settings(self.root)
+        self.root.geometry(geometry(self.settings.values))
         self.root.configure(bg='black')
         # var for background process
         self.proc_receiver = None
@@ -24,10 +22,11 @@ class TranscriptionApp:
         # change this file for grabbing the text
         self.live_file = "live_transcript.txt" 
 
-        # bind resize to save
-        self.root.bind("<Configure>", self.save_settings_trigger)
+        # resize/move saves once the window settles
+        self.root.bind("<Configure>", self.settings.track_geometry)
 
         self.create_widgets()
+        self.settings.load_async(self.apply_settings)
         self.monitor_file()
 
     def create_widgets(self):
@@ -84,30 +83,21 @@ class TranscriptionApp:
         """Kills all sub-processes and exits"""
         if self.proc_receiver: self.proc_receiver.terminate()
         if self.proc_whisper: self.proc_whisper.terminate()
+        self.settings.flush()
         self.root.quit()
 
     # --- LAYOUT PERSISTENCE LOGIC ---
 
-    def load_settings(self):
-        if os.path.exists(CONFIG_FILE):
-            with open(CONFIG_FILE, "r") as f:
-                data = json.load(f)
-                self.root.geometry(f"{data['w']}x{data['h']}+{data['x']}+{data['y']}")
-        else:
-            self.root.geometry("800x600+100+100")
-
-    def save_settings_trigger(self, event):
-        if event.widget == self.root:
-            geometry = self.root.geometry() 
-            w, rest = geometry.split('x')
-            h, x, y = rest.replace('+', ' ').replace('-', ' ').split()
-            settings = {"w": w, "h": h, "x": x, "y": y}
-            with open(CONFIG_FILE, "w") as f:
-                json.dump(settings, f)
+    def apply_settings(self, values):
+        # called once the saved settings have been read
+        self.root.geometry(geometry(values))
+        self.font_size = values["font_size"]
+        self.display.configure(font=("Arial", self.font_size))
 
     def adjust_font(self, delta):
-        self.font_size += delta
+        self.font_size = max(6, self.font_size + delta)
         self.display.configure(font=("Arial", self.font_size))
+        self.settings.set(font_size=self.font_size)
 
     def monitor_file(self):
         if os.path.exists(self.live_file):
@@ -0,0 +1,50 @@
+from early_final import SpeculativeFinals, COMMIT, HOLD, DROP
+
+
+def test_commit_after_decode_returns_result():
+    spec = SpeculativeFinals()
+    spec.open(100)
+    assert spec.resolve(100, "text") == HOLD
+    assert spec.commit(100) == "text"
+    assert spec._state == {} and spec._results == {}
+
+
+def test_cancel_while_decoding_drops_result():
+    spec = SpeculativeFinals()
+    spec.open(100)
+    spec.cancel(100)
+    assert spec.resolve(100, "text") == DROP
+    assert spec._state == {}
+    assert spec.cancelled == 1
+
+
+def test_failed_decode_then_commit_clears_key():
+    spec = SpeculativeFinals()
+    spec.open(100)
+    spec.cancel(100)                     # transcriber: decode raised
+    assert spec.commit(100) is None      # VAD: silence held, nothing to publish
+    assert spec._state == {}
+
+
+def test_commit_then_failed_decode_clears_key():
+    spec = SpeculativeFinals()
+    spec.open(100)
+    assert spec.commit(100) is None      # waiting for the result
+    spec.cancel(100)                     # ... which never comes
+    assert spec._state == {}
+
+
+def test_commit_before_decode_publishes_on_resolve():
+    spec = SpeculativeFinals()
+    spec.open(100)
+    assert spec.commit(100) is None
+    assert spec.resolve(100, "text") == COMMIT
+    assert spec._state == {}
+
+
+def test_discard_undoes_open():
+    spec = SpeculativeFinals()
+    spec.open(100)
+    spec.discard(100)                    # the flush failed, nothing was queued
+    assert spec._state == {}
+    assert spec.opened == 0 and spec.cancelled == 0
@@ -0,0 +1,88 @@
+import os
+
+import numpy as np
+
+from spill_log import SpillLog, _HEADER
+
+
+def _clip(i: int, n: int = 8000) -> np.ndarray:
+    return np.full(n, i, dtype=np.int16)
+
+
+def _drain(log: SpillLog) -> list:
+    out = []
+    while True:
+        rec = log.peek(raw=True)
+        if rec is None:
+            return out
+        out.append(rec[1]["i"])
+        log.commit()
+
+
+def test_compaction_copies_into_free_space_only(tmp_path):
+    path = str(tmp_path / "s.spill")
+    log  = SpillLog(path, initial_mb=0.1, max_mb=0.1)
+    for i in range(6):                           # ~96 KB of 16 KB records
+        assert log.append(_clip(i), {"i": i})
+    for _ in range(4):                           # consume the first four
+        log.peek(raw=True)
+        log.commit()
+
+    # The two live records fit below read_off without overlap: compacted
+    assert log.append(_clip(6), {"i": 6})
+    assert log._read_off == _HEADER.size
+    log.close()
+
+    log = SpillLog(path, initial_mb=0.1, max_mb=0.1)
+    assert log.recovered == 3
+    assert _drain(log) == [4, 5, 6]
+    log.close()
+
+
+def test_overlapping_live_records_are_not_moved(tmp_path):
+    path = str(tmp_path / "s.spill")
+    log  = SpillLog(path, initial_mb=0.1, max_mb=1.0)
+    for i in range(6):
+        assert log.append(_clip(i), {"i": i})
+    log.peek(raw=True)
+    log.commit()                                 # one consumed, five live
+
+    read_off = log._read_off
+    size     = os.path.getsize(path)
+    assert log.append(_clip(6), {"i": 6})        # grows instead of sliding
+    assert log._read_off == read_off
+    assert os.path.getsize(path) > size
+    log.close()
+
+    log = SpillLog(path, initial_mb=0.1, max_mb=1.0)
+    assert _drain(log) == [1, 2, 3, 4, 5, 6]
+    log.close()
+
+
+def test_commit_survives_reopen(tmp_path):
+    path = str(tmp_path / "s.spill")
+    log  = SpillLog(path, initial_mb=0.1)
+    for i in range(3):
+        log.append(_clip(i, 100), {"i": i})
+    log.peek(raw=True)
+    log.commit()
+    log.close()
+
+    log = SpillLog(path, initial_mb=0.1)
+    assert _drain(log) == [1, 2]
+    log.close()
+
+
+def test_growth_stops_at_max_not_before(tmp_path):
+    path = str(tmp_path / "s.spill")
+    log  = SpillLog(path, initial_mb=0.1, max_mb=0.15)
+    for i in range(6):
+        assert log.append(_clip(i), {"i": i})
+    assert log.append(_clip(6), {"i": 6})        # doubling would pass max: grow to max
+    assert os.path.getsize(path) == log.max_bytes
+    for i in range(7, 20):
+        if not log.append(_clip(i), {"i": i}):
+            break
+    assert os.path.getsize(path) == log.max_bytes
+    assert log.rejected == 1
+    log.close()
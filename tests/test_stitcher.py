@@ -0,0 +1,60 @@
+from types import SimpleNamespace
+
+from stitcher import TranscriptStitcher, format_words
+
+FS = 16000
+
+
+def _seg(*words, text=None, start=0.0, end=0.0):
+    """A faster-whisper-like segment; words are (text, start, end) relative to the window."""
+    ws = [SimpleNamespace(word=t, start=s, end=e, probability=0.9) for t, s, e in words]
+    if text is None:
+        text = "".join(w.word for w in ws)
+    return SimpleNamespace(text=text, start=start, end=end, words=ws or None)
+
+
+def _window(stitcher, start_sec, end_sec, *segments, final=False):
+    return stitcher.add_window(int(start_sec * FS), int(end_sec * FS), segments, final=final)
+
+
+def test_seam_repeat_is_not_duplicated():
+    st  = TranscriptStitcher(fs=FS, overlap_sec=0.5)
+    out = _window(st, 0.0, 3.0, _seg((" one", 0.2, 0.6), (" two", 1.0, 1.4),
+                                     (" three", 2.5, 2.9), (" four", 2.8, 3.0)))
+    assert format_words(out) == "one two three"          # "four" is past the cut
+
+    # The next window hears "three" again, a little later than window 1 did
+    out += _window(st, 2.5, 5.5, _seg((" three", 0.1, 0.5), (" four", 0.3, 0.6),
+                                      (" five", 1.0, 1.4)))
+    out += st.flush()
+    assert format_words(out) == "one two three four five"
+    assert st.dropped == 1
+
+
+def test_window_without_word_timestamps():
+    st  = TranscriptStitcher(fs=FS, overlap_sec=0.5)
+    out = _window(st, 0.0, 3.0, _seg(text=" Hello world.", start=1.5, end=2.9))
+    assert format_words(out) == "Hello world."
+    assert (out[0].start, out[0].end) == (1.5, 2.9)
+
+    # ... and the next window's copy of the overlap is not repeated
+    out += _window(st, 2.5, 5.5, _seg(text=" world.", start=0.0, end=0.4),
+                   _seg((" again", 0.5, 0.9)))
+    assert format_words(out) == "Hello world. again"
+
+
+def test_word_straddling_the_cut_is_committed_once():
+    st  = TranscriptStitcher(fs=FS, overlap_sec=0.5)
+    out = _window(st, 0.0, 3.0, _seg((" before", 1.0, 1.5), (" across", 2.6, 3.0)))
+    assert format_words(out) == "before"                 # held back, not cut in half
+
+    out += _window(st, 2.5, 5.5, _seg((" across", 0.1, 0.5), (" after", 1.0, 1.4)))
+    out += st.flush()
+    assert format_words(out) == "before across after"
+
+
+def test_straddling_word_kept_when_next_window_is_lost():
+    st  = TranscriptStitcher(fs=FS, overlap_sec=0.5)
+    out = _window(st, 0.0, 3.0, _seg((" before", 1.0, 1.5), (" across", 2.6, 3.0)))
+    out += _window(st, 5.5, 8.5, _seg((" later", 0.5, 0.9)))    # window at 2.5 s dropped
+    assert format_words(out) == "before across later"
@@ -0,0 +1,60 @@
+import os
+
+from subtitle_export import StreamClock, SubtitleWriter
+
+FS        = 16000
+PACKET    = 160            # samples per UDP packet (10 ms)
+PERIOD    = PACKET / FS
+
+
+def _cue_starts(path: str) -> list:
+    with open(path, encoding="utf-8") as f:
+        return [line.split(" --> ")[0] for line in f if " --> " in line]
+
+
+def test_sequence_gap_is_filled():
+    clock = StreamClock(FS)
+    assert clock.packet(10, PACKET, 0.0) == 0
+    assert clock.packet(11, PACKET, PERIOD) == 0
+    # packets 12..16 lost; 17 arrives on time
+    assert clock.packet(17, PACKET, 7 * PERIOD) == 5 * PACKET
+    assert clock.lost_packets == 5
+
+
+def test_sequence_wraps():
+    clock = StreamClock(FS)
+    clock.packet(0xFFFE, PACKET, 0.0)
+    assert clock.packet(1, PACKET, 3 * PERIOD) == 2 * PACKET   # 0xFFFF and 0 lost
+
+
+def test_dead_air_uses_wall_clock():
+    clock = StreamClock(FS)
+    clock.packet(5, PACKET, 100.0)
+    # Pico W rebooted: sequence restarts, 3 s later
+    assert clock.packet(0, PACKET, 103.0) == 3 * FS - PACKET
+    assert clock.lost_packets == 0
+
+
+def test_cues_stay_on_recording_clock_across_lost_packets(tmp_path):
+    base  = os.path.join(tmp_path, "session")
+    subs  = SubtitleWriter(base, FS)
+    clock = StreamClock(FS)
+    seen  = 0                                  # stream offset, as in udp_vad_loop
+
+    seq, now = 0, 0.0
+    for _ in range(200):                       # 2 s received
+        seen += clock.packet(seq, PACKET, now) + PACKET
+        seq, now = seq + 1, now + PERIOD
+    subs.add(1, 0, seen, "First sentence here.")
+
+    seq, now = seq + 100, now + 100 * PERIOD   # 1 s of packets lost
+    for _ in range(200):
+        seen += clock.packet(seq, PACKET, now) + PACKET
+        seq, now = seq + 1, now + PERIOD
+    subs.add(2, seen - 150 * PACKET, seen, "Second sentence here.")
+    subs.close()
+
+    # Recording time of the second final: 5 s in, 1.5 s long
+    assert seen == 5 * FS
+    assert _cue_starts(subs.srt_path) == ["00:00:00,000", "00:00:03,500"]
+    assert _cue_starts(subs.vtt_path) == ["00:00:00.000", "00:00:03.500"]
@@ -0,0 +1,120 @@
+import os
+
+from thermal import SysfsReader, ThermalGovernor
+
+CPUS = os.cpu_count() or 1
+
+
+def _write(root, rel: str, text: str) -> None:
+    path = os.path.join(root, rel)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "w") as f:
+        f.write(text + "\n")
+
+
+def _board(root, temp_c: float, cur_khz: int = 1_500_000, cap_khz: int = 2_400_000,
+           load: float = 0.6, throttled: str = None,
+           soc: str = "soc/soc:firmware") -> None:
+    """A Pi-like sysfs / procfs tree under root."""
+    _write(root, "sys/class/thermal/thermal_zone0/type", "cpu-thermal")
+    _write(root, "sys/class/thermal/thermal_zone0/temp", str(int(temp_c * 1000)))
+    cpufreq = "sys/devices/system/cpu/cpu0/cpufreq"
+    _write(root, f"{cpufreq}/scaling_cur_freq", str(cur_khz))
+    _write(root, f"{cpufreq}/scaling_max_freq", str(cap_khz))
+    _write(root, f"{cpufreq}/cpuinfo_max_freq", "2400000")
+    _write(root, "proc/loadavg", f"{load * CPUS:.2f} 0.50 0.40 2/300 1234")
+    fw = os.path.join(root, f"sys/devices/platform/{soc}/get_throttled")
+    if throttled is None:
+        if os.path.exists(fw):
+            os.remove(fw)
+    else:
+        _write(root, fw, throttled)
+
+
+def _governor(root) -> ThermalGovernor:
+    return ThermalGovernor(SysfsReader(str(root)), warm_c=70.0, hot_c=76.0, critical_c=80.0)
+
+
+def test_readings(tmp_path):
+    _board(tmp_path, 55.5, throttled="0")
+    reader = SysfsReader(str(tmp_path))
+    assert reader.temperature_c() == 55.5
+    assert reader.frequency_mhz() == (1500.0, 2400.0)
+    assert abs(reader.load() - 0.6) < 0.01
+    assert reader.throttled() is False
+
+
+def test_sub_max_clock_on_cool_board_stays_cool(tmp_path):
+    # ondemand / schedutil below max at moderate load is not throttling
+    _board(tmp_path, 52.0, cur_khz=1_500_000, load=0.6, throttled="0")
+    gov = _governor(tmp_path)
+    gov.sample()
+    assert gov.level_name == "cool"
+
+    _board(tmp_path, 52.0, cur_khz=1_500_000, load=0.6)          # no firmware node
+    gov = _governor(tmp_path)
+    gov.sample()
+    assert gov.level_name == "cool"
+
+
+def test_firmware_throttle_is_hot(tmp_path):
+    _board(tmp_path, 60.0, throttled="0x50004")                  # throttled now (+ since boot)
+    gov = _governor(tmp_path)
+    assert gov.sample()
+    assert gov.level_name == "hot"
+
+
+def test_firmware_node_on_pi5_layout(tmp_path):
+    _board(tmp_path, 60.0, throttled="0x4",
+           soc="soc@107c000000/soc@107c000000:firmware")
+    reader = SysfsReader(str(tmp_path))
+    assert reader.throttled() is True
+
+    _board(tmp_path, 60.0, cap_khz=1_800_000, throttled="0x0",
+           soc="soc@107c000000/soc@107c000000:firmware")
+    assert SysfsReader(str(tmp_path)).throttled() is False    # firmware wins over the cap
+
+
+def test_only_past_throttling_is_ignored(tmp_path):
+    _board(tmp_path, 60.0, throttled="0x50000")                  # since-boot bits only
+    gov = _governor(tmp_path)
+    gov.sample()
+    assert gov.level_name == "cool"
+
+
+def test_policy_cap_counts_without_firmware(tmp_path):
+    _board(tmp_path, 60.0, cap_khz=1_800_000)                    # cooling device lowered the cap
+    gov = _governor(tmp_path)
+    gov.sample()
+    assert gov.level_name == "hot"
+
+
+def test_temperature_levels_and_hysteresis(tmp_path, monkeypatch):
+    now = [0.0]
+    monkeypatch.setattr("thermal.time.monotonic", lambda: now[0])
+    gov = _governor(tmp_path)
+
+    def at(temp_c: float) -> str:
+        now[0] += 600.0                                          # slow drift, not a spike
+        _board(tmp_path, temp_c, throttled="0")
+        gov.sample()
+        return gov.level_name
+
+    assert at(50.0) == "cool"
+    assert at(71.0) == "warm"
+    assert at(81.0) == "critical"
+    assert at(78.0) == "critical"       # not hysteresis_c below 80 yet, and still rising on average
+    assert at(60.0) == "hot"            # one step per sample
+    assert at(60.0) == "warm"
+    assert at(60.0) == "cool"
+
+
+def test_fast_climb_escalates_early(tmp_path, monkeypatch):
+    now = [0.0]
+    monkeypatch.setattr("thermal.time.monotonic", lambda: now[0])
+    gov = _governor(tmp_path)
+    for temp_c in (50.0, 53.0, 56.0, 59.0, 62.0, 65.0, 68.0):   # +18 °C/min
+        now[0] += 10.0
+        _board(tmp_path, temp_c, throttled="0")
+        gov.sample()
+    assert gov.level_name == "hot"      # still below warm_c, but predicted past critical_c
@@ -0,0 +1,45 @@
+import threading
+from datetime import datetime
+
+from transcript_store import TranscriptStore, connect, search, import_log
+from transcript_writer import TZ
+
+
+def _store(path) -> None:
+    store  = TranscriptStore(str(path), "2026-10-19_09-00-00", flush_interval=0.05)
+    thread = threading.Thread(target=store.run)
+    thread.start()
+    store.add(1, "the mitochondria is the powerhouse", 1000.0, 0.0, 2.0, -0.3, "tiny.en")
+    store.revise(1, "The mitochondria is the powerhouse.", -0.1, "base.en")
+    store.close()
+    thread.join()
+
+
+def test_revision_records_refiner_model(tmp_path):
+    path = tmp_path / "t.db"
+    _store(path)
+    db, fts = connect(str(path))
+    (row,) = search(db, fts, "powerhouse")
+    assert row["model"] == "base.en"
+    assert row["text"] == "The mitochondria is the powerhouse."
+
+
+def test_query_without_words_returns_nothing(tmp_path):
+    path = tmp_path / "t.db"
+    _store(path)
+    db, fts = connect(str(path))
+    for query in ("", "   ", "?!", '"'):
+        assert search(db, fts, query) == []
+        assert search(db, False, query) == []
+
+
+def test_import_log_carries_the_date_past_midnight(tmp_path):
+    log = tmp_path / "2026-10-18_22-00-00.txt"
+    log.write_text("[23:59:50] (0.41s) last one today\n"
+                   "[23:59:58] (0.40s, refined) still today\n"
+                   "[00:00:07] (0.39s) first one tomorrow\n")
+    db, fts = connect(str(tmp_path / "t.db"))
+    assert import_log(db, str(log)) == 3
+    days = [datetime.fromtimestamp(r["wall"], TZ).strftime("%Y-%m-%d")
+            for r in db.execute("SELECT wall FROM finals ORDER BY final_id")]
+    assert days == ["2026-10-18", "2026-10-18", "2026-10-19"]
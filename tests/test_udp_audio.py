@@ -0,0 +1,72 @@
+import socket
+import struct
+
+import numpy as np
+
+from udp_audio import (PicoReceiver, DcBlocker, EnergyVad, frame_rms, clip_gain,
+                       ONSET, END, SILENCE, SPEECH)
+
+
+def _frame(level: float, n: int = 160) -> np.ndarray:
+    return np.full(n, level, dtype=np.float32) * np.sign(np.sin(np.arange(n)))
+
+
+def _run(vad: EnergyVad, levels: list) -> list:
+    return [vad.push(i, frame_rms(_frame(level))) for i, level in enumerate(levels)]
+
+
+def test_onset_needs_consecutive_loud_frames():
+    vad = EnergyVad(threshold=0.01, onset=3, silence_end=4, pre_roll=2)
+    assert _run(vad, [0.0, 0.1, 0.1, 0.0, 0.1, 0.1]) == [None] * 6
+    assert vad.state == SILENCE
+    assert vad.push(6, 0.1) == ONSET
+    assert vad.take_pre_roll() == [5, 6]         # pre-roll ends with the onset frame
+    assert vad.pre_roll == []
+
+
+def test_silence_hold_ends_speech():
+    vad = EnergyVad(threshold=0.01, onset=1, silence_end=3, pre_roll=2)
+    assert vad.push(0, 0.1) == ONSET
+    events = _run(vad, [0.0, 0.0, 0.1, 0.0, 0.0, 0.0])
+    assert events == [None, None, None, None, None, END]
+    assert vad.state == SILENCE and vad.silence_count == 0
+
+
+def test_split_keeps_speech():
+    vad = EnergyVad(threshold=0.01, onset=1, silence_end=3)
+    vad.push(0, 0.1)
+    _run(vad, [0.0, 0.0])
+    vad.split()
+    assert vad.state == SPEECH and vad.silence_count == 0
+    assert _run(vad, [0.0, 0.0]) == [None, None]
+
+
+def test_dc_blocker_removes_offset_across_packets():
+    dc  = DcBlocker()
+    out = [dc(np.full(160, 8000, dtype=np.int16)) for _ in range(200)]
+    assert out[0].dtype == np.float32
+    assert abs(out[0][0]) > 0.2                  # the step passes at first ...
+    assert abs(out[-1]).max() < 0.01             # ... and decays, state carried over
+
+
+def test_clip_gain():
+    assert clip_gain(np.array([0.25, -0.1], dtype=np.float32)) == 2.0
+    assert clip_gain(np.array([-32768, 0], dtype=np.int16)) == 0.5
+    assert clip_gain(np.zeros(4, dtype=np.int16)) == 1.0
+
+
+def test_receiver_counts_gaps_and_skips_runts():
+    rx = PicoReceiver("127.0.0.1", 0, timeout=0.2)
+    addr = ("127.0.0.1", rx.sock.getsockname()[1])
+    try:
+        with socket.socket(socket.AF_INET, socket.SOCK_DGRAM) as tx:
+            for seq in (1, 2, 5):
+                tx.sendto(struct.pack(">HH", seq, 0) + np.arange(4, dtype="<i2").tobytes(), addr)
+            tx.sendto(b"\x00\x06", addr)            # runt
+            tx.sendto(struct.pack(">HH", 6, 0) + b"\x01\x00", addr)
+        seqs = [rx.recv()[0] for _ in range(4)]
+        assert seqs == [1, 2, 5, 6]
+        assert rx.received == 4 and rx.lost == 2
+        assert rx.recv() is None                    # timeout
+    finally:
+        rx.close()
@@ -0,0 +1,244 @@
+"""
+Thermal- and Load-Aware Scheduling
+==================================
+A fanless Pi 5 throttles after 20-30 minutes of continuous decoding: the
+firmware starts cutting the clock at 80 °C, the decode RTF creeps up, and
+by the time the backpressure controller sees the queue delay it is already
+behind.  ThermalGovernor watches the causes instead of the symptom and
+steps the pipeline down *before* the firmware does:
+
+    level      trigger (any)                                  pipeline
+    cool       --                                             as configured
+    warm       temp >= warm_c, or predicted >= hot_c          refinement paused,
+               within horizon_s, or load >= load_high         interims halved
+    hot        temp >= hot_c, or predicted >= critical_c,     interims off,
+               or the clock is already being throttled        longer segments
+    critical   temp >= critical_c                             shed stale interims,
+                                                              smaller model requested
+
+  * "predicted" extrapolates the smoothed temperature slope horizon_s
+    ahead, so a fast climb escalates while there is still headroom.
+  * Stepping down again needs temp hysteresis_c below the level's
+    threshold and a non-rising prediction, so it does not flap.
+  * "Throttled" is the firmware's own report (get_throttled: frequency
+    capped, throttled or soft temperature limit active right now).  Without
+    it, a policy cap below the hardware maximum (scaling_max_freq <
+    cpuinfo_max_freq, which is what a cpufreq cooling device lowers) counts.
+    A current clock below max does not: ondemand / schedutil sit there at
+    moderate load on a cool board.
+
+Readings come from sysfs / procfs under a configurable root, so a fake
+tree works as well as the real one:
+
+    <root>/sys/class/thermal/thermal_zone*/{type,temp}       millidegrees C
+    <root>/sys/devices/system/cpu/cpu0/cpufreq/{scaling_cur_freq,scaling_max_freq,cpuinfo_max_freq}   kHz
+    <root>/sys/devices/platform/soc*/*firmware/get_throttled                    hex bit mask
+        (soc/soc:firmware on a Pi 4, soc@107c000000/soc@107c000000:firmware on a Pi 5)
+    <root>/proc/loadavg
+
+    governor = ThermalGovernor(SysfsReader(root="/"))
+    if governor.sample():                 # every few seconds
+        apply(governor.level_name)        # returns True when the level changed
+"""
+
+import glob
+import os
+import threading
+import time
+from collections import deque
+
+LEVELS = ("cool", "warm", "hot", "critical")
+
+_ZONE_PREFERENCE = ("cpu-thermal", "cpu_thermal", "x86_pkg_temp", "soc_thermal")
+
+_FIRMWARE_GLOB = ("sys", "devices", "platform", "soc*", "*firmware", "get_throttled")
+
+# get_throttled bits that mean "right now": arm frequency capped (1),
+# throttled (2), soft temperature limit active (3).  Bits 16+ are "since boot".
+THROTTLED_NOW = 0x2 | 0x4 | 0x8
+
+
+class SysfsReader:
+    """Temperature, clock and load from sysfs / procfs under root.  Missing files read as None."""
+
+    def __init__(self, root: str = "/"):
+        self.root  = root
+        self._zone = None
+        self._firmware = None
+
+    def _path(self, *parts) -> str:
+        return os.path.join(self.root, *parts)
+
+    @staticmethod
+    def _read_int(path: str):
+        try:
+            with open(path) as f:
+                return int(f.read().split()[0])
+        except (OSError, ValueError, IndexError):
+            return None
+
+    def _find_zone(self):
+        zones = sorted(glob.glob(self._path("sys", "class", "thermal", "thermal_zone*")))
+        types = {}
+        for z in zones:
+            try:
+                with open(os.path.join(z, "type")) as f:
+                    types[z] = f.read().strip()
+            except OSError:
+                types[z] = ""
+        for want in _ZONE_PREFERENCE:
+            for z, t in types.items():
+                if t == want:
+                    return z
+        return zones[0] if zones else None
+
+    def temperature_c(self):
+        if self._zone is None:
+            self._zone = self._find_zone() or ""
+        if not self._zone:
+            return None
+        milli = self._read_int(os.path.join(self._zone, "temp"))
+        return None if milli is None else milli / 1000.0
+
+    def frequency_mhz(self) -> tuple:
+        """(current, max) in MHz; (None, None) without cpufreq."""
+        base = self._path("sys", "devices", "system", "cpu", "cpu0", "cpufreq")
+        cur  = self._read_int(os.path.join(base, "scaling_cur_freq"))
+        top  = self._read_int(os.path.join(base, "cpuinfo_max_freq"))
+        if cur is None or top is None:
+            return None, None
+        return cur / 1000.0, top / 1000.0
+
+    def _find_firmware(self):
+        # The soc node is named after its bus address on newer boards
+        found = sorted(glob.glob(self._path(*_FIRMWARE_GLOB)))
+        return found[0] if found else None
+
+    def throttled(self):
+        """True if the clock is being held down now; None if nothing reports it."""
+        if self._firmware is None:
+            self._firmware = self._find_firmware()     # looked for again until found
+        if self._firmware is not None:
+            try:
+                with open(self._firmware) as f:
+                    return bool(int(f.read().strip(), 16) & THROTTLED_NOW)
+            except (OSError, ValueError):
+                pass
+        base = self._path("sys", "devices", "system", "cpu", "cpu0", "cpufreq")
+        cap  = self._read_int(os.path.join(base, "scaling_max_freq"))
+        top  = self._read_int(os.path.join(base, "cpuinfo_max_freq"))
+        if cap is None or top is None:
+            return None
+        return cap < top
+
+    def load(self):
+        """1-minute load average per CPU (1.0 = every core busy)."""
+        try:
+            with open(self._path("proc", "loadavg")) as f:
+                one = float(f.read().split()[0])
+        except (OSError, ValueError, IndexError):
+            return None
+        return one / (os.cpu_count() or 1)
+
+
+class ThermalGovernor:
+    """Turns periodic readings into a level; thread-safe reads of level / stats."""
+
+    def __init__(self, reader: SysfsReader, warm_c: float = 70.0, hot_c: float = 76.0,
+                 critical_c: float = 80.0, horizon_s: float = 60.0, load_high: float = 0.9,
+                 hysteresis_c: float = 4.0, alpha: float = 0.3):
+        self.reader       = reader
+        self.thresholds   = (warm_c, hot_c, critical_c)
+        self.horizon_s    = horizon_s
+        self.load_high    = load_high
+        self.hysteresis_c = hysteresis_c
+        self.alpha        = alpha
+
+        self.level      = 0
+        self.temp       = None
+        self.slope      = 0.0      # smoothed °C / s
+        self.freq_ratio = None     # current / max clock (reported, not acted on)
+        self.throttled  = None
+        self.load       = None
+        self.decisions  = deque(maxlen=20)   # (wall time, text), newest last
+        self._last      = None               # (monotonic, temp) of the previous sample
+        self._lock      = threading.Lock()
+
+    @property
+    def level_name(self) -> str:
+        return LEVELS[self.level]
+
+    @property
+    def predicted(self):
+        if self.temp is None:
+            return None
+        return self.temp + max(self.slope, 0.0) * self.horizon_s
+
+    def _target(self) -> tuple:
+        """(level the readings call for, reason)."""
+        warm_c, hot_c, critical_c = self.thresholds
+        t, pred = self.temp, self.predicted
+
+        if t is not None and t >= critical_c:
+            return 3, f"{t:.0f}°C >= {critical_c:.0f}°C"
+        if t is not None and t >= hot_c:
+            return 2, f"{t:.0f}°C >= {hot_c:.0f}°C"
+        if pred is not None and pred >= critical_c:
+            return 2, f"{t:.0f}°C rising {self.slope * 60:+.1f}°C/min"
+        if self.throttled:
+            return 2, "clock is being throttled"
+        if t is not None and t >= warm_c:
+            return 1, f"{t:.0f}°C >= {warm_c:.0f}°C"
+        if pred is not None and pred >= hot_c:
+            return 1, f"{t:.0f}°C rising {self.slope * 60:+.1f}°C/min"
+        if self.load is not None and self.load >= self.load_high:
+            return 1, f"load {self.load:.2f} per CPU"
+        return 0, "cool"
+
+    def _can_relax(self) -> bool:
+        """Below the current level's threshold by the hysteresis margin, and not rising."""
+        threshold = self.thresholds[self.level - 1]
+        return ((self.temp is None or self.temp <= threshold - self.hysteresis_c)
+                and self.slope <= 0.0)
+
+    def sample(self) -> bool:
+        """Take one reading; True when the level changed (see decisions)."""
+        temp      = self.reader.temperature_c()
+        cur, top  = self.reader.frequency_mhz()
+        throttled = self.reader.throttled()
+        load      = self.reader.load()
+        now       = time.monotonic()
+
+        with self._lock:
+            if temp is not None and self._last is not None and now > self._last[0]:
+                rate       = (temp - self._last[1]) / (now - self._last[0])
+                self.slope = self.alpha * rate + (1 - self.alpha) * self.slope
+            if temp is not None:
+                self._last = (now, temp)
+            self.temp       = temp
+            self.freq_ratio = None if not top else cur / top
+            self.throttled  = throttled
+            self.load       = load
+
+            target, reason = self._target()
+            if target > self.level:
+                level = target                     # escalate at once
+            elif target < self.level and self._can_relax():
+                level = self.level - 1             # one step at a time
+            else:
+                return False
+            self.decisions.append((time.time(), f"{LEVELS[self.level]} -> {LEVELS[level]}: {reason}"))
+            self.level = level
+            return True
+
+    def stats(self) -> str:
+        parts = [f"thermal [{self.level_name}]"]
+        if self.temp is not None:
+            parts.append(f"{self.temp:.1f}°C ({self.slope * 60:+.1f}/min)")
+        if self.freq_ratio is not None:
+            parts.append(f"clock {self.freq_ratio:.0%}" + (" throttled" if self.throttled else ""))
+        if self.load is not None:
+            parts.append(f"load {self.load:.2f}")
+        if self.decisions:
+            parts.append(f"last: {self.decisions[-1][1]}")
+        return "  ".join(parts)
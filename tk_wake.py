@@ -0,0 +1,105 @@
+"""
+Event-Driven Tk Updates
+=======================
+The Tk GUIs used to poll their update queue every 100 ms -- ten wake-ups a
+second with nothing to do during a pause, and during a burst every queued
+interim relabelled the same line.  WakeQueue is a queue.Queue that wakes
+the Tk main loop itself:
+
+    pipeline thread                     Tk main thread
+    q.put(item)                         pipe readable -> schedule one drain
+      first put since the last drain    ... frame_ms later (more puts may land)
+      writes one byte to a pipe         q.drain() -> every item, in order
+
+  * Tk-safe.  Other threads never call into Tk; the only cross-thread
+    signal is a byte on a pipe that Tk's own event loop watches
+    (createfilehandler).
+  * Coalesced.  Only the first put after a drain writes to the pipe, and
+    the drain runs once per frame however many items arrived; the caller
+    then applies just the newest interim (see latest_per_kind()).
+  * Idle is idle.  No timers run while nothing is published.  Where Tk has
+    no file handlers (Windows) attach() returns False and the caller falls
+    back to polling.
+
+    gui_queue = WakeQueue()
+    if not gui_queue.attach(root, app.apply_updates):
+        poll()                                  # root.after() loop as before
+"""
+
+import os
+import queue
+import tkinter
+
+FRAME_MS = 16     # coalescing window: one drain per ~display frame
+
+
+class WakeQueue(queue.Queue):
+    """Unbounded queue whose put() wakes an attached Tk main loop."""
+
+    def __init__(self):
+        super().__init__()
+        self._r, self._w = os.pipe()
+        os.set_blocking(self._r, False)
+        os.set_blocking(self._w, False)
+        self._signalled = False      # a wake-up byte is in flight (guarded by self.mutex)
+        self._scheduled = False      # a drain is scheduled on the Tk side
+        self.wakeups    = 0
+        self.drains     = 0
+
+    def _put(self, item) -> None:
+        super()._put(item)           # called with self.mutex held
+        if not self._signalled:
+            self._signalled = True
+            try:
+                os.write(self._w, b"!")
+            except BlockingIOError:
+                pass                 # pipe full: a wake-up is pending anyway
+
+    def attach(self, root, on_items, frame_ms: int = FRAME_MS) -> bool:
+        """Call on_items(list) on the Tk thread after puts; False if Tk can't watch fds."""
+        def _readable(fd, mask):
+            try:
+                while os.read(self._r, 512):
+                    pass
+            except BlockingIOError:
+                pass
+            self.wakeups += 1
+            if not self._scheduled:
+                self._scheduled = True
+                root.after(frame_ms, _run)
+
+        def _run():
+            self._scheduled = False
+            items = self.drain()
+            if items:
+                on_items(items)
+
+        try:
+            root.tk.createfilehandler(self._r, tkinter.READABLE, _readable)
+        except (AttributeError, RuntimeError, tkinter.TclError):
+            return False
+        root.after_idle(_run)        # anything put before attach()
+        return True
+
+    def drain(self) -> list:
+        """Every queued item, oldest first; re-arms the wake-up."""
+        with self.mutex:
+            items = list(self.queue)
+            self.queue.clear()
+            self._signalled = False
+            self.drains    += 1
+            self.not_full.notify_all()
+        return items
+
+
+def latest_per_kind(items: list, coalesce=("partial",)) -> list:
+    """
+    Drop all but the newest item of each kind in coalesce, keeping the
+    order of everything else -- the survivor takes its newest position.
+    """
+    last = {}
+    for i, (kind, _) in enumerate(items):
+        if kind in coalesce:
+            last[kind] = i
+    return [item for i, item in enumerate(items)
+            if item[0] not in coalesce or last[item[0]] == i]
@@ -0,0 +1,348 @@
+"""
+Indexed Transcript Store
+========================
+The text logs in logs/ are named by start time and hold only a wall-clock
+stamp per line; finding what was said about a topic last week meant
+grepping every file.  TranscriptStore keeps every final as a record in one
+SQLite database with a full-text index:
+
+    column       meaning
+    session      session id (the log's start time, e.g. 2026-10-19_09-00-00)
+    final_id     the pipeline's final id, unique within a session
+    stream       audio source (Pico W address:port)
+    start_s      absolute offset of the clip in the session's audio stream
+    end_s        (from the sample counter, so it does not drift)
+    wall         time.time() when the final was published
+    confidence   duration-weighted avg_logprob (confidence.summarise)
+    model        model that produced the text (refined finals: the refiner's)
+    text
+
+  * Batched writes.  add() / revise() only queue; run() commits whatever
+    has accumulated every flush_interval (or flush_rows rows) in one
+    transaction, on its own thread and connection.  WAL mode lets queries
+    read while the pipeline writes.
+  * Full-text search.  An FTS5 index over text (external content, kept in
+    step by triggers), ranked hits returned in time order.  SQLite builds
+    without FTS5 fall back to a LIKE scan.
+  * Old logs.  `import` back-fills records from the plain-text logs, with
+    the date taken from the file name.
+
+    python transcript_store.py search "mitochondria" --since 2026-09-01
+    python transcript_store.py sessions
+    python transcript_store.py show 2026-10-19_09-00-00
+    python transcript_store.py import logs/*.txt
+"""
+
+import argparse
+import glob
+import os
+import queue
+import re
+import sqlite3
+import sys
+import threading
+import time
+from datetime import datetime, timedelta
+
+from transcript_writer import TZ, clock
+
+STORE_PATH = os.path.join("logs", "transcripts.db")
+
+_STOP = object()
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS finals (
+    id         INTEGER PRIMARY KEY,
+    session    TEXT    NOT NULL,
+    final_id   INTEGER NOT NULL,
+    stream     TEXT,
+    start_s    REAL,
+    end_s      REAL,
+    wall       REAL    NOT NULL,
+    confidence REAL,
+    model      TEXT,
+    text       TEXT    NOT NULL,
+    revised    INTEGER NOT NULL DEFAULT 0,
+    UNIQUE (session, final_id)
+);
+CREATE INDEX IF NOT EXISTS finals_wall ON finals (wall);
+"""
+
+_FTS_SCHEMA = """
+CREATE VIRTUAL TABLE IF NOT EXISTS finals_fts USING fts5 (
+    text, content='finals', content_rowid='id', tokenize='porter unicode61'
+);
+CREATE TRIGGER IF NOT EXISTS finals_ai AFTER INSERT ON finals BEGIN
+    INSERT INTO finals_fts (rowid, text) VALUES (new.id, new.text);
+END;
+CREATE TRIGGER IF NOT EXISTS finals_au AFTER UPDATE OF text ON finals BEGIN
+    INSERT INTO finals_fts (finals_fts, rowid, text) VALUES ('delete', old.id, old.text);
+    INSERT INTO finals_fts (rowid, text) VALUES (new.id, new.text);
+END;
+CREATE TRIGGER IF NOT EXISTS finals_ad AFTER DELETE ON finals BEGIN
+    INSERT INTO finals_fts (finals_fts, rowid, text) VALUES ('delete', old.id, old.text);
+END;
+"""
+
+_COLUMNS = "session, final_id, stream, start_s, end_s, wall, confidence, model, text, revised"
+
+
+def connect(path: str = STORE_PATH) -> tuple:
+    """(connection, has_fts) with the schema in place."""
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    db = sqlite3.connect(path, timeout=10.0, check_same_thread=False)
+    db.row_factory = sqlite3.Row
+    db.execute("PRAGMA journal_mode=WAL")
+    db.execute("PRAGMA synchronous=NORMAL")
+    db.executescript(_SCHEMA)
+    try:
+        db.executescript(_FTS_SCHEMA)
+        fts = True
+    except sqlite3.OperationalError:
+        fts = False                      # SQLite built without FTS5
+    db.commit()
+    return db, fts
+
+
+# ─── Writer (pipeline side) ───────────────────────────────────────────────────
+
+class TranscriptStore:
+    """Queues finals and revisions; run() writes them in batches."""
+
+    def __init__(self, path: str = STORE_PATH, session: str = None, stream: str = None,
+                 flush_interval: float = 1.0, flush_rows: int = 64, max_queue: int = 4096):
+        self.path           = path
+        self.session        = session
+        self.stream         = stream
+        self.flush_interval = flush_interval
+        self.flush_rows     = flush_rows
+        self._queue         = queue.Queue(maxsize=max_queue)
+        self._finished      = threading.Event()
+        self.stored         = 0
+        self.batches        = 0
+        self.dropped        = 0
+
+    def add(self, final_id: int, text: str, wall: float = None, start_s: float = None,
+            end_s: float = None, confidence: float = None, model: str = None) -> None:
+        self._put(("add", (self.session, final_id, self.stream, start_s, end_s,
+                           time.time() if wall is None else wall, confidence, model, text, 0)))
+
+    def revise(self, final_id: int, text: str, confidence: float = None, model: str = None) -> None:
+        self._put(("revise", (text, confidence, model, self.session, final_id)))
+
+    def _put(self, item: tuple) -> None:
+        # The text log is the record of last resort; the index is not worth
+        # stalling the transcriber for
+        try:
+            self._queue.put_nowait(item)
+        except queue.Full:
+            self.dropped += 1
+
+    def _commit(self, db, batch: list) -> None:
+        adds    = [row for op, row in batch if op == "add"]
+        revises = [row for op, row in batch if op == "revise"]
+        with db:
+            if adds:
+                db.executemany(f"INSERT OR IGNORE INTO finals ({_COLUMNS}) "
+                               f"VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)", adds)
+            if revises:
+                db.executemany("UPDATE finals SET text = ?, confidence = ?, "
+                               "model = COALESCE(?, model), revised = 1 "
+                               "WHERE session = ? AND final_id = ?", revises)
+        self.stored  += len(adds)
+        self.batches += 1
+
+    def run(self) -> None:
+        """Write batches until close(); at most flush_interval behind the pipeline."""
+        db, _ = connect(self.path)
+        try:
+            stopping = False
+            while not stopping:
+                batch    = []
+                deadline = None
+                while len(batch) < self.flush_rows:
+                    timeout = None if deadline is None else deadline - time.monotonic()
+                    if timeout is not None and timeout <= 0:
+                        break
+                    try:
+                        item = self._queue.get(timeout=timeout)
+                    except queue.Empty:
+                        break
+                    if item is _STOP:
+                        stopping = True
+                        break
+                    batch.append(item)
+                    if deadline is None:
+                        deadline = time.monotonic() + self.flush_interval
+                if batch:
+                    try:
+                        self._commit(db, batch)
+                    except sqlite3.Error as exc:
+                        self.dropped += len(batch)
+                        print(f"Transcript store write failed: {exc}")
+        finally:
+            db.close()
+            self._finished.set()
+
+    def close(self, timeout: float = 5.0) -> None:
+        self._queue.put(_STOP)
+        self._finished.wait(timeout)
+
+    def stats(self) -> str:
+        return (f"store: {self.stored} finals in {self.batches} batches"
+                + (f", {self.dropped} dropped" if self.dropped else ""))
+
+
+# ─── Queries ──────────────────────────────────────────────────────────────────
+
+def _fts_query(text: str) -> str:
+    """Plain words -> an FTS5 AND query; quotes keep operators out of it."""
+    words = re.findall(r"[\w']+\*?", text)
+    return " ".join(f'"{w.rstrip("*")}"' + ("*" if w.endswith("*") else "") for w in words)
+
+
+def _day_start(day: str) -> float:
+    return datetime.strptime(day, "%Y-%m-%d").replace(tzinfo=TZ).timestamp()
+
+
+def search(db, fts: bool, query: str, since: float = None, until: float = None,
+           session: str = None, limit: int = 50) -> list:
+    """Records matching query (all words), oldest first; [] if it has no words."""
+    where, args = [], []
+    if fts:
+        match = _fts_query(query)
+        if not match:
+            return []                 # MATCH '' is an fts5 syntax error
+        where.append("finals.id IN (SELECT rowid FROM finals_fts WHERE finals_fts MATCH ?)")
+        args.append(match)
+    else:
+        if not query.split():
+            return []
+        for word in query.split():
+            where.append("finals.text LIKE ?")
+            args.append(f"%{word}%")
+    if since is not None:
+        where.append("wall >= ?")
+        args.append(since)
+    if until is not None:
+        where.append("wall < ?")
+        args.append(until)
+    if session:
+        where.append("session = ?")
+        args.append(session)
+    sql = (f"SELECT {_COLUMNS} FROM finals WHERE {' AND '.join(where) or '1'} "
+           f"ORDER BY wall DESC LIMIT ?")
+    return list(reversed(db.execute(sql, args + [limit]).fetchall()))
+
+
+def session_finals(db, session: str, before_id: int = None, limit: int = 200) -> list:
+    """A session's finals, oldest first; before_id pages backwards, limit -1 = all."""
+    sql, args = f"SELECT {_COLUMNS} FROM finals WHERE session = ?", [session]
+    if before_id is not None:
+        sql += " AND final_id < ?"
+        args.append(before_id)
+    sql += " ORDER BY final_id DESC LIMIT ?"
+    return list(reversed(db.execute(sql, args + [limit]).fetchall()))
+
+
+def sessions(db) -> list:
+    """(session, finals, first wall, last wall), newest first."""
+    return db.execute("SELECT session, COUNT(*), MIN(wall), MAX(wall) FROM finals "
+                      "GROUP BY session ORDER BY MIN(wall) DESC").fetchall()
+
+
+# ─── Back-fill from text logs ─────────────────────────────────────────────────
+
+_LOG_NAME = re.compile(r"(\d{4}-\d{2}-\d{2})_(\d{2})-(\d{2})-(\d{2})")
+_LOG_LINE = re.compile(r"^\[(\d{2}):(\d{2}):(\d{2})\]\s*(?:\([^)]*\)\s*)?(.*\S)")
+
+
+def import_log(db, path: str) -> int:
+    """
+    Add the lines of one text log as a session named after the file.  Lines
+    carry only HH:MM:SS; the date starts at the file's and moves on a day
+    whenever the clock jumps back by more than half a day (midnight).
+    """
+    name = _LOG_NAME.search(os.path.basename(path))
+    if not name:
+        return 0
+    session = name.group(0)
+    day     = datetime.strptime(name.group(1), "%Y-%m-%d")
+    rows    = []
+    last    = None
+    with open(path, encoding="utf-8", errors="replace") as f:
+        for line in f:
+            m = _LOG_LINE.match(line)
+            if not m:
+                continue
+            h, mi, s, text = int(m.group(1)), int(m.group(2)), int(m.group(3)), m.group(4)
+            wall = day.replace(hour=h, minute=mi, second=s, tzinfo=TZ).timestamp()
+            if last is not None and wall < last - 12 * 3600:
+                day += timedelta(days=1)
+                wall = day.replace(hour=h, minute=mi, second=s, tzinfo=TZ).timestamp()
+            last = wall
+            rows.append((session, len(rows) + 1, None, None, None, wall, None, None, text, 0))
+    with db:
+        db.executemany(f"INSERT OR IGNORE INTO finals ({_COLUMNS}) "
+                       f"VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)", rows)
+    return len(rows)
+
+
+# ─── CLI ──────────────────────────────────────────────────────────────────────
+
+def _print_row(r) -> None:
+    day    = datetime.fromtimestamp(r["wall"], TZ).strftime("%Y-%m-%d")
+    offset = f" @{r['start_s']:7.1f}s" if r["start_s"] is not None else ""
+    print(f"{day} {clock(r['wall'])}{offset}  {r['text']}")
+
+
+def main(argv=None) -> int:
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    ap.add_argument("--db", default=STORE_PATH)
+    sub = ap.add_subparsers(dest="cmd", required=True)
+
+    p = sub.add_parser("search", help="full-text search, oldest hit first")
+    p.add_argument("query")
+    p.add_argument("--since", help="YYYY-MM-DD")
+    p.add_argument("--until", help="YYYY-MM-DD (exclusive)")
+    p.add_argument("--session")
+    p.add_argument("--limit", type=int, default=50)
+
+    sub.add_parser("sessions", help="list sessions")
+
+    p = sub.add_parser("show", help="print one session")
+    p.add_argument("session")
+
+    p = sub.add_parser("import", help="back-fill from text logs")
+    p.add_argument("paths", nargs="+")
+
+    args = ap.parse_args(argv)
+    db, fts = connect(args.db)
+
+    if args.cmd == "search":
+        since = _day_start(args.since) if args.since else None
+        until = _day_start(args.until) if args.until else None
+        rows  = search(db, fts, args.query, since, until, args.session, args.limit)
+        for r in rows:
+            _print_row(r)
+        print(f"{len(rows)} hit(s)")
+    elif args.cmd == "sessions":
+        for session, n, first, last in sessions(db):
+            print(f"{session}  {n:5d} finals  {clock(first)}-{clock(last)}")
+    elif args.cmd == "show":
+        for r in session_finals(db, args.session, None, -1):
+            _print_row(r)
+    elif args.cmd == "import":
+        total = 0
+        for pattern in args.paths:
+            for path in sorted(glob.glob(pattern)):
+                n = import_log(db, path)
+                total += n
+                print(f"{path}: {n} lines")
+        print(f"Imported {total} line(s)")
+    db.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,256 @@
+"""
+Asynchronous Transcript Writer
+==============================
+The transcriber used to format a timestamp, write and flush() the log from
+the same thread that runs inference -- on an SD card a slow flush is a
+stalled decoder.  TranscriptWriter moves all of it to its own thread:
+
+    transcriber                         writer thread
+    log.append(text, when)  --queue-->  format [HH:MM:SS], write (buffered)
+      (a tuple put, no I/O)             group fsync: every sync_interval or
+                                        sync_lines lines, whichever is first
+                                        rotate: new day, or file > max_bytes
+
+  * Durability bound.  A line is fsync'd at most sync_interval (default
+    1 s) after the writer picks it up, so a power cut loses at most about
+    that much transcript -- and the card sees one sync per batch instead of
+    one write per line.
+  * Bounded queue.  max_queue lines.  If it ever fills the card has stopped
+    responding; the transcriber then waits for room rather than dropping
+    lines (counted in stats()).
+  * Rotation.  Files live under the log directory, named by the time they
+    were opened like the session log itself: <session>.txt first, then
+    <YYYY-mm-dd_HH-MM-SS>.txt after midnight or once max_bytes is reached.
+  * Revisions.  replace(handle, text) rewrites a recent line in place
+    (EditableLog, below) and keeps its original timestamp; a line that has
+    rotated into a closed file is left as it was.
+
+    log = TranscriptWriter("logs", dt_str)
+    threading.Thread(target=log.run, daemon=True, name="writer").start()
+    handle = log.append(f"({elapsed:.2f}s) {text}")     # when defaults to now
+    log.replace(handle, f"({elapsed:.2f}s, refined) {better}")
+    log.close()                                         # drains, syncs, closes
+"""
+
+import itertools
+import os
+import queue
+import threading
+import time
+from collections import deque
+from datetime import datetime
+from zoneinfo import ZoneInfo
+
+from byte_queue import MB
+
+TZ = ZoneInfo("America/Chicago")
+
+_STOP = object()
+
+
+def clock(when: float, tz=TZ) -> str:
+    """HH:MM:SS of a time.time() value in the lecture's time zone."""
+    return datetime.fromtimestamp(when, tz).strftime("%H:%M:%S")
+
+
+class EditableLog:
+    """
+    Append-only text log whose last `keep` lines can be rewritten in place.
+    A rewrite truncates the file at the line and writes it back with the
+    lines after it, so its cost is bounded by the size of that tail.
+    """
+
+    def __init__(self, path: str, keep: int = 32):
+        self.path     = path
+        self._f       = open(path, "a+b")
+        self._lines   = deque(maxlen=keep)     # [handle, byte offset]
+        self._next    = 0
+        self._lock    = threading.Lock()
+
+    def append(self, line: str, flush: bool = True) -> int:
+        """
+        Write one line (newline added); returns a handle for replace().
+        flush=False leaves it in the buffer for a batched sync().
+        """
+        data = (line.rstrip("\n") + "\n").encode()
+        with self._lock:
+            self._f.seek(0, os.SEEK_END)
+            offset = self._f.tell()
+            self._f.write(data)
+            if flush:
+                self._f.flush()
+            self._next += 1
+            self._lines.append([self._next, offset])
+            return self._next
+
+    def replace(self, handle: int, line: str) -> bool:
+        """Rewrite a recent line; False if it has scrolled out of reach."""
+        data = (line.rstrip("\n") + "\n").encode()
+        with self._lock:
+            idx = next((i for i, (h, _) in enumerate(self._lines) if h == handle), None)
+            if idx is None:
+                return False
+            offset = self._lines[idx][1]
+            self._f.seek(offset)
+            tail = self._f.read()
+            cut  = tail.find(b"\n") + 1 or len(tail)
+            self._f.truncate(offset)
+            self._f.write(data + tail[cut:])
+            self._f.flush()
+            delta = len(data) - cut
+            for entry in list(self._lines)[idx + 1:]:
+                entry[1] += delta
+            return True
+
+    def sync(self) -> None:
+        """Flush and fsync: everything written so far survives a power cut."""
+        with self._lock:
+            self._f.flush()
+            os.fsync(self._f.fileno())
+
+    def size(self) -> int:
+        with self._lock:
+            return self._f.seek(0, os.SEEK_END)
+
+    def close(self) -> None:
+        with self._lock:
+            self._f.close()
+
+
+class TranscriptWriter:
+    """Queue of transcript lines drained, batched and fsync'd by run()."""
+
+    def __init__(self, directory: str = "logs", name: str = None, tz=TZ,
+                 sync_interval: float = 1.0, sync_lines: int = 32, max_queue: int = 4096,
+                 max_bytes: int = int(64 * MB), rotate_daily: bool = True, keep: int = 32):
+        self.directory     = directory
+        self.tz            = tz
+        self.sync_interval = sync_interval
+        self.sync_lines    = sync_lines
+        self.max_bytes     = max_bytes
+        self.rotate_daily  = rotate_daily
+        self.keep          = keep
+        os.makedirs(directory, exist_ok=True)
+
+        self._queue    = queue.Queue(maxsize=max_queue)
+        self._handles  = itertools.count(1)
+        self._lines    = {}                  # handle -> (EditableLog, its handle, when)
+        self._order    = deque()             # handles in _lines, oldest first
+        self._finished = threading.Event()
+        self._log      = None
+        self._day      = None
+        self.path      = None
+        self._open(name or datetime.now(tz).strftime("%Y-%m-%d_%H-%M-%S"))
+
+        self.written   = 0
+        self.syncs     = 0
+        self.rotations = 0
+        self.waits     = 0                   # appends that found the queue full
+        self.max_sync_ms = 0.0
+
+    # ── Producer side (any thread, no I/O) ────────────────────────────────────
+
+    def append(self, text: str, when: float = None) -> int:
+        """Queue one line; returns a handle for replace()."""
+        handle = next(self._handles)
+        self._put(("append", handle, time.time() if when is None else when, text))
+        return handle
+
+    def replace(self, handle: int, text: str) -> None:
+        """Queue a rewrite of a recent line (same timestamp, new text)."""
+        self._put(("replace", handle, None, text))
+
+    def _put(self, item: tuple) -> None:
+        try:
+            self._queue.put_nowait(item)
+        except queue.Full:
+            self.waits += 1
+            self._queue.put(item)
+
+    # ── Writer thread ─────────────────────────────────────────────────────────
+
+    def _open(self, name: str) -> None:
+        path, n = os.path.join(self.directory, f"{name}.txt"), 1
+        while self._log is not None and os.path.exists(path):   # same-second rotation
+            n   += 1
+            path = os.path.join(self.directory, f"{name}.{n}.txt")
+        self._log  = EditableLog(path, keep=self.keep)
+        self._day  = datetime.now(self.tz).date()
+        self.path  = path
+
+    def _rotate_if_due(self) -> None:
+        # By the wall clock, not the line's time -- replayed lines keep the
+        # time they were spoken but go into the current file
+        now = datetime.now(self.tz)
+        if ((self.rotate_daily and now.date() != self._day)
+                or self._log.size() >= self.max_bytes):
+            self._sync()
+            self._log.close()
+            self._open(now.strftime("%Y-%m-%d_%H-%M-%S"))
+            self.rotations += 1
+
+    def _line(self, when: float, text: str) -> str:
+        return f"[{clock(when, self.tz)}] {text}"
+
+    def _write(self, item: tuple) -> None:
+        op, handle, when, text = item
+        if op == "append":
+            self._rotate_if_due()
+            self._lines[handle] = (self._log, self._log.append(self._line(when, text), flush=False), when)
+            self._order.append(handle)
+            while len(self._order) > self.keep:
+                self._lines.pop(self._order.popleft(), None)
+            self.written += 1
+        else:
+            entry = self._lines.get(handle)
+            if entry is not None and entry[0] is self._log:
+                log, log_handle, when = entry
+                log.replace(log_handle, self._line(when, text))
+
+    def _sync(self) -> None:
+        t0 = time.perf_counter()
+        self._log.sync()
+        self.syncs      += 1
+        self.max_sync_ms = max(self.max_sync_ms, (time.perf_counter() - t0) * 1000)
+
+    def run(self) -> None:
+        """Drain the queue until close(); a batch is fsync'd within sync_interval."""
+        dirty, deadline, stopping = 0, None, False
+        try:
+            while not stopping:
+                timeout = None if deadline is None else max(deadline - time.monotonic(), 0.0)
+                try:
+                    item = self._queue.get(timeout=timeout)
+                except queue.Empty:
+                    item = None
+                # Take whatever else is already waiting: one batch, one sync
+                batch = [] if item is None else [item]
+                while len(batch) < self.sync_lines:
+                    try:
+                        batch.append(self._queue.get_nowait())
+                    except queue.Empty:
+                        break
+                for item in batch:
+                    if item is _STOP:
+                        stopping = True
+                        continue
+                    self._write(item)
+                    dirty += 1
+                    if deadline is None:
+                        deadline = time.monotonic() + self.sync_interval
+                if dirty and (stopping or dirty >= self.sync_lines or time.monotonic() >= deadline):
+                    self._sync()
+                    dirty, deadline = 0, None
+        finally:
+            self._log.close()
+            self._finished.set()
+
+    def close(self, timeout: float = 5.0) -> None:
+        """Write and sync everything queued, then close the file."""
+        self._queue.put(_STOP)
+        self._finished.wait(timeout)
+
+    def stats(self) -> str:
+        return (f"log {os.path.basename(self.path)}: {self.written} lines, {self.syncs} syncs "
+                f"(max {self.max_sync_ms:.0f} ms), {self.rotations} rotations, "
+                f"{self._queue.qsize()} queued" + (f", {self.waits} waits" if self.waits else ""))
@@ -0,0 +1,197 @@
+"""
+Pico W Audio Front End
+======================
+The receive / DC-block / energy-VAD code every UDP pipeline runs before
+the model -- pi5test319c.py, 329/pi5test329.py and the in-process stages
+of escribe_pipeline.py -- in one place:
+
+  * PicoReceiver   UDP socket bound to the stream port.  Sends HELLO to the
+                   Pico W on start and on every receive timeout (it may have
+                   rebooted), skips runt packets, counts sequence gaps.
+                   Packets are  seq u16 BE | u16 | int16 LE PCM.
+  * DcBlocker      H(z) = (1 - z^-1) / (1 - 0.999 z^-1), stateful across
+                   packets (scipy lfilter, C speed); removes the ADC's
+                   midpoint offset, passes everything above ~8 Hz.
+  * EnergyVad      The SILENCE / SPEECH state machine: VAD_SPEECH_ONSET
+                   loud frames start speech (with VAD_PRE_ROLL frames of
+                   pre-roll so onsets are not clipped), VAD_SILENCE_END
+                   quiet frames end it.  The caller owns the segment audio
+                   -- a list of frames, a PcmBuffer -- and decides what a
+                   segment end means (queue, spill, early final).
+  * clip_gain()    Peak-normalising gain for a finished clip.
+
+    rx  = PicoReceiver(PICO_W_IP, UDP_PORT)
+    dc  = DcBlocker()
+    vad = EnergyVad(VAD_THRESHOLD, VAD_SPEECH_ONSET, VAD_SILENCE_END, VAD_PRE_ROLL)
+    while True:
+        packet = rx.recv()                  # None: timed out, HELLO re-sent
+        if packet is None:
+            continue
+        seq, pcm = packet
+        x = dc(pcm)
+        event = vad.push(x, frame_rms(x))
+        if event == ONSET:
+            segment = vad.take_pre_roll()   # includes this frame
+        elif vad.state == SPEECH:
+            segment.append(x)
+        if event == END:
+            segment.append(x)
+            flush(segment)
+"""
+
+import socket
+import struct
+
+import numpy as np
+from scipy import signal
+
+PICO_W_IP = "192.168.4.1"    # Pico W AP gateway (fixed)
+UDP_PORT  = 5005
+FS        = 16000            # must match Pico W SAMPLE_RATE
+
+VAD_THRESHOLD    = 0.008     # RMS separating speech from silence
+VAD_SPEECH_ONSET = 3         # consecutive loud frames to enter SPEECH
+VAD_SILENCE_END  = 20        # consecutive quiet frames to end a segment
+VAD_PRE_ROLL     = 8         # frames kept from before the onset (~80 ms)
+MAX_GAP_PACKETS  = 200       # a larger jump in seq is a Pico W restart, not loss
+
+SILENCE, SPEECH = "SILENCE", "SPEECH"
+ONSET, END      = "onset", "end"
+
+_HEADER = struct.Struct(">HH")
+
+
+class PicoReceiver:
+    """The Pico W's UDP audio stream: HELLO, packet parsing, loss count."""
+
+    def __init__(self, pico_ip: str = PICO_W_IP, port: int = UDP_PORT, timeout: float = 1.0,
+                 reuse_addr: bool = False):
+        self.pico_ip  = pico_ip
+        self.port     = port
+        self.received = 0
+        self.lost     = 0            # packets missing from the seq numbering
+        self._last_seq = None
+        self.sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        if reuse_addr:
+            self.sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        self.sock.bind(("0.0.0.0", port))
+        self.sock.settimeout(timeout)
+
+    def hello(self) -> None:
+        """Ask the Pico W to stream to us; harmless to repeat."""
+        try:
+            with socket.socket(socket.AF_INET, socket.SOCK_DGRAM) as s:
+                s.sendto(b"HELLO", (self.pico_ip, self.port))
+        except OSError:
+            pass                     # no route yet -- the next timeout retries
+
+    def recv(self):
+        """(seq, int16 frame) for the next packet, or None on a timeout (HELLO re-sent)."""
+        while True:
+            try:
+                data, _ = self.sock.recvfrom(4096)
+            except socket.timeout:
+                self.hello()
+                return None
+            if len(data) >= 5:
+                break
+        seq, _ = _HEADER.unpack_from(data, 0)
+        if self._last_seq is not None:
+            gap = (seq - self._last_seq - 1) & 0xFFFF
+            if 0 < gap < MAX_GAP_PACKETS:
+                self.lost += gap
+        self._last_seq = seq
+        self.received += 1
+        return seq, np.frombuffer(data, dtype="<i2", offset=4, count=(len(data) - 4) // 2).copy()
+
+    def loss_pct(self) -> float:
+        return 100.0 * self.lost / max(self.received + self.lost, 1)
+
+    def close(self) -> None:
+        self.sock.close()
+
+
+class DcBlocker:
+    """int16 or float32 frames in, DC-free float32 in [-1, 1] out; one per stream."""
+
+    def __init__(self):
+        self._b = np.array([1.0, -1.0],   dtype=np.float64)
+        self._a = np.array([1.0, -0.999], dtype=np.float64)
+        self.reset()
+
+    def reset(self) -> None:
+        self._zi = signal.lfilter_zi(self._b, self._a) * 0.0
+
+    def __call__(self, frame: np.ndarray) -> np.ndarray:
+        x = frame.astype(np.float32) / 32768.0 if frame.dtype == np.int16 else frame
+        y, self._zi = signal.lfilter(self._b, self._a, x, zi=self._zi)
+        return y.astype(np.float32)
+
+
+def frame_rms(x: np.ndarray) -> float:
+    return float(np.sqrt(np.mean(x ** 2)))
+
+
+def clip_gain(audio: np.ndarray) -> float:
+    """Gain that puts the clip's peak at half full scale (1.0 for a silent clip)."""
+    if audio.dtype == np.int16:
+        peak = int(np.max(np.abs(audio.astype(np.int32)))) / 32768.0
+    else:
+        peak = float(np.max(np.abs(audio)))
+    return 0.5 / peak if peak > 0 else 1.0
+
+
+class EnergyVad:
+    """
+    Per-frame energy VAD.  push() returns ONSET when speech starts (the
+    caller seeds its segment with take_pre_roll()), END when the silence
+    hold is reached (the frame still belongs to the segment), else None.
+    """
+
+    def __init__(self, threshold: float = VAD_THRESHOLD, onset: int = VAD_SPEECH_ONSET,
+                 silence_end: int = VAD_SILENCE_END, pre_roll: int = VAD_PRE_ROLL):
+        self.threshold   = threshold
+        self.onset       = onset
+        self.silence_end = silence_end
+        self.pre_roll_frames = pre_roll
+        self.reset()
+
+    def reset(self) -> None:
+        """Back to SILENCE with nothing buffered (pause, gap, restart)."""
+        self.state         = SILENCE
+        self.speech_count  = 0       # consecutive loud frames
+        self.silence_count = 0       # consecutive quiet frames
+        self.pre_roll      = []
+
+    def push(self, frame, rms: float):
+        if self.state == SILENCE:
+            self.pre_roll.append(frame)
+            if len(self.pre_roll) > self.pre_roll_frames:
+                self.pre_roll.pop(0)
+            if rms > self.threshold:
+                self.speech_count += 1
+                if self.speech_count >= self.onset:
+                    self.state = SPEECH
+                    self.speech_count = self.silence_count = 0
+                    return ONSET
+            else:
+                self.speech_count = 0
+            return None
+
+        if rms < self.threshold:
+            self.silence_count += 1
+            if self.silence_count >= self.silence_end:
+                self.reset()
+                return END
+        else:
+            self.silence_count = 0
+        return None
+
+    def take_pre_roll(self) -> list:
+        """The frames before the onset, onset frame included; the buffer is emptied."""
+        frames, self.pre_roll = self.pre_roll, []
+        return frames
+
+    def split(self) -> None:
+        """The caller cut a long segment: still SPEECH, silence count restarts."""
+        self.silence_count = 0